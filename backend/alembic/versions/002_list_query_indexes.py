@@ -0,0 +1,90 @@
+"""Add composite indexes matching the list endpoints' filter and sort shapes
+
+Revision ID: 002_list_query_indexes
+Revises: 001_add_clerk_id
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002_list_query_indexes'
+down_revision = '001_add_clerk_id'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = {
+    'ix_rims_manufacturer_trgm': ('rims', 'manufacturer'),
+    'ix_rims_model_trgm': ('rims', 'model'),
+    'ix_hubs_manufacturer_trgm': ('hubs', 'manufacturer'),
+    'ix_hubs_model_trgm': ('hubs', 'model'),
+    'ix_builds_customer_name_trgm': ('builds', 'customer_name'),
+}
+
+
+def upgrade() -> None:
+    # Rims: sort is always (is_reference, manufacturer, model)
+    op.create_index('ix_rims_listing', 'rims', ['is_reference', 'manufacturer', 'model'], if_not_exists=True)
+    op.create_index('ix_rims_iso_listing', 'rims', ['iso_size', 'is_reference', 'manufacturer', 'model'], if_not_exists=True)
+    op.create_index('ix_rims_tire_listing', 'rims', ['tire_type', 'is_reference', 'manufacturer', 'model'], if_not_exists=True)
+    op.create_index('ix_rims_erd', 'rims', ['erd'], if_not_exists=True)
+    op.create_index(
+        'ix_rims_measured', 'rims', ['manufacturer', 'model'],
+        postgresql_where=sa.text('is_reference = false'),
+        postgresql_include=['iso_size', 'erd'],
+        if_not_exists=True,
+    )
+
+    # Hubs
+    op.create_index('ix_hubs_listing', 'hubs', ['is_reference', 'manufacturer', 'model'], if_not_exists=True)
+    op.create_index('ix_hubs_position_listing', 'hubs', ['position', 'is_reference', 'manufacturer', 'model'], if_not_exists=True)
+    op.create_index('ix_hubs_brake_spokes', 'hubs', ['brake_type', 'spoke_count'], if_not_exists=True)
+    op.create_index('ix_hubs_spoke_count', 'hubs', ['spoke_count'], if_not_exists=True)
+    op.create_index(
+        'ix_hubs_measured', 'hubs', ['manufacturer', 'model'],
+        postgresql_where=sa.text('is_reference = false'),
+        postgresql_include=['position', 'spoke_count'],
+        if_not_exists=True,
+    )
+
+    # Builds: history is sorted by created_at; FKs are used for joins and deletes
+    op.create_index('ix_builds_created_at', 'builds', ['created_at'], if_not_exists=True)
+    op.create_index('ix_builds_rim_id', 'builds', ['rim_id'], if_not_exists=True)
+    op.create_index('ix_builds_hub_id', 'builds', ['hub_id'], if_not_exists=True)
+    op.create_index('ix_builds_created_by_id', 'builds', ['created_by_id'], if_not_exists=True)
+
+    # Trigram indexes for ilike '%term%' searches, when pg_trgm is installed
+    conn = op.get_bind()
+    available = conn.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).scalar()
+    if available:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, (table, column) in TRIGRAM_INDEXES.items():
+            op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    for name in TRIGRAM_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    for name, table in [
+        ('ix_builds_created_by_id', 'builds'),
+        ('ix_builds_hub_id', 'builds'),
+        ('ix_builds_rim_id', 'builds'),
+        ('ix_builds_created_at', 'builds'),
+        ('ix_hubs_measured', 'hubs'),
+        ('ix_hubs_spoke_count', 'hubs'),
+        ('ix_hubs_brake_spokes', 'hubs'),
+        ('ix_hubs_position_listing', 'hubs'),
+        ('ix_hubs_listing', 'hubs'),
+        ('ix_rims_measured', 'rims'),
+        ('ix_rims_erd', 'rims'),
+        ('ix_rims_tire_listing', 'rims'),
+        ('ix_rims_iso_listing', 'rims'),
+        ('ix_rims_listing', 'rims'),
+    ]:
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,49 @@
+"""Add catalog change log for delta sync
+
+Revision ID: 003_catalog_changes
+Revises: 002_list_query_indexes
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_catalog_changes'
+down_revision = '002_list_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        if_not_exists=True,
+    )
+    op.execute(
+        "INSERT INTO catalog_version (id, version) "
+        "SELECT 1, 0 WHERE NOT EXISTS (SELECT 1 FROM catalog_version WHERE id = 1)"
+    )
+
+    op.create_table(
+        'catalog_changes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index('ix_catalog_changes_version', 'catalog_changes', ['version'], if_not_exists=True)
+    op.create_index('ix_catalog_changes_entity', 'catalog_changes', ['entity', 'entity_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_catalog_changes_entity', table_name='catalog_changes')
+    op.drop_index('ix_catalog_changes_version', table_name='catalog_changes')
+    op.drop_table('catalog_changes')
+    op.drop_table('catalog_version')
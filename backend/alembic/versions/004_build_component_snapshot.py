@@ -0,0 +1,125 @@
+"""Store rim/hub spec snapshot on each build
+
+Revision ID: 004_build_component_snapshot
+Revises: 003_catalog_changes
+Create Date: 2026-10-19
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_build_component_snapshot'
+down_revision = '003_catalog_changes'
+branch_labels = None
+depends_on = None
+
+
+# Tables and snapshot layout as of this revision (app.services.build_snapshot
+# version 1). Frozen here so later model or schema changes can't alter
+# what this migration writes.
+SNAPSHOT_VERSION = 1
+
+RIM_COLUMNS = [
+    ('manufacturer', sa.String), ('model', sa.String), ('iso_size', sa.Integer),
+    ('erd', sa.Float), ('drilling_offset', sa.Float), ('outer_width', sa.Float),
+    ('inner_width', sa.Float), ('height', sa.Float), ('weight', sa.Float),
+    ('joint_type', sa.String), ('eyelet_type', sa.String), ('tire_type', sa.String),
+    ('notes', sa.Text), ('id', sa.Integer), ('is_reference', sa.Boolean),
+    ('measured_by_id', sa.Integer), ('measured_at', sa.DateTime(timezone=True)),
+    ('created_at', sa.DateTime(timezone=True)), ('updated_at', sa.DateTime(timezone=True)),
+]
+
+HUB_COLUMNS = [
+    ('manufacturer', sa.String), ('model', sa.String), ('position', sa.String),
+    ('oln', sa.Float), ('axle_type', sa.String), ('brake_type', sa.String),
+    ('drive_interface', sa.String), ('flange_diameter_left', sa.Float),
+    ('flange_diameter_right', sa.Float), ('flange_offset_left', sa.Float),
+    ('flange_offset_right', sa.Float), ('spoke_hole_diameter', sa.Float),
+    ('spoke_count', sa.Integer), ('spoke_interface', sa.String), ('weight', sa.Float),
+    ('internal_gearing', sa.String), ('generator_type', sa.String), ('notes', sa.Text),
+    ('id', sa.Integer), ('is_reference', sa.Boolean), ('measured_by_id', sa.Integer),
+    ('measured_at', sa.DateTime(timezone=True)), ('created_at', sa.DateTime(timezone=True)),
+    ('updated_at', sa.DateTime(timezone=True)),
+]
+
+rims = sa.table('rims', *[sa.column(name, type_) for name, type_ in RIM_COLUMNS])
+hubs = sa.table('hubs', *[sa.column(name, type_) for name, type_ in HUB_COLUMNS])
+users = sa.table('users', sa.column('id', sa.Integer), sa.column('name', sa.String))
+builds = sa.table(
+    'builds',
+    sa.column('id', sa.Integer),
+    sa.column('rim_id', sa.Integer),
+    sa.column('hub_id', sa.Integer),
+    sa.column('created_by_id', sa.Integer),
+    sa.column('component_snapshot', sa.JSON),
+)
+
+
+def _json_value(value):
+    # As pydantic's JSON mode writes them: UTC datetimes end in "Z"
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    return value
+
+
+def _component(row, user_names):
+    """A RimResponse/HubResponse dump of a catalog row, nulls omitted."""
+    component = {}
+    for name, value in row._mapping.items():
+        if name == 'measured_by_id':
+            if value is not None and value in user_names:
+                component['measured_by'] = {'id': value, 'name': user_names[value]}
+        elif value is not None:
+            component[name] = _json_value(value)
+    return component
+
+
+def upgrade() -> None:
+    op.add_column('builds', sa.Column('component_snapshot', sa.JSON(), nullable=True))
+
+    # Backfill from the current catalog rows - the best record available for
+    # builds saved before snapshots existed.
+    bind = op.get_bind()
+    pending = bind.execute(
+        sa.select(builds.c.id, builds.c.rim_id, builds.c.hub_id, builds.c.created_by_id)
+        .where(builds.c.component_snapshot.is_(None))
+    ).all()
+    if not pending:
+        return
+
+    user_names = dict(bind.execute(sa.select(users.c.id, users.c.name)).all())
+    rim_rows = {
+        row.id: row for row in bind.execute(
+            sa.select(rims).where(rims.c.id.in_({b.rim_id for b in pending}))
+        )
+    }
+    hub_rows = {
+        row.id: row for row in bind.execute(
+            sa.select(hubs).where(hubs.c.id.in_({b.hub_id for b in pending}))
+        )
+    }
+
+    for build in pending:
+        rim, hub = rim_rows.get(build.rim_id), hub_rows.get(build.hub_id)
+        if rim is None or hub is None:
+            continue
+        snapshot = {
+            'v': SNAPSHOT_VERSION,
+            'rim': _component(rim, user_names),
+            'hub': _component(hub, user_names),
+            'created_by': {'id': build.created_by_id, 'name': user_names.get(build.created_by_id)},
+            # No 'inputs': today's rows can't tell what the spokes were
+            # calculated from, so calculation_inputs stays null for these builds
+        }
+        bind.execute(
+            builds.update().where(builds.c.id == build.id).values(component_snapshot=snapshot)
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('builds', 'component_snapshot')
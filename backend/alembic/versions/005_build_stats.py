@@ -0,0 +1,68 @@
+"""Add monthly build aggregates for shop analytics
+
+Revision ID: 005_build_stats
+Revises: 004_build_component_snapshot
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_build_stats'
+down_revision = '004_build_component_snapshot'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'build_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.UniqueConstraint('dimension', 'key', 'month', name='uq_build_stats_dimension_key_month'),
+        if_not_exists=True,
+    )
+
+    # One-off backfill; afterwards build create/delete keep the counters
+    # current (app.services.build_stats.rebuild_build_stats recomputes them).
+    # Same counters as build_stat_keys at this revision: 1 mm length buckets,
+    # each side counted once.
+    if op.get_bind().dialect.name == 'sqlite':
+        month = "date(coalesce(created_at, 'now'), 'start of month')"
+        bucket = "CAST(CAST({} AS INTEGER) AS TEXT)"
+    else:
+        month = "CAST(date_trunc('month', coalesce(created_at, now())) AS DATE)"
+        bucket = "CAST(CAST(floor({}) AS INTEGER) AS VARCHAR)"
+
+    op.execute(f"""
+        INSERT INTO build_stats (dimension, "key", "month", "count")
+        SELECT dimension, "key", "month", COUNT(*)
+        FROM (
+            SELECT 'total' AS dimension, '' AS "key", {month} AS "month" FROM builds
+            UNION ALL
+            SELECT 'rim', CAST(rim_id AS VARCHAR), {month} FROM builds
+            UNION ALL
+            SELECT 'hub', CAST(hub_id AS VARCHAR), {month} FROM builds
+            UNION ALL
+            SELECT 'mechanic', CAST(created_by_id AS VARCHAR), {month} FROM builds
+            UNION ALL
+            SELECT 'cross_pattern',
+                   CAST(cross_pattern_left AS VARCHAR) || '/' || CAST(cross_pattern_right AS VARCHAR),
+                   {month}
+            FROM builds
+            UNION ALL
+            SELECT 'spoke_length', {bucket.format('spoke_length_left')}, {month} FROM builds
+            UNION ALL
+            SELECT 'spoke_length', {bucket.format('spoke_length_right')}, {month} FROM builds
+        ) AS counted
+        GROUP BY dimension, "key", "month"
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('build_stats')
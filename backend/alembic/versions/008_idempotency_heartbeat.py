@@ -0,0 +1,25 @@
+"""Add heartbeat column to idempotency keys
+
+Revision ID: 008_idempotency_heartbeat
+Revises: 007_jobs
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_idempotency_heartbeat'
+down_revision = '007_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE idempotency_keys SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column('idempotency_keys', 'updated_at')
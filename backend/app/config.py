@@ -7,6 +7,21 @@ class Settings(BaseSettings):
     clerk_secret_key: str = ""
     clerk_publishable_key: str = ""
     cors_origins: str = "http://localhost:3333"
+    # Background job worker processes started with the API (0: run scripts/run_jobs.py instead)
+    job_workers: int = 2
+    # Development/CI: log slow queries, N+1 patterns and query budget overruns
+    query_inspector: bool = False
+    slow_query_ms: float = 200
+    repeated_query_threshold: int = 5
+    # Admin request profiles (X-Profile header) are kept here
+    profile_dir: str = "/tmp/spokecalc-profiles"
+    # Request traces: sampled, slow (ms), 5xx and admin X-Trace: 1 requests are written here
+    trace_dir: str = "/tmp/spokecalc-traces"
+    trace_sample_rate: float = 0.01
+    trace_slow_ms: float = 1000
+    # Traces beyond these limits are dropped rather than written
+    trace_max_per_minute: int = 600
+    trace_max_mb_per_day: float = 200
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import get_settings
 
@@ -16,3 +17,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Trigram GIN indexes back the `ilike '%term%'` searches on the list
+# endpoints. They need the pg_trgm extension, so they are created here (and
+# in migration 002) instead of on the models, and skipped when unavailable.
+TRIGRAM_INDEXES = {
+    "ix_rims_manufacturer_trgm": ("rims", "manufacturer"),
+    "ix_rims_model_trgm": ("rims", "model"),
+    "ix_hubs_manufacturer_trgm": ("hubs", "manufacturer"),
+    "ix_hubs_model_trgm": ("hubs", "model"),
+    "ix_builds_customer_name_trgm": ("builds", "customer_name"),
+}
+
+
+def create_search_indexes(bind) -> bool:
+    """Create the trigram search indexes if pg_trgm is available."""
+    if bind.dialect.name != "postgresql":
+        return False
+
+    try:
+        with bind.begin() as conn:
+            available = conn.execute(
+                text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            ).scalar()
+            if not available:
+                return False
+
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for name, (table, column) in TRIGRAM_INDEXES.items():
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+                ))
+    except DBAPIError:
+        # e.g. no privilege to create the extension; searches still work unindexed
+        return False
+
+    return True
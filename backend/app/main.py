@@ -1,19 +1,68 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import logging
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from .config import get_settings
-from .database import engine, Base
-from .routers import rims, hubs, calculator, builds, users
+from .database import engine, Base, create_search_indexes
+from .services.jobs import start_job_runner
+from .utils import admission
+from .utils.admission import AdmissionControlMiddleware
+from .utils.metrics import MetricsMiddleware, install_query_metrics, metrics, render_metric
+from .utils.profiling import ProfilingMiddleware
+from .utils.query_inspector import QueryInspectorMiddleware, install_query_inspector
+from .utils.tracing import TracedRoute, TracingMiddleware, install_tracing
+from .utils.singleflight import SingleflightMiddleware, stats as singleflight_stats
+from .routers import rims, hubs, calculator, builds, users, catalog, analytics, batch, jobs, profiles
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_search_indexes(engine)
+install_query_metrics(engine)
+install_tracing(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runner = start_job_runner(settings.job_workers)
+    app.state.job_runner = runner
+    yield
+    if runner:
+        runner.stop()
+
 
 app = FastAPI(
     title="Spoke Calculator API",
     description="Spoke length calculator for Scenic Routes Community Bicycle Center",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
+app.router.route_class = TracedRoute
+
+# Middleware added later wraps earlier ones: CORS (outermost) sets headers on
+# every response including 429s, tracing assigns the request ID and times
+# everything below it, metrics see every request (coalesced and rejected
+# ones too), singleflight lets coalesced requests skip admission,
+# admission control limits what reaches the handlers, and the optional
+# query inspector sees only the SQL of requests that actually ran.
+# Profiling is innermost so a profile covers only the request itself.
+app.add_middleware(ProfilingMiddleware)
+if settings.query_inspector:
+    app.add_middleware(
+        QueryInspectorMiddleware,
+        inspector=install_query_inspector(engine, settings.slow_query_ms, settings.repeated_query_threshold),
+    )
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(SingleflightMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 # CORS configuration
 origins = [origin.strip() for origin in settings.cors_origins.split(",")]
@@ -31,6 +80,11 @@ app.include_router(hubs.router)
 app.include_router(calculator.router)
 app.include_router(builds.router)
 app.include_router(users.router)
+app.include_router(catalog.router)
+app.include_router(analytics.router)
+app.include_router(batch.router)
+app.include_router(jobs.router)
+app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -45,3 +99,76 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/coalescing")
+def coalescing_stats():
+    """Requests executed vs. served from an identical in-flight request, per route."""
+    return singleflight_stats.snapshot()
+
+
+@app.get("/health/admission")
+def admission_stats():
+    """Active and queued requests, admissions and 429 rejections per limiter."""
+    return admission.snapshot()
+
+
+@app.get("/health/ready")
+def readiness(request: Request):
+    """
+    Deep health check: database reachable, connection pool and job runner
+    state, admission queues. 503 when the API should not receive traffic.
+    """
+    checks = {}
+    ready = True
+
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    except SQLAlchemyError:
+        # The error can name hosts and users: log it, don't serve it
+        logger.exception("Readiness check: database unreachable")
+        checks["database"] = {"ok": False}
+        ready = False
+
+    pool = engine.pool
+    checks["connection_pool"] = {
+        "size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+    }
+
+    runner = getattr(request.app.state, "job_runner", None)
+    if settings.job_workers > 0:
+        alive = runner is not None and runner.is_alive()
+        checks["job_runner"] = {"ok": alive, "workers": settings.job_workers}
+        ready = ready and alive
+
+    # A full shared queue means new requests are being turned away with 429
+    shared = admission.SHARED.snapshot()
+    saturated = shared["waiting"] >= shared["queue_size"]
+    checks["admission"] = {"ok": not saturated, "active": shared["active"], "waiting": shared["waiting"]}
+    ready = ready and not saturated
+
+    return JSONResponse({"ready": ready, "checks": checks}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-route latency, status and SQL statement metrics in Prometheus text format."""
+    limiters = admission.snapshot()
+    coalescing = singleflight_stats.snapshot()
+    return PlainTextResponse(
+        metrics.render()
+        + render_metric("admission_active", "gauge", "Requests holding an admission slot.", [
+            ({"limiter": name}, s["active"]) for name, s in limiters.items()
+        ])
+        + render_metric("admission_waiting", "gauge", "Requests queued for an admission slot.", [
+            ({"limiter": name}, s["waiting"]) for name, s in limiters.items()
+        ])
+        + render_metric("singleflight_coalesced_total", "counter", "Requests served from an identical in-flight request.", [
+            ({"route": route}, s["coalesced"]) for route, s in coalescing.items()
+        ]),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -2,5 +2,9 @@ from .user import User
 from .rim import Rim
 from .hub import Hub
 from .build import Build
+from .catalog_change import CatalogChange, CatalogVersion
+from .build_stat import BuildStat
+from .idempotency_key import IdempotencyKey
+from .job import Job
 
-__all__ = ["User", "Rim", "Hub", "Build"]
+__all__ = ["User", "Rim", "Hub", "Build", "CatalogChange", "CatalogVersion", "BuildStat", "IdempotencyKey", "Job"]
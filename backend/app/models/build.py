@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -10,8 +10,8 @@ class Build(Base):
     id = Column(Integer, primary_key=True, index=True)
 
     # Components
-    rim_id = Column(Integer, ForeignKey("rims.id"), nullable=False)
-    hub_id = Column(Integer, ForeignKey("hubs.id"), nullable=False)
+    rim_id = Column(Integer, ForeignKey("rims.id"), nullable=False, index=True)
+    hub_id = Column(Integer, ForeignKey("hubs.id"), nullable=False, index=True)
 
     # Build parameters
     spoke_count = Column(Integer, nullable=False)
@@ -39,9 +39,12 @@ class Build(Base):
     customer_notes = Column(Text)  # Notes for the customer
     internal_notes = Column(Text)  # Internal shop notes
 
+    # Rim/hub specs and calculation inputs as of saving (see services/build_snapshot.py)
+    component_snapshot = Column(JSON)
+
     # Metadata
-    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relationships
     rim = relationship("Rim", back_populates="builds")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Date, UniqueConstraint
+from ..database import Base
+
+
+class BuildStat(Base):
+    """Monthly build counts per dimension, maintained on build create/delete."""
+    __tablename__ = "build_stats"
+    __table_args__ = (
+        UniqueConstraint("dimension", "key", "month", name="uq_build_stats_dimension_key_month"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    dimension = Column(String, nullable=False)  # total, rim, hub, mechanic, cross_pattern, spoke_length
+    key = Column(String, nullable=False)  # e.g. rim id, "3/2", spoke length bucket
+    month = Column(Date, nullable=False)  # first day of the month
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index, event
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class CatalogVersion(Base):
+    """Single-row counter; its row lock orders concurrent catalog writes."""
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+@event.listens_for(CatalogVersion.__table__, "after_create")
+def _seed_catalog_version(table, connection, **kwargs):
+    # The counter row must exist before the first write: concurrent writers
+    # could otherwise both try to create it
+    connection.execute(table.insert().values(id=1, version=0))
+
+
+class CatalogChange(Base):
+    """Latest change per rim/hub, for delta sync. Deletes are kept as tombstones."""
+    __tablename__ = "catalog_changes"
+    __table_args__ = (
+        Index("ix_catalog_changes_entity", "entity", "entity_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, index=True)
+    entity = Column(String, nullable=False)  # rim, hub
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert, delete
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -6,6 +6,20 @@ from ..database import Base
 
 class Hub(Base):
     __tablename__ = "hubs"
+    __table_args__ = (
+        # list_hubs always sorts by (is_reference, manufacturer, model)
+        Index("ix_hubs_listing", "is_reference", "manufacturer", "model"),
+        Index("ix_hubs_position_listing", "position", "is_reference", "manufacturer", "model"),
+        Index("ix_hubs_brake_spokes", "brake_type", "spoke_count"),
+        Index("ix_hubs_spoke_count", "spoke_count"),
+        # measured_only: small partial index covering the usual filter columns
+        Index(
+            "ix_hubs_measured",
+            "manufacturer", "model",
+            postgresql_where=text("is_reference = false"),
+            postgresql_include=["position", "spoke_count"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     manufacturer = Column(String, index=True, nullable=False)
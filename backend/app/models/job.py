@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, JSON, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class Job(Base):
+    """A background job (scrape, import, large computation) and its outcome."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    params = Column(JSON)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed, cancelled
+    progress = Column(Float, nullable=False, default=0)  # 0..1
+    message = Column(String)  # latest progress note
+    result = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    created_by_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))  # heartbeat while running
+    finished_at = Column(DateTime(timezone=True))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -6,6 +6,20 @@ from ..database import Base
 
 class Rim(Base):
     __tablename__ = "rims"
+    __table_args__ = (
+        # list_rims always sorts by (is_reference, manufacturer, model)
+        Index("ix_rims_listing", "is_reference", "manufacturer", "model"),
+        Index("ix_rims_iso_listing", "iso_size", "is_reference", "manufacturer", "model"),
+        Index("ix_rims_tire_listing", "tire_type", "is_reference", "manufacturer", "model"),
+        Index("ix_rims_erd", "erd"),
+        # measured_only: small partial index covering the usual filter columns
+        Index(
+            "ix_rims_measured",
+            "manufacturer", "model",
+            postgresql_where=text("is_reference = false"),
+            postgresql_include=["iso_size", "erd"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     manufacturer = Column(String, index=True, nullable=False)
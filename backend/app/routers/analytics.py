@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..schemas.analytics import ShopAnalytics
+from ..services.build_stats import shop_analytics
+from ..utils.auth import get_current_user
+from ..utils.tracing import TracedRoute
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=TracedRoute)
+
+
+@router.get("", response_model=ShopAnalytics)
+def get_analytics(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    top: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Shop stats for builds created between the months of `since` and `until`
+    (inclusive; whole months). Served from the build_stats aggregates.
+    """
+    return shop_analytics(db, since, until, top)
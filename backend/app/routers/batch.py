@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request
+from ..models.user import User
+from ..schemas.batch import BatchRequest, BatchResponse
+from ..services.batch import run_batch
+from ..utils.auth import get_current_user
+from ..utils.tracing import TracedRoute
+
+router = APIRouter(prefix="/batch", tags=["batch"], route_class=TracedRoute)
+
+
+@router.post("", response_model=BatchResponse)
+async def batch(
+    batch_request: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run up to 20 GET requests and calculations in one round trip.
+
+    Authentication is checked once for the whole batch. Each sub-response
+    carries its own status; one failing does not fail the others.
+    """
+    responses = await run_batch(
+        request.app,
+        batch_request.requests,
+        current_user,
+        request.headers.get("authorization"),
+    )
+    return {"responses": responses}
@@ -1,35 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
 from ..models.build import Build
+from ..models.hub import Hub
+from ..models.rim import Rim
 from ..models.user import User
-from ..schemas.build import BuildCreate, BuildResponse, BuildUpdate
+from ..schemas.build import (
+    BuildCreate, BuildResponse, BuildSummary, BuildUpdate, BulkBuildCreate, BulkBuildResult,
+    SpokeOrder, SpokeOrderRequest,
+)
+from ..services.build_snapshot import SNAPSHOT_FIELDS, build_response, snapshot_components, snapshot_fields
+from ..services.build_stats import record_build
+from ..services.bulk_builds import create_builds
+from ..services.idempotency import idempotent
+from ..services.projection import apply_projection, parse_fields, project_rows
+from ..services.compact_formats import list_response, negotiate
+from ..services.spoke_order import spoke_order_csv, spoke_order_lines
 from ..utils.auth import get_current_user
+from ..utils.tracing import TracedRoute
 
-router = APIRouter(prefix="/builds", tags=["builds"])
+router = APIRouter(prefix="/builds", tags=["builds"], route_class=TracedRoute)
+
+
+def list_build_summaries(db: Session, customer_name: Optional[str], skip: int, limit: int):
+    """Build history rows with only the columns the history list shows."""
+    query = (
+        db.query(
+            Build.id, Build.created_at, Build.customer_name, Build.spoke_count,
+            Build.cross_pattern_left, Build.cross_pattern_right,
+            Build.spoke_length_left, Build.spoke_length_right,
+            Rim.id, Rim.manufacturer, Rim.model,
+            Hub.id, Hub.manufacturer, Hub.model,
+            User.id, User.name,
+        )
+        .join(Rim, Build.rim_id == Rim.id)
+        .join(Hub, Build.hub_id == Hub.id)
+        .join(User, Build.created_by_id == User.id)
+    )
+
+    if customer_name:
+        query = query.filter(Build.customer_name.ilike(f"%{customer_name}%"))
+
+    query = query.order_by(Build.created_at.desc())
+
+    return [
+        {
+            "id": row[0],
+            "created_at": row[1],
+            "customer_name": row[2],
+            "spoke_count": row[3],
+            "cross_pattern_left": row[4],
+            "cross_pattern_right": row[5],
+            "spoke_length_left": row[6],
+            "spoke_length_right": row[7],
+            "rim": {"id": row[8], "manufacturer": row[9], "model": row[10]},
+            "hub": {"id": row[11], "manufacturer": row[12], "model": row[13]},
+            "created_by": {"id": row[14], "name": row[15]},
+        }
+        for row in query.offset(skip).limit(limit)
+    ]
 
 
 @router.get("", response_model=List[BuildResponse])
 def list_builds(
     customer_name: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    accept: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Build).options(
-        joinedload(Build.rim),
-        joinedload(Build.hub),
-        joinedload(Build.created_by)
-    )
+    """
+    List builds, newest first.
+
+    `view=summary` returns only what the history list shows (see
+    BuildSummary); `fields=` returns just the named BuildResponse fields.
+    Accept can ask for a columnar layout (see services/compact_formats.py).
+    """
+    media_type = negotiate(accept)
+    if view == "summary":
+        if fields:
+            raise HTTPException(status_code=400, detail="Use either view=summary or fields, not both")
+        summaries = list_build_summaries(db, customer_name, skip, limit)
+        return list_response(summaries, list(BuildSummary.model_fields), media_type)
+
+    projection = parse_fields(fields, BuildResponse)
+    query = db.query(Build)
+    if projection:
+        columns = [f for f in projection if f not in SNAPSHOT_FIELDS]
+        from_snapshot = [f for f in projection if f in SNAPSHOT_FIELDS]
+        load = columns + (["component_snapshot"] if from_snapshot else [])
+        query = apply_projection(query, Build, load)
 
     if customer_name:
         query = query.filter(Build.customer_name.ilike(f"%{customer_name}%"))
 
     query = query.order_by(Build.created_at.desc())
 
-    return query.offset(skip).limit(limit).all()
+    rows = query.offset(skip).limit(limit).all()
+    if projection:
+        items = project_rows(rows, BuildResponse, columns)
+        for item, build in zip(items, rows):
+            item.update(snapshot_fields(build, from_snapshot))
+        return list_response(items, projection, media_type)
+    if media_type:
+        items = [build_response(build).model_dump(mode="json") for build in rows]
+        return list_response(items, list(BuildResponse.model_fields), media_type)
+    return [build_response(build) for build in rows]
+
+
+@router.post("/spoke-order", response_model=SpokeOrder)
+def spoke_order(
+    order: SpokeOrderRequest,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Total spokes to order per (rounded length, side) for a set of builds,
+    chosen by `build_ids` and/or a `since`/`until` created_at range.
+    `?format=csv` returns a spreadsheet-ready file.
+    """
+    if not order.build_ids and not order.since and not order.until:
+        raise HTTPException(status_code=400, detail="Give build_ids or a since/until date range")
+
+    result = spoke_order_lines(db, order.build_ids, order.since, order.until, order.step)
+    if format == "csv":
+        return Response(
+            spoke_order_csv(result["lines"]),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="spoke-order.csv"'},
+        )
+    return result
 
 
 @router.get("/{build_id}", response_model=BuildResponse)
@@ -37,38 +143,68 @@ def get_build(
     build_id: int,
     db: Session = Depends(get_db)
 ):
-    build = db.query(Build).options(
-        joinedload(Build.rim),
-        joinedload(Build.hub),
-        joinedload(Build.created_by)
-    ).filter(Build.id == build_id).first()
+    # Single-row read: rim/hub specs come from the build's own snapshot
+    build = db.query(Build).filter(Build.id == build_id).first()
 
     if not build:
         raise HTTPException(status_code=404, detail="Build not found")
 
-    return build
+    return build_response(build)
 
 
 @router.post("", response_model=BuildResponse)
 def create_build(
     build_data: BuildCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    build = Build(
-        **build_data.model_dump(),
-        created_by_id=current_user.id
-    )
-    db.add(build)
-    db.commit()
-    db.refresh(build)
+    def create():
+        rim = db.query(Rim).filter(Rim.id == build_data.rim_id).first()
+        if not rim:
+            raise HTTPException(status_code=404, detail="Rim not found")
+
+        hub = db.query(Hub).filter(Hub.id == build_data.hub_id).first()
+        if not hub:
+            raise HTTPException(status_code=404, detail="Hub not found")
+
+        build = Build(
+            **build_data.model_dump(),
+            created_by_id=current_user.id,
+            component_snapshot=snapshot_components(rim, hub, current_user)
+        )
+        db.add(build)
+        db.flush()
+        record_build(db, build)
+        db.refresh(build)
+
+        return build_response(build)
+
+    return idempotent(db, idempotency_key, current_user, "POST /builds", build_data, BuildResponse, create)
+
+
+@router.post("/bulk", response_model=BulkBuildResult)
+def create_builds_bulk(
+    request: BulkBuildCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create many builds in one transaction (program/fleet orders).
+
+    Spoke lengths and angles are calculated from each item's rim and hub.
+    Failed items are reported by index; with `atomic` nothing is created
+    if any item fails.
+    """
+    def create():
+        try:
+            result = create_builds(db, request, current_user)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return result
 
-    # Reload with relationships
-    return db.query(Build).options(
-        joinedload(Build.rim),
-        joinedload(Build.hub),
-        joinedload(Build.created_by)
-    ).filter(Build.id == build.id).first()
+    return idempotent(db, idempotency_key, current_user, "POST /builds/bulk", request, BulkBuildResult, create)
 
 
 @router.patch("/{build_id}", response_model=BuildResponse)
@@ -98,12 +234,7 @@ def update_build(
     db.commit()
     db.refresh(build)
 
-    # Reload with relationships
-    return db.query(Build).options(
-        joinedload(Build.rim),
-        joinedload(Build.hub),
-        joinedload(Build.created_by)
-    ).filter(Build.id == build.id).first()
+    return build_response(build)
 
 
 @router.delete("/{build_id}")
@@ -124,6 +255,7 @@ def delete_build(
             detail="Not authorized to delete this build"
         )
 
+    record_build(db, build, sign=-1)
     db.delete(build)
     db.commit()
     return {"message": "Build deleted"}
@@ -1,23 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, WebSocket
 from ..schemas.calculator import SpokeCalculation, SpokeResult
+from ..services.live_calculation import LiveCalculation
 from ..services.spoke_calculator import calculate_full_analysis
+from ..utils.tracing import TracedRoute, span
 
-router = APIRouter(prefix="/calculate", tags=["calculator"])
+router = APIRouter(prefix="/calculate", tags=["calculator"], route_class=TracedRoute)
 
 
 @router.post("", response_model=SpokeResult)
 def calculate_spokes(calc: SpokeCalculation):
-    result = calculate_full_analysis(
-        erd=calc.erd,
-        flange_diameter_left=calc.flange_diameter_left,
-        flange_diameter_right=calc.flange_diameter_right,
-        flange_offset_left=calc.flange_offset_left,
-        flange_offset_right=calc.flange_offset_right,
-        spoke_count=calc.spoke_count,
-        cross_pattern_left=calc.cross_pattern_left,
-        cross_pattern_right=calc.cross_pattern_right,
-        spoke_hole_diameter=calc.spoke_hole_diameter or 2.6,
-        rim_offset=calc.rim_offset or 0
-    )
+    with span("calculate"):
+        result = calculate_full_analysis(
+            erd=calc.erd,
+            flange_diameter_left=calc.flange_diameter_left,
+            flange_diameter_right=calc.flange_diameter_right,
+            flange_offset_left=calc.flange_offset_left,
+            flange_offset_right=calc.flange_offset_right,
+            spoke_count=calc.spoke_count,
+            cross_pattern_left=calc.cross_pattern_left,
+            cross_pattern_right=calc.cross_pattern_right,
+            spoke_hole_diameter=calc.spoke_hole_diameter or 2.6,
+            rim_offset=calc.rim_offset or 0
+        )
 
-    return SpokeResult(**result)
+    # Validated once, by response_model (building a SpokeResult here validated it twice)
+    return result
+
+
+@router.websocket("/live")
+async def live_calculation(websocket: WebSocket):
+    """
+    Select a rim and hub once, then send parameter deltas and receive
+    recalculated results (see services/live_calculation.py for the protocol).
+    """
+    await LiveCalculation(websocket).run()
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..database import get_db
+from ..schemas.catalog import CatalogChanges
+from ..schemas.hub import HubResponse
+from ..schemas.rim import RimResponse
+from ..services.catalog_changes import changes_since
+from ..services.compact_formats import columnar, encoded_response, negotiate
+from ..utils.tracing import TracedRoute
+
+router = APIRouter(prefix="/catalog", tags=["catalog"], route_class=TracedRoute)
+
+
+@router.get("/changes", response_model=CatalogChanges)
+def get_catalog_changes(
+    since: int = Query(0, ge=0),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Rims and hubs changed after catalog version `since`, plus deleted ids.
+
+    Clients store the returned `version` and pass it as `since` next time;
+    since=0 returns the full catalog. Accept can ask for `rims` and `hubs`
+    in a columnar layout (see services/compact_formats.py).
+    """
+    changes = changes_since(db, since)
+    media_type = negotiate(accept)
+    if not media_type:
+        return changes
+
+    body = CatalogChanges.model_validate(changes, from_attributes=True).model_dump(mode="json")
+    body["rims"] = columnar(body["rims"], list(RimResponse.model_fields))
+    body["hubs"] = columnar(body["hubs"], list(HubResponse.model_fields))
+    return encoded_response(body, media_type)
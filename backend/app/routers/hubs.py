@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 from typing import List, Optional
 from datetime import datetime
 from ..database import get_db
 from ..models.hub import Hub
 from ..models.user import User
-from ..schemas.hub import HubCreate, HubUpdate, HubResponse
+from ..schemas.hub import HubCreate, HubUpdate, HubResponse, MeasuredBy
+from ..schemas.catalog import ImportResult
+from ..services.catalog_changes import DELETE, record_change
+from ..services.idempotency import idempotent
+from ..services.projection import apply_projection, parse_fields, project_rows
+from ..services.serialization import ColumnRows
+from ..services.compact_formats import VARY, list_response, negotiate
+from ..services.catalog_io import (
+    EXPORT_EXTENSIONS, EXPORT_FORMATS, detect_format, export_columns, export_format, import_upload, stream_export,
+)
 from ..utils.auth import get_current_user
+from ..utils.tracing import TracedRoute
 
-router = APIRouter(prefix="/hubs", tags=["hubs"])
+router = APIRouter(prefix="/hubs", tags=["hubs"], route_class=TracedRoute)
+
+# Full list rows, read as column tuples (see services/serialization.py)
+LIST_ROWS = ColumnRows(Hub, HubResponse, joins={
+    "measured_by": (MeasuredBy, User, Hub.measured_by_id == User.id),
+})
 
 
 @router.get("", response_model=List[HubResponse])
@@ -21,11 +37,16 @@ def list_hubs(
     spoke_count: Optional[int] = None,
     axle_type: Optional[str] = None,
     measured_only: bool = False,
+    fields: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Hub)
+    projection = parse_fields(fields, HubResponse)
+    media_type = negotiate(accept)
+    # Full rows skip the ORM and response_model validation: columns go straight to JSON
+    query = db.query(Hub) if projection else LIST_ROWS.query(db)
 
     if search:
         query = query.filter(
@@ -56,7 +77,13 @@ def list_hubs(
     # Order by: measured first, then by manufacturer/model
     query = query.order_by(Hub.is_reference.asc(), Hub.manufacturer, Hub.model)
 
-    return query.offset(skip).limit(limit).all()
+    if projection:
+        # Sparse fieldset, e.g. ?fields=manufacturer,model,erd
+        query = apply_projection(query, Hub, projection)
+        rows = query.offset(skip).limit(limit).all()
+        return list_response(project_rows(rows, HubResponse, projection), projection, media_type)
+
+    return list_response(LIST_ROWS.render(query.offset(skip).limit(limit)), LIST_ROWS.fields, media_type)
 
 
 @router.get("/manufacturers", response_model=List[str])
@@ -65,9 +92,51 @@ def list_hub_manufacturers(db: Session = Depends(get_db)):
     return [r[0] for r in results if r[0]]
 
 
+@router.get("/export")
+def export_hubs(
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson|columnar|msgpack)$"),
+    accept: Optional[str] = Header(None),
+):
+    """
+    Stream the full hub table as CSV (default), NDJSON or columnar
+    blocks; without `format`, Accept can ask for columnar JSON or MessagePack.
+    """
+    fmt = export_format(format, accept)
+    return StreamingResponse(
+        stream_export(Hub, export_columns(HubCreate), fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="hubs.{EXPORT_EXTENSIONS[fmt]}"', **VARY},
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+def import_hubs(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk-add measured hubs from a CSV or NDJSON upload, reporting bad rows."""
+    fmt = detect_format(format, file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=400,
+            detail="Could not determine file format; pass ?format=csv or ?format=ndjson"
+        )
+
+    return import_upload(
+        db, Hub, HubCreate, file.file, fmt,
+        defaults={
+            "is_reference": False,
+            "measured_by_id": current_user.id,
+            "measured_at": datetime.utcnow(),
+        },
+    )
+
+
 @router.get("/{hub_id}", response_model=HubResponse)
 def get_hub(hub_id: int, db: Session = Depends(get_db)):
-    hub = db.query(Hub).filter(Hub.id == hub_id).first()
+    hub = db.query(Hub).options(joinedload(Hub.measured_by)).filter(Hub.id == hub_id).first()
     if not hub:
         raise HTTPException(status_code=404, detail="Hub not found")
     return hub
@@ -76,19 +145,23 @@ def get_hub(hub_id: int, db: Session = Depends(get_db)):
 @router.post("", response_model=HubResponse)
 def create_hub(
     hub_data: HubCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    hub = Hub(
-        **hub_data.model_dump(),
-        is_reference=False,
-        measured_by_id=current_user.id,
-        measured_at=datetime.utcnow()
-    )
-    db.add(hub)
-    db.commit()
-    db.refresh(hub)
-    return hub
+    def create():
+        hub = Hub(
+            **hub_data.model_dump(),
+            is_reference=False,
+            measured_by_id=current_user.id,
+            measured_at=datetime.utcnow()
+        )
+        db.add(hub)
+        db.flush()
+        record_change(db, Hub, hub.id)
+        return hub
+
+    return idempotent(db, idempotency_key, current_user, "POST /hubs", hub_data, HubResponse, create)
 
 
 @router.put("/{hub_id}", response_model=HubResponse)
@@ -112,6 +185,7 @@ def update_hub(
     hub.measured_at = datetime.utcnow()
     hub.is_reference = False  # Once edited, it's no longer reference data
 
+    record_change(db, Hub, hub.id)
     db.commit()
     db.refresh(hub)
     return hub
@@ -134,6 +208,7 @@ def delete_hub(
             detail="Only admins can delete reference data"
         )
 
+    record_change(db, Hub, hub.id, DELETE)
     db.delete(hub)
     db.commit()
     return {"message": "Hub deleted"}
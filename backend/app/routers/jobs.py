@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db
+from ..models.job import Job
+from ..models.user import User
+from ..schemas.job import JobCreate, JobKindInfo, JobResponse
+from ..services.jobs import cancel, enqueue, load_job_kinds
+from ..utils.auth import require_admin
+from ..utils.tracing import TracedRoute
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=TracedRoute)
+
+
+@router.get("/kinds", response_model=List[JobKindInfo])
+def list_job_kinds(current_user: User = Depends(require_admin)):
+    """Job kinds that can be started (admin only)"""
+    return [JobKindInfo(kind=k.name, description=k.description) for k in load_job_kinds().values()]
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+def create_job(
+    job_data: JobCreate,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Queue a background job (admin only); poll GET /jobs/{id} for progress"""
+    try:
+        return enqueue(db, job_data.kind, job_data.params, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("", response_model=List[JobResponse])
+def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed|cancelled)$"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Recent jobs, newest first (admin only)"""
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    return query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit).all()
+
+
+def _get_job(db: Session, job_id: int) -> Job:
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    return _get_job(db, job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(
+    job_id: int,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Cancel a queued job, or ask a running one to stop (admin only)"""
+    return cancel(db, _get_job(db, job_id))
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import Any, Dict, List
+from ..models.user import User
+from ..utils.auth import require_admin
+from ..utils.profiling import delete_profile, list_profiles, profile_path, profile_text
+from ..utils.tracing import TracedRoute
+
+router = APIRouter(prefix="/profiles", tags=["profiles"], route_class=TracedRoute)
+
+
+@router.get("", response_model=List[Dict[str, Any]])
+def list_request_profiles(current_user: User = Depends(require_admin)):
+    """Stored request profiles, newest first (admin only). Send `X-Profile: 1` to capture one."""
+    return list_profiles()
+
+
+@router.get("/{profile_id}")
+def get_request_profile(
+    profile_id: str,
+    format: str = Query("pstats", pattern="^(pstats|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    current_user: User = Depends(require_admin)
+):
+    """Download a profile as pstats (snakeviz, `python -m pstats`) or a text summary (admin only)"""
+    if format == "text":
+        text = profile_text(profile_id, sort)
+        if text is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return PlainTextResponse(text)
+
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+@router.delete("/{profile_id}")
+def delete_request_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    if not delete_profile(profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"message": "Profile deleted"}
@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 from typing import List, Optional
 from datetime import datetime
 from ..database import get_db
 from ..models.rim import Rim
 from ..models.user import User
-from ..schemas.rim import RimCreate, RimUpdate, RimResponse
+from ..schemas.rim import RimCreate, RimUpdate, RimResponse, MeasuredBy
+from ..schemas.catalog import ImportResult
+from ..services.catalog_changes import DELETE, record_change
+from ..services.idempotency import idempotent
+from ..services.projection import apply_projection, parse_fields, project_rows
+from ..services.serialization import ColumnRows
+from ..services.compact_formats import VARY, list_response, negotiate
+from ..services.catalog_io import (
+    EXPORT_EXTENSIONS, EXPORT_FORMATS, detect_format, export_columns, export_format, import_upload, stream_export,
+)
 from ..utils.auth import get_current_user
+from ..utils.tracing import TracedRoute
 
-router = APIRouter(prefix="/rims", tags=["rims"])
+router = APIRouter(prefix="/rims", tags=["rims"], route_class=TracedRoute)
+
+# Full list rows, read as column tuples (see services/serialization.py)
+LIST_ROWS = ColumnRows(Rim, RimResponse, joins={
+    "measured_by": (MeasuredBy, User, Rim.measured_by_id == User.id),
+})
 
 
 @router.get("", response_model=List[RimResponse])
@@ -21,11 +37,16 @@ def list_rims(
     max_erd: Optional[float] = None,
     tire_type: Optional[str] = None,
     measured_only: bool = False,
+    fields: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Rim)
+    projection = parse_fields(fields, RimResponse)
+    media_type = negotiate(accept)
+    # Full rows skip the ORM and response_model validation: columns go straight to JSON
+    query = db.query(Rim) if projection else LIST_ROWS.query(db)
 
     if search:
         query = query.filter(
@@ -56,7 +77,13 @@ def list_rims(
     # Order by: measured first, then by manufacturer/model
     query = query.order_by(Rim.is_reference.asc(), Rim.manufacturer, Rim.model)
 
-    return query.offset(skip).limit(limit).all()
+    if projection:
+        # Sparse fieldset, e.g. ?fields=manufacturer,model,erd
+        query = apply_projection(query, Rim, projection)
+        rows = query.offset(skip).limit(limit).all()
+        return list_response(project_rows(rows, RimResponse, projection), projection, media_type)
+
+    return list_response(LIST_ROWS.render(query.offset(skip).limit(limit)), LIST_ROWS.fields, media_type)
 
 
 @router.get("/manufacturers", response_model=List[str])
@@ -65,9 +92,51 @@ def list_rim_manufacturers(db: Session = Depends(get_db)):
     return [r[0] for r in results if r[0]]
 
 
+@router.get("/export")
+def export_rims(
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson|columnar|msgpack)$"),
+    accept: Optional[str] = Header(None),
+):
+    """
+    Stream the full rim table as CSV (default), NDJSON or columnar
+    blocks; without `format`, Accept can ask for columnar JSON or MessagePack.
+    """
+    fmt = export_format(format, accept)
+    return StreamingResponse(
+        stream_export(Rim, export_columns(RimCreate), fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="rims.{EXPORT_EXTENSIONS[fmt]}"', **VARY},
+    )
+
+
+@router.post("/import", response_model=ImportResult)
+def import_rims(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Bulk-add measured rims from a CSV or NDJSON upload, reporting bad rows."""
+    fmt = detect_format(format, file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=400,
+            detail="Could not determine file format; pass ?format=csv or ?format=ndjson"
+        )
+
+    return import_upload(
+        db, Rim, RimCreate, file.file, fmt,
+        defaults={
+            "is_reference": False,
+            "measured_by_id": current_user.id,
+            "measured_at": datetime.utcnow(),
+        },
+    )
+
+
 @router.get("/{rim_id}", response_model=RimResponse)
 def get_rim(rim_id: int, db: Session = Depends(get_db)):
-    rim = db.query(Rim).filter(Rim.id == rim_id).first()
+    rim = db.query(Rim).options(joinedload(Rim.measured_by)).filter(Rim.id == rim_id).first()
     if not rim:
         raise HTTPException(status_code=404, detail="Rim not found")
     return rim
@@ -76,19 +145,23 @@ def get_rim(rim_id: int, db: Session = Depends(get_db)):
 @router.post("", response_model=RimResponse)
 def create_rim(
     rim_data: RimCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    rim = Rim(
-        **rim_data.model_dump(),
-        is_reference=False,
-        measured_by_id=current_user.id,
-        measured_at=datetime.utcnow()
-    )
-    db.add(rim)
-    db.commit()
-    db.refresh(rim)
-    return rim
+    def create():
+        rim = Rim(
+            **rim_data.model_dump(),
+            is_reference=False,
+            measured_by_id=current_user.id,
+            measured_at=datetime.utcnow()
+        )
+        db.add(rim)
+        db.flush()
+        record_change(db, Rim, rim.id)
+        return rim
+
+    return idempotent(db, idempotency_key, current_user, "POST /rims", rim_data, RimResponse, create)
 
 
 @router.put("/{rim_id}", response_model=RimResponse)
@@ -112,6 +185,7 @@ def update_rim(
     rim.measured_at = datetime.utcnow()
     rim.is_reference = False  # Once edited, it's no longer reference data
 
+    record_change(db, Rim, rim.id)
     db.commit()
     db.refresh(rim)
     return rim
@@ -134,6 +208,7 @@ def delete_rim(
             detail="Only admins can delete reference data"
         )
 
+    record_change(db, Rim, rim.id, DELETE)
     db.delete(rim)
     db.commit()
     return {"message": "Rim deleted"}
@@ -5,8 +5,9 @@ from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserResponse, UserUpdate
 from ..utils.auth import require_admin, get_current_user
+from ..utils.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TracedRoute)
 
 
 @router.get("", response_model=List[UserResponse])
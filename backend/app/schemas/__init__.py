@@ -1,13 +1,25 @@
 from .user import UserResponse, UserUpdate
 from .rim import RimCreate, RimUpdate, RimResponse
 from .hub import HubCreate, HubUpdate, HubResponse
-from .build import BuildCreate, BuildResponse
+from .build import (
+    BuildCreate, BuildResponse, BuildSummary, SpokeOrder, SpokeOrderRequest,
+    BulkBuildCreate, BulkBuildResult,
+)
 from .calculator import SpokeCalculation, SpokeResult
+from .catalog import ImportResult, ImportRowError, CatalogChanges
+from .analytics import ShopAnalytics
+from .batch import BatchRequest, BatchResponse
+from .job import JobCreate, JobResponse, JobKindInfo
 
 __all__ = [
     "UserResponse", "UserUpdate",
     "RimCreate", "RimUpdate", "RimResponse",
     "HubCreate", "HubUpdate", "HubResponse",
-    "BuildCreate", "BuildResponse",
+    "BuildCreate", "BuildResponse", "BuildSummary", "SpokeOrder", "SpokeOrderRequest",
+    "BulkBuildCreate", "BulkBuildResult",
     "SpokeCalculation", "SpokeResult",
+    "ImportResult", "ImportRowError", "CatalogChanges",
+    "ShopAnalytics",
+    "BatchRequest", "BatchResponse",
+    "JobCreate", "JobResponse", "JobKindInfo",
 ]
@@ -0,0 +1,47 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class MonthlyBuilds(BaseModel):
+    month: date
+    builds: int
+
+
+class ComponentUsage(BaseModel):
+    id: int
+    manufacturer: Optional[str] = None  # None if the component was deleted
+    model: Optional[str] = None
+    builds: int
+
+
+class MechanicUsage(BaseModel):
+    id: int
+    name: Optional[str] = None
+    builds: int
+
+
+class CrossPatternUsage(BaseModel):
+    cross_pattern_left: int
+    cross_pattern_right: int
+    builds: int
+
+
+class SpokeLengthBucket(BaseModel):
+    length: float  # lower bound of the bucket, mm
+    count: int  # build sides cut to this length
+
+
+class MonthlySpokeLengths(BaseModel):
+    month: date
+    buckets: List[SpokeLengthBucket]
+
+
+class ShopAnalytics(BaseModel):
+    total_builds: int
+    builds_per_month: List[MonthlyBuilds]
+    rims: List[ComponentUsage]
+    hubs: List[ComponentUsage]
+    mechanics: List[MechanicUsage]
+    cross_patterns: List[CrossPatternUsage]
+    spoke_lengths: List[MonthlySpokeLengths]
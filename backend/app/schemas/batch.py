@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+MAX_BATCH_REQUESTS = 20
+
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None  # echoed back to match responses
+    method: Literal["GET", "POST"] = "GET"
+    path: str  # e.g. "/rims"
+    params: Dict[str, Any] = {}
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from .rim import RimResponse
 from .hub import HubResponse
 
@@ -41,6 +41,12 @@ class CreatedBy(BaseModel):
         from_attributes = True
 
 
+class CalculationInputs(BaseModel):
+    erd: float
+    rim_offset: float
+    spoke_hole_diameter: float
+
+
 class BuildResponse(BaseModel):
     id: int
     rim: RimResponse
@@ -65,6 +71,80 @@ class BuildResponse(BaseModel):
     internal_notes: Optional[str] = None
     created_by: CreatedBy
     created_at: datetime
+    calculation_inputs: Optional[CalculationInputs] = None  # None for builds saved before snapshots
 
     class Config:
         from_attributes = True
+
+
+class ComponentSummary(BaseModel):
+    id: int
+    manufacturer: str
+    model: str
+
+
+class BuildSummary(BaseModel):
+    id: int
+    rim: ComponentSummary
+    hub: ComponentSummary
+    spoke_count: int
+    cross_pattern_left: int
+    cross_pattern_right: int
+    spoke_length_left: float
+    spoke_length_right: float
+    customer_name: Optional[str] = None
+    created_by: CreatedBy
+    created_at: datetime
+
+
+class SpokeOrderRequest(BaseModel):
+    build_ids: Optional[List[int]] = None
+    since: Optional[datetime] = None  # created_at >= since
+    until: Optional[datetime] = None  # created_at < until
+    step: float = Field(1.0, gt=0)  # round lengths to this many mm
+
+
+class SpokeOrderLine(BaseModel):
+    length: float
+    side: str  # left, right
+    quantity: int
+    builds: int
+
+
+class SpokeOrder(BaseModel):
+    build_count: int
+    total_spokes: int
+    lines: List[SpokeOrderLine]
+
+
+class BulkBuildItem(BaseModel):
+    """One build spec; spoke lengths and angles are calculated server-side."""
+    rim_id: int
+    hub_id: int
+    spoke_count: int
+    cross_pattern_left: int
+    cross_pattern_right: int
+    quantity: int = Field(1, ge=1, le=500)  # identical builds to create
+    customer_name: Optional[str] = None
+    customer_notes: Optional[str] = None
+    internal_notes: Optional[str] = None
+
+
+class BulkBuildCreate(BaseModel):
+    items: List[BulkBuildItem] = Field(..., min_length=1, max_length=500)
+    atomic: bool = False  # create nothing if any item fails
+
+
+class BulkBuildCreated(BaseModel):
+    index: int
+    ids: List[int]
+
+
+class BulkBuildError(BaseModel):
+    index: int
+    error: str
+
+
+class BulkBuildResult(BaseModel):
+    created: List[BulkBuildCreated]
+    errors: List[BulkBuildError]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+from .rim import RimResponse
+from .hub import HubResponse
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+
+class CatalogChanges(BaseModel):
+    version: int
+    full: bool
+    rims: List[RimResponse] = []
+    hubs: List[HubResponse] = []
+    deleted_rims: List[int] = []
+    deleted_hubs: List[int] = []
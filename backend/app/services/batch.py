@@ -0,0 +1,83 @@
+"""
+Run several API calls inside one HTTP request (POST /batch).
+
+Sub-requests are dispatched in-process through the app itself, so routing,
+validation and response models are exactly those of the real endpoints.
+The batch request's user is verified once and reused by every sub-request
+(see `batch_user`), and independent sub-requests run concurrently. Each
+sub-request gets its own pooled DB session, because a SQLAlchemy session
+cannot be shared between concurrently running handlers.
+"""
+
+import asyncio
+import re
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..models.user import User
+from ..schemas.batch import BatchSubRequest
+from ..utils.auth import batch_user
+
+# Sub-requests running at once per batch; each also takes a SHARED
+# admission slot, so batches stay within the threadpool budget
+MAX_CONCURRENCY = 6
+
+# Non-GET operations allowed in a batch (read-only calculations)
+ALLOWED_POSTS = {"/calculate"}
+
+# GET paths excluded from batching (streamed downloads, nested batches)
+BLOCKED_PREFIXES = ("/batch",)
+BLOCKED_SUFFIXES = ("/export",)
+
+# Plain path segments only: no percent-encoding, dot segments, empty
+# segments or fragments, so the path checked below is the path routed
+_PATH = re.compile(r"^(/[A-Za-z0-9_~-][A-Za-z0-9_.~-]*)+/?$")
+
+
+def check_sub_request(sub: BatchSubRequest) -> Optional[str]:
+    """Reason a sub-request may not run in a batch, or None if it may."""
+    path, _, query = sub.path.partition("?")
+    if not _PATH.match(path) or "%" in query or "#" in query:
+        return "path must be a plain absolute API path such as /rims; pass query values in params"
+    route = path.rstrip("/").lower()
+    if route.startswith(BLOCKED_PREFIXES) or route.endswith(BLOCKED_SUFFIXES):
+        return f"{route} cannot be batched"
+    if sub.method != "GET" and route not in ALLOWED_POSTS:
+        return f"only GET requests and POST {', '.join(sorted(ALLOWED_POSTS))} can be batched"
+    return None
+
+
+def _response_body(response: httpx.Response) -> Any:
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return response.json()
+    return response.text
+
+
+async def run_batch(app, requests: List[BatchSubRequest], user: User, authorization: Optional[str]) -> List[Dict[str, Any]]:
+    """Run the sub-requests as `user` and return their statuses and bodies in order."""
+    headers = {"authorization": authorization} if authorization else {}
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    token = batch_user.set(user)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://batch") as client:
+            async def run(sub: BatchSubRequest) -> Dict[str, Any]:
+                error = check_sub_request(sub)
+                if error:
+                    return {"id": sub.id, "status": 400, "body": {"detail": error}}
+
+                async with semaphore:
+                    response = await client.request(
+                        sub.method,
+                        sub.path,
+                        params=sub.params,
+                        json=sub.body if sub.method == "POST" else None,
+                        headers=headers,
+                    )
+                return {"id": sub.id, "status": response.status_code, "body": _response_body(response)}
+
+            return await asyncio.gather(*(run(sub) for sub in requests))
+    finally:
+        batch_user.reset(token)
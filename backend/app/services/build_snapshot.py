@@ -0,0 +1,86 @@
+"""
+Immutable component snapshots stored on each build.
+
+Catalog rims and hubs are edited in place, so a build sheet rendered from
+the live rows shows today's specs rather than the ones the spokes were cut
+to. Each build instead stores the rim/hub specs and calculation inputs at
+save time, and responses are rendered from that snapshot with no joins.
+"""
+
+from typing import Any, Dict
+
+from ..models.build import Build
+from ..models.hub import Hub
+from ..models.rim import Rim
+from ..models.user import User
+from ..schemas.build import BuildResponse, CalculationInputs, CreatedBy
+from ..schemas.hub import HubResponse
+from ..schemas.rim import RimResponse
+
+SNAPSHOT_VERSION = 1
+
+_BUILD_COLUMNS = [
+    c.key for c in Build.__table__.columns
+    if c.key in BuildResponse.model_fields
+]
+
+
+def snapshot_components(rim: Rim, hub: Hub, created_by: User) -> Dict[str, Any]:
+    """Capture the specs and inputs a build is calculated from (nulls omitted)."""
+    return {
+        "v": SNAPSHOT_VERSION,
+        "rim": RimResponse.model_validate(rim).model_dump(mode="json", exclude_none=True),
+        "hub": HubResponse.model_validate(hub).model_dump(mode="json", exclude_none=True),
+        "created_by": {"id": created_by.id, "name": created_by.name},
+        "inputs": {
+            "erd": rim.erd,
+            "rim_offset": rim.drilling_offset or 0,
+            "spoke_hole_diameter": hub.spoke_hole_diameter or 2.6,
+        },
+    }
+
+
+def build_response(build: Build) -> BuildResponse:
+    """
+    Render a build from its own row and snapshot.
+
+    Builds saved before snapshots existed fall back to the live rim/hub
+    relationships (lazy-loaded).
+    """
+    snapshot = build.component_snapshot
+    if not snapshot:
+        return BuildResponse.model_validate(build)
+
+    data = {key: getattr(build, key) for key in _BUILD_COLUMNS}
+    data["rim"] = snapshot["rim"]
+    data["hub"] = snapshot["hub"]
+    data["created_by"] = snapshot["created_by"]
+    data["calculation_inputs"] = snapshot.get("inputs")
+    return BuildResponse.model_validate(data)
+
+
+# BuildResponse fields served from the snapshot rather than build columns,
+# with the schema each is rendered through
+SNAPSHOT_SCHEMAS = {
+    "rim": RimResponse,
+    "hub": HubResponse,
+    "created_by": CreatedBy,
+    "calculation_inputs": CalculationInputs,
+}
+SNAPSHOT_FIELDS = tuple(SNAPSHOT_SCHEMAS)
+
+
+def snapshot_fields(build: Build, names) -> Dict[str, Any]:
+    """Snapshot-backed fields for a sparse (`?fields=`) build listing."""
+    snapshot = build.component_snapshot
+    if not snapshot:
+        full = BuildResponse.model_validate(build).model_dump(mode="json")
+        return {name: full[name] for name in names}
+
+    # Through the response schemas, as build_response renders them: the
+    # snapshot omits nulls and may hold ints where the schema has floats
+    fields = {}
+    for name in names:
+        value = snapshot.get("inputs") if name == "calculation_inputs" else snapshot[name]
+        fields[name] = None if value is None else SNAPSHOT_SCHEMAS[name].model_validate(value).model_dump(mode="json")
+    return fields
@@ -0,0 +1,229 @@
+"""
+Shop analytics from incrementally maintained monthly aggregates.
+
+Every build adds one to a handful of `build_stats` counters for its
+creation month (its rim, hub, mechanic, cross pattern and spoke length
+buckets), and deleting it subtracts the same, inside the build's own
+transaction. Dashboards only sum those counters, so their cost depends on
+the number of distinct components, mechanics and months, never on how many
+builds have accumulated.
+"""
+
+import math
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..models.build import Build
+from ..models.build_stat import BuildStat
+from ..models.hub import Hub
+from ..models.rim import Rim
+from ..models.user import User
+
+TOTAL = "total"
+RIM = "rim"
+HUB = "hub"
+MECHANIC = "mechanic"
+CROSS_PATTERN = "cross_pattern"
+SPOKE_LENGTH = "spoke_length"
+
+# Histogram bucket width in mm
+SPOKE_LENGTH_BUCKET = 1.0
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def month_start(value: Optional[datetime]) -> date:
+    value = value or datetime.now(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def spoke_length_bucket(length: float) -> str:
+    return f"{math.floor(length / SPOKE_LENGTH_BUCKET) * SPOKE_LENGTH_BUCKET:g}"
+
+
+def build_stat_keys(
+    rim_id: int,
+    hub_id: int,
+    created_by_id: int,
+    cross_pattern_left: int,
+    cross_pattern_right: int,
+    spoke_length_left: float,
+    spoke_length_right: float,
+) -> Counter:
+    """(dimension, key) counters one build contributes to. Each side counts once in the histogram."""
+    return Counter([
+        (TOTAL, ""),
+        (RIM, str(rim_id)),
+        (HUB, str(hub_id)),
+        (MECHANIC, str(created_by_id)),
+        (CROSS_PATTERN, f"{cross_pattern_left}/{cross_pattern_right}"),
+        (SPOKE_LENGTH, spoke_length_bucket(spoke_length_left)),
+        (SPOKE_LENGTH, spoke_length_bucket(spoke_length_right)),
+    ])
+
+
+_KEY_COLUMNS = (
+    "rim_id", "hub_id", "created_by_id",
+    "cross_pattern_left", "cross_pattern_right",
+    "spoke_length_left", "spoke_length_right",
+)
+
+
+def _keys_for(build: Build) -> Counter:
+    return build_stat_keys(*(getattr(build, name) for name in _KEY_COLUMNS))
+
+
+def _increment(db: Session, counts: Dict[Tuple[str, str, date], int]) -> None:
+    """Add `counts` to the matching rows, creating missing ones (one upsert)."""
+    rows = [
+        {"dimension": dimension, "key": key, "month": month, "count": count}
+        for (dimension, key, month), count in sorted(counts.items())
+        if count
+    ]
+    if not rows:
+        return
+
+    insert = _INSERTS[db.get_bind().dialect.name]
+    stmt = insert(BuildStat).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["dimension", "key", "month"],
+        set_={"count": BuildStat.count + stmt.excluded["count"]},
+    ))
+
+
+def record_builds(db: Session, builds: Iterable[Build], sign: int = 1) -> None:
+    """
+    Count flushed builds into the aggregates (sign=-1 to remove them).
+
+    Call in the same transaction as the insert or delete.
+    """
+    counts: Counter = Counter()
+    for build in builds:
+        month = month_start(build.created_at)
+        for (dimension, key), n in _keys_for(build).items():
+            counts[(dimension, key, month)] += sign * n
+    _increment(db, counts)
+
+
+def record_build(db: Session, build: Build, sign: int = 1) -> None:
+    record_builds(db, [build], sign)
+
+
+def record_build_rows(db: Session, rows: Iterable[Dict[str, Any]], created_at: Iterable[datetime]) -> None:
+    """Count builds inserted from column dicts (bulk inserts), given their created_at values."""
+    counts: Counter = Counter()
+    for row, created in zip(rows, created_at):
+        month = month_start(created)
+        for (dimension, key), n in build_stat_keys(*(row[name] for name in _KEY_COLUMNS)).items():
+            counts[(dimension, key, month)] += n
+    _increment(db, counts)
+
+
+def rebuild_build_stats(db: Session) -> int:
+    """Recompute every aggregate from the builds table. Returns builds counted."""
+    db.execute(delete(BuildStat))
+
+    counts: Counter = Counter()
+    total = 0
+    query = db.query(
+        Build.created_at, Build.rim_id, Build.hub_id, Build.created_by_id,
+        Build.cross_pattern_left, Build.cross_pattern_right,
+        Build.spoke_length_left, Build.spoke_length_right,
+    ).yield_per(5000)
+    for created_at, *values in query:
+        month = month_start(created_at)
+        for (dimension, key), n in build_stat_keys(*values).items():
+            counts[(dimension, key, month)] += n
+        total += 1
+
+    _increment(db, counts)
+    return total
+
+
+def _summed(db: Session, dimension: str, since: Optional[date], until: Optional[date], *group_by):
+    total = func.sum(BuildStat.count)
+    query = db.query(*group_by, total).filter(BuildStat.dimension == dimension)
+    if since:
+        query = query.filter(BuildStat.month >= month_start(since))
+    if until:
+        query = query.filter(BuildStat.month <= month_start(until))
+    return query.group_by(*group_by).having(total > 0), total
+
+
+def _top(db: Session, dimension: str, since, until, top: int) -> List[Tuple[int, int]]:
+    query, total = _summed(db, dimension, since, until, BuildStat.key)
+    return [(int(key), count) for key, count in query.order_by(total.desc(), BuildStat.key).limit(top)]
+
+
+def _component_usage(db: Session, model, dimension: str, since, until, top: int) -> List[Dict[str, Any]]:
+    counts = _top(db, dimension, since, until, top)
+    labels = {
+        row.id: row
+        for row in db.query(model.id, model.manufacturer, model.model)
+        .filter(model.id.in_([component_id for component_id, _ in counts]))
+    }
+    return [
+        {
+            "id": component_id,
+            "manufacturer": getattr(labels.get(component_id), "manufacturer", None),
+            "model": getattr(labels.get(component_id), "model", None),
+            "builds": count,
+        }
+        for component_id, count in counts
+    ]
+
+
+def shop_analytics(
+    db: Session,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    top: int = 10,
+) -> Dict[str, Any]:
+    """Dashboard numbers for builds created in the months from `since` to `until`."""
+    per_month, _ = _summed(db, TOTAL, since, until, BuildStat.month)
+    builds_per_month = [
+        {"month": month, "builds": count}
+        for month, count in per_month.order_by(BuildStat.month)
+    ]
+
+    mechanic_counts = _top(db, MECHANIC, since, until, top)
+    names = dict(
+        db.query(User.id, User.name)
+        .filter(User.id.in_([user_id for user_id, _ in mechanic_counts]))
+    )
+
+    patterns, total = _summed(db, CROSS_PATTERN, since, until, BuildStat.key)
+    cross_patterns = []
+    for key, count in patterns.order_by(total.desc(), BuildStat.key):
+        left, right = key.split("/")
+        cross_patterns.append({
+            "cross_pattern_left": int(left),
+            "cross_pattern_right": int(right),
+            "builds": count,
+        })
+
+    lengths, _ = _summed(db, SPOKE_LENGTH, since, until, BuildStat.month, BuildStat.key)
+    histogram: Dict[date, List[Dict[str, Any]]] = {}
+    for month, key, count in lengths:
+        histogram.setdefault(month, []).append({"length": float(key), "count": count})
+
+    return {
+        "total_builds": sum(row["builds"] for row in builds_per_month),
+        "builds_per_month": builds_per_month,
+        "rims": _component_usage(db, Rim, RIM, since, until, top),
+        "hubs": _component_usage(db, Hub, HUB, since, until, top),
+        "mechanics": [
+            {"id": user_id, "name": names.get(user_id), "builds": count}
+            for user_id, count in mechanic_counts
+        ],
+        "cross_patterns": cross_patterns,
+        "spoke_lengths": [
+            {"month": month, "buckets": sorted(buckets, key=lambda b: b["length"])}
+            for month, buckets in sorted(histogram.items())
+        ],
+    }
@@ -0,0 +1,132 @@
+"""
+Create many builds (program/fleet orders) in one transaction.
+
+Rims and hubs are loaded with one query each, lengths are calculated once
+per distinct spec, and every build is written by a single multi-row
+INSERT ... RETURNING, so 100 builds cost about the same as one.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..models.build import Build
+from ..models.hub import Hub
+from ..models.rim import Rim
+from ..models.user import User
+from ..schemas.build import BulkBuildCreate, BulkBuildItem
+from ..utils.tracing import span
+from .build_snapshot import snapshot_components
+from .build_stats import record_build_rows
+from .spoke_calculator import calculate_full_analysis
+
+# Analysis fields copied onto each build
+_ANALYSIS_FIELDS = (
+    "tension_percent_left", "tension_percent_right",
+    "bracing_angle_left", "bracing_angle_right",
+    "wrap_angle_left", "wrap_angle_right",
+    "total_angle_left", "total_angle_right",
+    "theta_angle_left", "theta_angle_right",
+)
+
+MAX_BULK_BUILDS = 1000
+
+
+def _analysis(rim: Rim, hub: Hub, item: BulkBuildItem) -> Dict[str, Any]:
+    """Spoke lengths (rounded to stocked sizes, as the calculator page saves) and angles."""
+    missing = [
+        name for name in ("flange_diameter_left", "flange_diameter_right", "flange_offset_left", "flange_offset_right")
+        if getattr(hub, name) is None
+    ]
+    if missing:
+        raise ValueError(f"Hub {hub.id} is missing {', '.join(missing)}")
+    if item.spoke_count <= 0 or item.spoke_count % 2:
+        raise ValueError("spoke_count must be a positive even number")
+
+    with span("calculate", rim_id=rim.id, hub_id=hub.id):
+        result = calculate_full_analysis(
+            erd=rim.erd,
+            flange_diameter_left=hub.flange_diameter_left,
+            flange_diameter_right=hub.flange_diameter_right,
+            flange_offset_left=hub.flange_offset_left,
+            flange_offset_right=hub.flange_offset_right,
+            spoke_count=item.spoke_count,
+            cross_pattern_left=item.cross_pattern_left,
+            cross_pattern_right=item.cross_pattern_right,
+            spoke_hole_diameter=hub.spoke_hole_diameter or 2.6,
+            rim_offset=rim.drilling_offset or 0,
+        )
+    return {
+        "spoke_length_left": result["spoke_length_left_rounded"],
+        "spoke_length_right": result["spoke_length_right_rounded"],
+        **{name: result[name] for name in _ANALYSIS_FIELDS},
+    }
+
+
+def create_builds(db: Session, request: BulkBuildCreate, created_by: User) -> Dict[str, Any]:
+    """
+    Validate, calculate and insert every item; returns created ids and per-item errors.
+
+    Items that fail are skipped (or, with `atomic`, nothing is created).
+    The caller commits.
+    """
+    total = sum(item.quantity for item in request.items)
+    if total > MAX_BULK_BUILDS:
+        raise ValueError(f"At most {MAX_BULK_BUILDS} builds per request (got {total})")
+
+    rims = {r.id: r for r in db.query(Rim).filter(Rim.id.in_({i.rim_id for i in request.items}))}
+    hubs = {h.id: h for h in db.query(Hub).filter(Hub.id.in_({i.hub_id for i in request.items}))}
+
+    analyses: Dict[Tuple, Dict[str, Any]] = {}
+    snapshots: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    rows: List[Dict[str, Any]] = []
+    owners: List[int] = []  # item index for each row
+    errors = []
+
+    for index, item in enumerate(request.items):
+        rim, hub = rims.get(item.rim_id), hubs.get(item.hub_id)
+        if rim is None:
+            errors.append({"index": index, "error": f"Rim {item.rim_id} not found"})
+            continue
+        if hub is None:
+            errors.append({"index": index, "error": f"Hub {item.hub_id} not found"})
+            continue
+
+        spec = (item.rim_id, item.hub_id, item.spoke_count, item.cross_pattern_left, item.cross_pattern_right)
+        try:
+            if spec not in analyses:
+                analyses[spec] = _analysis(rim, hub, item)
+        except (ValueError, ZeroDivisionError) as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+
+        if (rim.id, hub.id) not in snapshots:
+            snapshots[(rim.id, hub.id)] = snapshot_components(rim, hub, created_by)
+
+        row = {
+            **item.model_dump(exclude={"quantity"}),
+            **analyses[spec],
+            "created_by_id": created_by.id,
+            "component_snapshot": snapshots[(rim.id, hub.id)],
+        }
+        rows.extend([row] * item.quantity)
+        owners.extend([index] * item.quantity)
+
+    if not rows or (errors and request.atomic):
+        return {"created": [], "errors": errors}
+
+    inserted = db.execute(
+        insert(Build).returning(Build.id, Build.created_at, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    record_build_rows(db, rows, [created_at for _, created_at in inserted])
+
+    created: Dict[int, List[int]] = {}
+    for index, (build_id, _) in zip(owners, inserted):
+        created.setdefault(index, []).append(build_id)
+
+    return {
+        "created": [{"index": index, "ids": ids} for index, ids in created.items()],
+        "errors": errors,
+    }
@@ -0,0 +1,137 @@
+"""
+Catalog change log for delta sync (GET /catalog/changes).
+
+Every rim/hub write bumps a single-row version counter and records the
+affected ids in `catalog_changes`, in the same transaction as the write.
+The counter's row lock is held until commit, so versions become visible
+in order and a client that has seen version N can never later miss a
+change numbered <= N.
+
+Only the latest change per entity is kept (older entries are replaced),
+so the log stays about as large as the catalog plus its tombstones.
+"""
+
+from typing import Dict, Iterable, List, Type
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
+
+from ..models.catalog_change import CatalogChange, CatalogVersion
+from ..models.hub import Hub
+from ..models.rim import Rim
+
+ENTITY_NAMES = {Rim: "rim", Hub: "hub"}
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _increment_version(db: Session):
+    return db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == 1)
+        .values(version=CatalogVersion.version + 1)
+        .returning(CatalogVersion.version)
+    ).scalar()
+
+
+def next_version(db: Session) -> int:
+    """Increment the catalog version, locking the counter until commit."""
+    version = _increment_version(db)
+    if version is None:
+        # The row is seeded with the table; a database that predates that
+        # gets it here, without failing if a concurrent writer wins the race
+        insert_row = _INSERTS[db.get_bind().dialect.name]
+        db.execute(insert_row(CatalogVersion).values(id=1, version=0).on_conflict_do_nothing(index_elements=["id"]))
+        version = _increment_version(db)
+    return version
+
+
+def current_version(db: Session) -> int:
+    version = db.query(CatalogVersion.version).filter(CatalogVersion.id == 1).scalar()
+    return version or 0
+
+
+def record_changes(db: Session, model: Type, ids: Iterable[int], op: str = UPSERT, new: bool = False) -> None:
+    """
+    Log a change to rims or hubs. Call before the write's commit.
+
+    `new` skips replacing earlier entries, for freshly inserted ids.
+    """
+    ids = list(ids)
+    if not ids:
+        return
+
+    entity = ENTITY_NAMES[model]
+    version = next_version(db)
+
+    if not new:
+        db.execute(
+            delete(CatalogChange).where(
+                CatalogChange.entity == entity,
+                CatalogChange.entity_id.in_(ids),
+            )
+        )
+    db.execute(insert(CatalogChange), [
+        {"version": version, "entity": entity, "entity_id": entity_id, "op": op}
+        for entity_id in ids
+    ])
+
+
+def record_change(db: Session, model: Type, entity_id: int, op: str = UPSERT) -> None:
+    record_changes(db, model, [entity_id], op)
+
+
+def changes_since(db: Session, since: int) -> Dict:
+    """
+    Rows upserted and ids deleted after version `since`.
+
+    since=0 (or a version from a different database) returns a full
+    snapshot, since rows older than the change log have no entries.
+    """
+    # Read the version first: rows read afterwards can only be newer
+    version = current_version(db)
+
+    if since <= 0 or since > version:
+        return {
+            "version": version,
+            "full": True,
+            "rims": db.query(Rim).options(joinedload(Rim.measured_by)).order_by(Rim.id).all(),
+            "hubs": db.query(Hub).options(joinedload(Hub.measured_by)).order_by(Hub.id).all(),
+            "deleted_rims": [],
+            "deleted_hubs": [],
+        }
+
+    changed: Dict[str, Dict[str, List[int]]] = {
+        "rim": {UPSERT: [], DELETE: []},
+        "hub": {UPSERT: [], DELETE: []},
+    }
+    rows = db.query(CatalogChange.entity, CatalogChange.entity_id, CatalogChange.op).filter(
+        CatalogChange.version > since,
+        CatalogChange.version <= version,
+    )
+    for entity, entity_id, op in rows:
+        changed[entity][op].append(entity_id)
+
+    def load(model, ids):
+        if not ids:
+            return []
+        return (
+            db.query(model)
+            .options(joinedload(model.measured_by))
+            .filter(model.id.in_(ids))
+            .order_by(model.id)
+            .all()
+        )
+
+    return {
+        "version": version,
+        "full": False,
+        "rims": load(Rim, changed["rim"][UPSERT]),
+        "hubs": load(Hub, changed["hub"][UPSERT]),
+        "deleted_rims": sorted(changed["rim"][DELETE]),
+        "deleted_hubs": sorted(changed["hub"][DELETE]),
+    }
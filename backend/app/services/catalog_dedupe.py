@@ -0,0 +1,297 @@
+"""
+Cross-source duplicate detection for the rim and hub catalogs.
+
+Freespoke, Spocalc and shop measurements spell the same component
+differently ("DT Swiss" / "DT-Swiss", "XR 31T" / "XR31T"). Comparing every
+pair of rows is O(n²), so candidates are first grouped into blocks that any
+real duplicate must share:
+
+    rims: manufacturer token + ISO size + ERD bucket
+    hubs: manufacturer token + position + flange diameter bucket
+
+Each row is compared only with rows in its own bucket and the next one up
+(so values straddling a bucket edge still meet). Oversized blocks fall back
+to a sorted-neighbourhood window. Matches are grouped with union-find and
+reported as merge proposals; nothing is modified.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.build import Build
+from ..models.hub import Hub
+from ..models.rim import Rim
+
+
+# Common manufacturer spellings that differ by more than punctuation
+MANUFACTURER_ALIASES = {
+    "stansnotubes": "stans",
+    "notubes": "stans",
+    "sunringle": "sun",
+    "hplusson": "hson",
+    "hson": "hson",
+    "industrynine": "i9",
+    "inine": "i9",
+}
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces."""
+    if not value:
+        return ""
+    text = unicodedata.normalize("NFKD", value)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("+", " plus ").replace("&", " and ")
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    return " ".join(text.split())
+
+
+def manufacturer_token(value: Optional[str]) -> str:
+    """Squash a manufacturer name to one blocking token ('DT-Swiss' -> 'dtswiss')."""
+    token = normalize_text(value).replace(" ", "")
+    return MANUFACTURER_ALIASES.get(token, token)
+
+
+def model_key(value: Optional[str]) -> str:
+    """
+    Normalize a model string for comparison.
+
+    Spacing between letters and digits is dropped ('XR 31 T' -> 'xr31t') so
+    spacing variants compare equal, while word boundaries are kept.
+    """
+    text = normalize_text(value)
+    text = re.sub(r"(?<=[a-z]) (?=\d)|(?<=\d) (?=[a-z])|(?<=\d) (?=\d)", "", text)
+    return text
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity of two normalized model keys in [0, 1]."""
+    if a == b:
+        return 1.0
+    squashed_a, squashed_b = a.replace(" ", ""), b.replace(" ", "")
+    if squashed_a == squashed_b:
+        return 0.99
+
+    matcher = SequenceMatcher(None, squashed_a, squashed_b, autojunk=False)
+    # Cheap upper bounds first; most pairs in a block stop here
+    if matcher.real_quick_ratio() < 0.6 or matcher.quick_ratio() < 0.6:
+        return 0.0
+    ratio = matcher.ratio()
+
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b) if tokens_a | tokens_b else 0
+    return max(ratio, (ratio + jaccard) / 2)
+
+
+@dataclass
+class CatalogEntry:
+    id: int
+    manufacturer: str
+    model: str
+    is_reference: bool
+    block: Tuple
+    bucket: int
+    key: str
+    values: Tuple[float, ...]
+    build_count: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.manufacturer} {self.model}"
+
+
+@dataclass
+class MergeProposal:
+    kind: str
+    keep: CatalogEntry
+    duplicates: List[CatalogEntry]
+    score: float
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "keep_id": self.keep.id,
+            "keep": self.keep.label,
+            "merge_ids": [d.id for d in self.duplicates],
+            "merge": [d.label for d in self.duplicates],
+            "score": round(self.score, 3),
+            "builds_to_repoint": sum(d.build_count for d in self.duplicates),
+        }
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _candidate_pairs(
+    entries: List[CatalogEntry],
+    max_block_size: int,
+    window: int,
+) -> Iterable[Tuple[CatalogEntry, CatalogEntry]]:
+    """Yield pairs sharing a block, in the same or adjacent bucket."""
+    blocks: Dict[Tuple, Dict[int, List[CatalogEntry]]] = defaultdict(lambda: defaultdict(list))
+    for entry in entries:
+        blocks[entry.block][entry.bucket].append(entry)
+
+    for buckets in blocks.values():
+        for bucket, members in buckets.items():
+            neighbours = buckets.get(bucket + 1, [])
+            group = members + neighbours
+            if len(group) <= max_block_size:
+                for i, a in enumerate(members):
+                    for b in group[i + 1:]:
+                        yield a, b
+            else:
+                # Sorted-neighbourhood fallback for very large blocks
+                group = sorted(group, key=lambda e: e.key)
+                for i, a in enumerate(group):
+                    for b in group[i + 1:i + 1 + window]:
+                        if a.bucket == bucket or b.bucket == bucket:
+                            yield a, b
+
+
+def find_duplicates(
+    kind: str,
+    entries: List[CatalogEntry],
+    tolerances: Tuple[float, ...],
+    threshold: float = 0.88,
+    max_block_size: int = 400,
+    window: int = 25,
+) -> List[MergeProposal]:
+    """
+    Group likely duplicates and propose which row to keep.
+
+    Two entries match when their model keys score at least `threshold` and
+    every geometry value is within the matching tolerance. The kept row is
+    the shop-measured one if any, then the most-used one, then the oldest.
+    """
+    uf = _UnionFind()
+    matches: List[Tuple[int, float]] = []
+
+    for a, b in _candidate_pairs(entries, max_block_size, window):
+        if any(
+            x is not None and y is not None and abs(x - y) > tol
+            for x, y, tol in zip(a.values, b.values, tolerances)
+        ):
+            continue
+        score = name_similarity(a.key, b.key)
+        if score < threshold:
+            continue
+        uf.union(a.id, b.id)
+        matches.append((a.id, score))
+
+    # Weakest link in each group, so reviewers can sort by confidence
+    scores: Dict[int, float] = {}
+    for entry_id, score in matches:
+        root = uf.find(entry_id)
+        scores[root] = min(scores.get(root, 1.0), score)
+
+    groups: Dict[int, List[CatalogEntry]] = defaultdict(list)
+    for entry in entries:
+        if entry.id in uf.parent:
+            groups[uf.find(entry.id)].append(entry)
+
+    proposals = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda e: (e.is_reference, -e.build_count, e.id))
+        proposals.append(MergeProposal(
+            kind=kind,
+            keep=members[0],
+            duplicates=members[1:],
+            score=scores.get(root, 1.0),
+        ))
+
+    proposals.sort(key=lambda p: (-len(p.duplicates), p.keep.label))
+    return proposals
+
+
+def _build_counts(db: Session, column) -> Dict[int, int]:
+    rows = db.query(column, func.count(Build.id)).group_by(column).all()
+    return {component_id: count for component_id, count in rows}
+
+
+def load_rim_entries(db: Session, erd_bucket: float = 4.0) -> List[CatalogEntry]:
+    """Load rims as lightweight entries (column tuples, no ORM objects)."""
+    counts = _build_counts(db, Build.rim_id)
+    query = db.query(
+        Rim.id, Rim.manufacturer, Rim.model, Rim.is_reference, Rim.iso_size, Rim.erd
+    ).yield_per(5000)
+
+    entries = []
+    for id_, manufacturer, model, is_reference, iso_size, erd in query:
+        entries.append(CatalogEntry(
+            id=id_,
+            manufacturer=manufacturer,
+            model=model,
+            is_reference=bool(is_reference),
+            block=(manufacturer_token(manufacturer), iso_size),
+            bucket=int(erd // erd_bucket) if erd is not None else 0,
+            key=model_key(model),
+            values=(erd,),
+            build_count=counts.get(id_, 0),
+        ))
+    return entries
+
+
+def load_hub_entries(db: Session, flange_bucket: float = 4.0) -> List[CatalogEntry]:
+    """Load hubs as lightweight entries blocked on position and flange geometry."""
+    counts = _build_counts(db, Build.hub_id)
+    query = db.query(
+        Hub.id, Hub.manufacturer, Hub.model, Hub.is_reference, Hub.position,
+        Hub.flange_diameter_left, Hub.flange_diameter_right,
+        Hub.flange_offset_left, Hub.flange_offset_right,
+    ).yield_per(5000)
+
+    entries = []
+    for (id_, manufacturer, model, is_reference, position,
+         pcd_left, pcd_right, offset_left, offset_right) in query:
+        entries.append(CatalogEntry(
+            id=id_,
+            manufacturer=manufacturer,
+            model=model,
+            is_reference=bool(is_reference),
+            block=(manufacturer_token(manufacturer), position),
+            bucket=int((pcd_left or 0) // flange_bucket),
+            key=model_key(model),
+            values=(pcd_left, pcd_right, offset_left, offset_right),
+            build_count=counts.get(id_, 0),
+        ))
+    return entries
+
+
+def find_rim_duplicates(db: Session, erd_tolerance: float = 2.0, **kwargs) -> List[MergeProposal]:
+    """Merge proposals for rims whose names match and ERDs agree within tolerance."""
+    return find_duplicates("rim", load_rim_entries(db), (erd_tolerance,), **kwargs)
+
+
+def find_hub_duplicates(
+    db: Session,
+    flange_tolerance: float = 2.0,
+    offset_tolerance: float = 1.5,
+    **kwargs,
+) -> List[MergeProposal]:
+    """Merge proposals for hubs whose names match and flange geometry agrees."""
+    tolerances = (flange_tolerance, flange_tolerance, offset_tolerance, offset_tolerance)
+    return find_duplicates("hub", load_hub_entries(db), tolerances, **kwargs)
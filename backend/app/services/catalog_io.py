@@ -0,0 +1,290 @@
+"""
+Streaming export and batched import of rim/hub catalogs as CSV or NDJSON.
+
+Exports can also be columnar (see compact_formats.py), as JSON or
+MessagePack. They stream as a sequence of blocks of up to CHUNK_ROWS
+rows, `{"count": n, "columns": {...}}` each: newline-separated JSON, or
+MessagePack maps back to back.
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+import msgpack
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..schemas.catalog import ImportResult, ImportRowError
+from .catalog_changes import record_changes
+from .compact_formats import COLUMNAR_JSON, MSGPACK, negotiate
+from .import_pipeline import normalize_header
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "columnar": COLUMNAR_JSON,
+    "msgpack": MSGPACK,
+}
+
+EXPORT_EXTENSIONS = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "columnar": "columnar.ndjson",
+    "msgpack": "msgpack",
+}
+
+# Formats a file can be imported from
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Rows buffered before a chunk is handed to the response
+CHUNK_ROWS = 500
+
+# Per-row errors returned in an import response; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+def export_columns(schema: Type[BaseModel]) -> List[str]:
+    """Exported columns: id, every writable schema field, then provenance."""
+    return ["id", *schema.model_fields.keys(), "is_reference", "measured_at"]
+
+
+def export_format(fmt: Optional[str], accept: Optional[str]) -> str:
+    """An explicit `?format=` wins; otherwise columnar if Accept asks for it, else CSV."""
+    if fmt:
+        return fmt
+    return {COLUMNAR_JSON: "columnar", MSGPACK: "msgpack"}.get(negotiate(accept), "csv")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _columnar_block(columns: List[str], rows: List[Any], fmt: str) -> Union[str, bytes]:
+    block = {"count": len(rows), "columns": dict(zip(columns, map(list, zip(*rows))))}
+    if fmt == "msgpack":
+        return msgpack.packb(block, default=_json_default)
+    return json.dumps(block, default=_json_default) + "\n"
+
+
+def stream_export(model: Type, columns: List[str], fmt: str) -> Iterator[Union[str, bytes]]:
+    """
+    Yield the whole table as CSV or NDJSON text chunks, or columnar blocks.
+
+    Uses its own session and a server-side cursor (`yield_per`), so memory
+    stays flat regardless of catalog size and the request's session is not
+    held open while the client downloads.
+    """
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(*[getattr(model, name) for name in columns])
+            .order_by(model.id)
+            .yield_per(CHUNK_ROWS)
+        )
+
+        if fmt in ("columnar", "msgpack"):
+            block = []
+            for row in query:
+                block.append(row)
+                if len(block) >= CHUNK_ROWS:
+                    yield _columnar_block(columns, block, fmt)
+                    block = []
+            if block:
+                yield _columnar_block(columns, block, fmt)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+
+        pending = 0
+        for row in query:
+            if writer:
+                writer.writerow([_csv_value(v) for v in row])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default))
+                buffer.write("\n")
+
+            pending += 1
+            if pending >= CHUNK_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def detect_format(fmt: Optional[str], filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Pick 'csv' or 'ndjson' from an explicit format, file extension or content type."""
+    if fmt:
+        return fmt if fmt in IMPORT_FORMATS else None
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    if content_type and "csv" in content_type:
+        return "csv"
+    if content_type and "json" in content_type:
+        return "ndjson"
+    return None
+
+
+def _clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty CSV cells so schema defaults apply instead of failing on ''."""
+    return {
+        key: value for key, value in record.items()
+        if key and not (isinstance(value, str) and not value.strip())
+    }
+
+
+def import_records(
+    db: Session,
+    model: Type,
+    schema: Type[BaseModel],
+    records: Iterable[Tuple[int, Any]],
+    defaults: Dict[str, Any],
+    batch_size: int = 500,
+) -> ImportResult:
+    """
+    Validate records against `schema` and insert them in batches.
+
+    `records` yields (line number, record) pairs; invalid rows are reported
+    by their line in the uploaded file (1-based, counting the CSV header and
+    blank lines). Sources may yield an exception in place of a record they
+    could not parse. Each batch is one multi-row INSERT and one commit, so a
+    bad row never rolls back its neighbours.
+    """
+    result = ImportResult()
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        if batch:
+            ids = db.execute(insert(model).returning(model.id), batch).scalars().all()
+            record_changes(db, model, ids, new=True)
+            db.commit()
+            result.inserted += len(batch)
+            batch.clear()
+
+    for row_number, record in records:
+        if isinstance(record, Exception):
+            # Malformed line (e.g. bad JSON); later lines may be fine
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(ImportRowError(row=row_number, errors=[str(record)]))
+            continue
+
+        try:
+            item = schema.model_validate(_clean_record(record))
+        except ValidationError as e:
+            result.failed += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                messages = [
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ]
+                result.errors.append(ImportRowError(row=row_number, errors=messages))
+            continue
+
+        batch.append({**item.model_dump(), **defaults})
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return result
+
+
+# Uploads are decoded with errors="surrogateescape": bytes that are not
+# UTF-8 come through as lone surrogates, so the row holding them can be
+# reported without losing the rest of the file
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+_NOT_UTF8 = "Not valid UTF-8 text"
+
+
+def _iter_csv(text_stream) -> Iterator[Tuple[int, Any]]:
+    """
+    (line number, record) for each CSV data row, headers normalized as in
+    CSVSource. A ValueError stands in for a row that could not be read.
+    """
+    reader = csv.reader(text_stream)
+    names: Optional[List[str]] = None
+    while True:
+        # A quoted field may span lines: report the line the record starts on
+        line = reader.line_num + 1
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield line, ValueError(f"Invalid CSV: {e}")
+            continue
+
+        if names is None:
+            names = [normalize_header(column) for column in values]
+        elif any(_UNDECODABLE.search(v) for v in values):
+            yield line, ValueError(_NOT_UTF8)
+        elif any(v.strip() for v in values):
+            yield line, dict(zip(names, values))
+
+
+def _iter_ndjson(text_stream) -> Iterator[Tuple[int, Any]]:
+    """(line number, record) per NDJSON line, with a ValueError in place of each bad line."""
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        if _UNDECODABLE.search(line):
+            yield line_number, ValueError(_NOT_UTF8)
+            continue
+        try:
+            record = json.loads(line)
+        except (ValueError, RecursionError) as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError("Expected a JSON object per line")
+            continue
+        yield line_number, record
+
+
+def import_upload(
+    db: Session,
+    model: Type,
+    schema: Type[BaseModel],
+    upload_file,
+    fmt: str,
+    defaults: Dict[str, Any],
+    batch_size: int = 500,
+) -> ImportResult:
+    """
+    Incrementally parse an uploaded CSV/NDJSON file and import it.
+
+    Malformed rows, bad JSON and undecodable bytes are reported as row
+    errors in the result, never raised.
+    """
+    text_stream = io.TextIOWrapper(upload_file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    try:
+        records = _iter_csv(text_stream) if fmt == "csv" else _iter_ndjson(text_stream)
+        return import_records(db, model, schema, records, defaults, batch_size)
+    finally:
+        text_stream.detach()
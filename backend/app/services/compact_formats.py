@@ -0,0 +1,108 @@
+"""
+Compact list formats, chosen by the Accept header.
+
+A list as JSON objects repeats every key name in every row. For the full
+rim and hub catalog that is most of the payload, and most of what a
+tablet's JSON parser has to chew through. Clients can instead ask for the
+same rows column by column, one array per field:
+
+    {"count": 2, "columns": {"id": [1, 2], "manufacturer": ["DT Swiss", "Mavic"], ...}}
+
+either as JSON (COLUMNAR_JSON) or as MessagePack (MSGPACK). Values are
+the same as in the JSON list, nested objects (`measured_by`) included.
+Without one of these in Accept, the response is the usual JSON list.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import msgpack
+from fastapi.responses import Response
+
+from .serialization import FastJSONResponse
+
+COLUMNAR_JSON = "application/vnd.spokecalc.columnar+json"
+MSGPACK = "application/msgpack"
+
+# Accept header spellings of each format
+_MEDIA_TYPES = {
+    COLUMNAR_JSON: COLUMNAR_JSON,
+    MSGPACK: MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+# Accept entries satisfied by the default JSON list
+_PLAIN_JSON = {"application/json", "application/*", "*/*"}
+
+# The body depends on Accept: keep caches from mixing the formats
+VARY = {"Vary": "Accept"}
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    The compact format `accept` prefers, or None for the JSON list.
+
+    Entries are taken by q-value, then in the order listed; one that
+    plain JSON satisfies first (`application/json`, `*/*`) means JSON.
+    """
+    if not accept:
+        return None
+
+    ranked = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in entry.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranked.append((-q, position, media_type.lower()))
+
+    for _, _, media_type in sorted(ranked):
+        if media_type in _MEDIA_TYPES:
+            return _MEDIA_TYPES[media_type]
+        if media_type in _PLAIN_JSON:
+            return None
+    return None
+
+
+def columnar(rows: Sequence[Mapping[str, Any]], fields: Sequence[str]) -> Dict[str, Any]:
+    """Rows as one array per field."""
+    return {
+        "count": len(rows),
+        "columns": {name: [row[name] for row in rows] for name in fields},
+    }
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Same text as the JSON responses, where UTC is written "Z"
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default)
+
+
+def encoded_response(content: Any, media_type: Optional[str]) -> Response:
+    """`content` as JSON (media_type None), columnar JSON or MessagePack."""
+    if media_type == MSGPACK:
+        return MsgPackResponse(content, headers=VARY)
+    return FastJSONResponse(content, media_type=media_type, headers=VARY)
+
+
+def list_response(rows: Sequence[Mapping[str, Any]], fields: Sequence[str], media_type: Optional[str]) -> Response:
+    """A list endpoint's rows as the JSON list, or columnar in the negotiated format."""
+    if media_type is None:
+        return encoded_response(rows, None)
+    return encoded_response(columnar(rows, fields), media_type)
@@ -0,0 +1,247 @@
+"""
+Idempotency-Key support for create endpoints.
+
+A retried POST carrying the same key as an earlier one gets the stored
+response instead of creating a second row. A key is claimed by inserting
+a row (unique per user and key) in its own committed transaction before
+the write runs, so of two concurrent duplicates exactly one executes; the
+other polls until the first finishes and then replays its response.
+
+The handler writes without committing; its response is stored on the
+same session and committed with the write, so a row is never created
+without its replay record. While the handler runs the claim is renewed
+every HEARTBEAT_INTERVAL; a claim not renewed for STALE_CLAIM belongs to
+a request that died and may be taken over.
+
+Only successful responses are stored: if the write fails the claim is
+released and a retry runs again. Keys expire after IDEMPOTENCY_TTL and
+the table is pruned (by age, then down to MAX_KEYS) as new keys arrive.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.idempotency_key import IdempotencyKey
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+MAX_KEYS = 100_000
+
+# An unfinished claim is renewed this often while its request runs...
+HEARTBEAT_INTERVAL = 5.0
+# ...and one not renewed for this long belongs to a request that died
+STALE_CLAIM = timedelta(seconds=30)
+
+# How long a duplicate waits for the original request before giving up
+WAIT_TIMEOUT = 10.0
+POLL_INTERVAL = 0.1
+
+PRUNE_INTERVAL = 60.0
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite returns naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def request_fingerprint(scope: str, body: BaseModel) -> str:
+    payload = json.dumps([scope, body.model_dump(mode="json")], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def prune_keys(db: Session) -> None:
+    """Delete expired keys, then the oldest ones beyond MAX_KEYS."""
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < _now() - IDEMPOTENCY_TTL))
+    cutoff = (
+        db.query(IdempotencyKey.created_at)
+        .order_by(IdempotencyKey.created_at.desc())
+        .offset(MAX_KEYS)
+        .limit(1)
+        .scalar()
+    )
+    if cutoff is not None:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at <= cutoff))
+    db.commit()
+
+
+def _maybe_prune(db: Session) -> None:
+    global _last_prune
+    with _prune_lock:
+        if time.monotonic() - _last_prune < PRUNE_INTERVAL:
+            return
+        _last_prune = time.monotonic()
+    prune_keys(db)
+
+
+def _claim(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+    """Claim `key`; returns None if we now own it, else the existing row."""
+    now = _now()
+    row = IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint, created_at=now, updated_at=now)
+    db.add(row)
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+
+    existing = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+    ).first()
+    if existing is None:
+        # Released between our insert and this read; try again
+        return _claim(db, user_id, key, fingerprint)
+
+    expired = _aware(existing.created_at) < _now() - IDEMPOTENCY_TTL
+    heartbeat = _aware(existing.updated_at or existing.created_at)
+    abandoned = existing.status_code is None and heartbeat < _now() - STALE_CLAIM
+    if expired or abandoned:
+        # Take the key over, unless another request (or a late heartbeat) got there first
+        now = _now()
+        taken = db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == existing.id,
+                IdempotencyKey.created_at == existing.created_at,
+                IdempotencyKey.updated_at == existing.updated_at,
+            )
+            .values(fingerprint=fingerprint, status_code=None, response_body=None, created_at=now, updated_at=now)
+        ).rowcount
+        db.commit()
+        if taken:
+            return None
+        db.refresh(existing)
+
+    return existing
+
+
+class _Heartbeat:
+    """Renews a claim from a background thread until stopped."""
+
+    def __init__(self, bind, user_id: int, key: str):
+        self.bind = bind
+        self.user_id = user_id
+        self.key = key
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="idempotency-heartbeat", daemon=True)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                with Session(bind=self.bind) as db:
+                    db.execute(
+                        update(IdempotencyKey)
+                        .where(
+                            IdempotencyKey.user_id == self.user_id,
+                            IdempotencyKey.key == self.key,
+                            IdempotencyKey.status_code.is_(None),
+                        )
+                        .values(updated_at=_now())
+                    )
+                    db.commit()
+            except Exception:
+                logger.exception("Could not renew Idempotency-Key claim")
+
+
+def idempotent(
+    db: Session,
+    key: Optional[str],
+    user: User,
+    scope: str,
+    body: BaseModel,
+    response_model: Type[BaseModel],
+    handler: Callable[[], Any],
+) -> Any:
+    """
+    Run `handler` at most once per (user, Idempotency-Key), then commit `db`.
+
+    `handler` writes through `db` without committing. `scope` names the
+    endpoint (e.g. "POST /rims"); reusing a key for a different endpoint
+    or body is rejected with 422. Without a key the handler just runs.
+    """
+    if not key:
+        result = handler()
+        db.commit()
+        return result
+
+    fingerprint = request_fingerprint(scope, body)
+    claims = Session(bind=db.get_bind())
+    try:
+        _maybe_prune(claims)
+
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while True:
+            existing = _claim(claims, user.id, key, fingerprint)
+            if existing is None:
+                break
+            if existing.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if existing.status_code is not None:
+                return JSONResponse(
+                    existing.response_body,
+                    status_code=existing.status_code,
+                    headers={REPLAYED_HEADER: "true"},
+                )
+            if time.monotonic() > deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                )
+            claims.expire_all()
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            with _Heartbeat(db.get_bind(), user.id, key):
+                result = handler()
+                response_body = response_model.model_validate(result).model_dump(mode="json")
+            # Same transaction as the handler's write: both commit or neither does
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user.id, IdempotencyKey.key == key)
+                .values(status_code=200, response_body=response_body, updated_at=_now())
+            )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            claims.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user.id, IdempotencyKey.key == key
+            ))
+            claims.commit()
+            raise
+
+        return JSONResponse(response_body)
+    finally:
+        claims.close()
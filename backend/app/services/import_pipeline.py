@@ -0,0 +1,630 @@
+"""
+Reusable import pipeline for reference catalogs (rims and hubs).
+
+A pipeline is made of five stages:
+
+    source -> parse -> validate -> dedupe -> write
+
+The source runs in the calling thread (some sources, like Playwright pages,
+are bound to the thread that created them). The remaining stages each run in
+their own worker thread and are connected by bounded queues, so fetching the
+next page overlaps with parsing and writing the previous one, and a slow
+writer applies backpressure to the source instead of buffering everything
+in memory.
+"""
+
+import csv
+import io
+import json
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..models.hub import Hub
+from ..models.rim import Rim
+from ..schemas.hub import HubCreate
+from ..schemas.rim import RimCreate
+from .catalog_changes import record_changes
+
+
+# ---------------------------------------------------------------------------
+# Value parsing shared by every catalog source
+# ---------------------------------------------------------------------------
+
+EMPTY_VALUES = {"", "-", "--", "n/a", "na", "none", "null"}
+
+
+def parse_number(value: Any, default: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a catalog number such as "600", "22,5", "385 g" or "-".
+
+    Decimal commas are accepted, unit suffixes are stripped and empty
+    placeholders return `default`.
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip()
+    if text.lower() in EMPTY_VALUES:
+        return default
+
+    text = text.replace(",", ".")
+    match = re.search(r"-?\d+(?:\.\d+)?", text)
+    if not match:
+        return default
+
+    try:
+        return float(match.group(0))
+    except ValueError:
+        return default
+
+
+def parse_int(value: Any, default: Optional[int] = None) -> Optional[int]:
+    """Parse an integer column (ISO size, spoke count); floats are truncated."""
+    number = parse_number(value)
+    if number is None:
+        return default
+    return int(number)
+
+
+def parse_lr_value(text: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Parse values like '56 L, 47 R' or just '45' into (left, right) tuple."""
+    if text is None:
+        return None, None
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        return float(text), float(text)
+
+    text = str(text).strip()
+    if text.lower() in EMPTY_VALUES:
+        return None, None
+
+    text = text.replace(",", ".")
+
+    # Check for "L" and "R" pattern (e.g., "56 L, 47 R" or "56L, 47R")
+    lr_match = re.search(r'([\d.]+)\s*L.*?([\d.]+)\s*R', text, re.IGNORECASE)
+    if lr_match:
+        try:
+            return float(lr_match.group(1)), float(lr_match.group(2))
+        except ValueError:
+            pass
+
+    # Also try R...L pattern
+    rl_match = re.search(r'([\d.]+)\s*R.*?([\d.]+)\s*L', text, re.IGNORECASE)
+    if rl_match:
+        try:
+            return float(rl_match.group(2)), float(rl_match.group(1))
+        except ValueError:
+            pass
+
+    # Single value - return same for both
+    try:
+        val = float(re.sub(r'[^\d.]', '', text))
+        return val, val
+    except ValueError:
+        return None, None
+
+
+def parse_position(value: Any) -> Optional[str]:
+    """Normalize a hub position column to 'front', 'rear' or None."""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    if "front" in text:
+        return "front"
+    if "rear" in text:
+        return "rear"
+    return None
+
+
+def clean_text(value: Any) -> Optional[str]:
+    """Strip a text cell, returning None for empty placeholders."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text.lower() in EMPTY_VALUES:
+        return None
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Row parsers: raw source record -> model field dict
+# ---------------------------------------------------------------------------
+
+RIM_TEXT_FIELDS = ["joint_type", "eyelet_type", "tire_type", "notes"]
+RIM_FLOAT_FIELDS = ["erd", "outer_width", "inner_width", "height", "weight"]
+
+HUB_TEXT_FIELDS = [
+    "axle_type", "brake_type", "drive_interface", "spoke_interface",
+    "internal_gearing", "generator_type", "notes",
+]
+HUB_FLOAT_FIELDS = ["oln", "spoke_hole_diameter", "weight"]
+
+
+def parse_rim_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a raw rim record (field name -> cell value) into Rim columns.
+
+    Returns None for rows without a manufacturer, model or ERD.
+    """
+    manufacturer = clean_text(record.get("manufacturer"))
+    model = clean_text(record.get("model"))
+    erd = parse_number(record.get("erd"))
+
+    if not manufacturer or not model or erd is None:
+        return None
+
+    row: Dict[str, Any] = {
+        "manufacturer": manufacturer,
+        "model": model,
+        "iso_size": parse_int(record.get("iso_size")),
+        "drilling_offset": parse_number(record.get("drilling_offset"), default=0),
+    }
+    for name in RIM_FLOAT_FIELDS:
+        row[name] = parse_number(record.get(name))
+    for name in RIM_TEXT_FIELDS:
+        row[name] = clean_text(record.get(name))
+    return row
+
+
+def parse_hub_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a raw hub record into Hub columns.
+
+    Flange columns may be given per side (`flange_diameter_left`) or as a
+    single combined cell (`flange_diameter` = "56 L, 47 R"). Offsets are
+    stored as absolute center-to-flange distances. Returns None for rows
+    without a manufacturer, model or any flange geometry.
+    """
+    manufacturer = clean_text(record.get("manufacturer"))
+    model = clean_text(record.get("model"))
+
+    if not manufacturer or not model:
+        return None
+
+    flange_left, flange_right = parse_lr_value(record.get("flange_diameter"))
+    offset_left, offset_right = parse_lr_value(record.get("flange_offset"))
+
+    flange_left = parse_number(record.get("flange_diameter_left"), default=flange_left)
+    flange_right = parse_number(record.get("flange_diameter_right"), default=flange_right)
+    offset_left = parse_number(record.get("flange_offset_left"), default=offset_left)
+    offset_right = parse_number(record.get("flange_offset_right"), default=offset_right)
+
+    if flange_left is None and offset_left is None:
+        return None
+
+    row: Dict[str, Any] = {
+        "manufacturer": manufacturer,
+        "model": model,
+        "position": parse_position(record.get("position")),
+        "flange_diameter_left": flange_left or 0,
+        "flange_diameter_right": flange_right or flange_left or 0,
+        "flange_offset_left": abs(offset_left) if offset_left else 0,
+        "flange_offset_right": abs(offset_right) if offset_right else (abs(offset_left) if offset_left else 0),
+        "spoke_count": parse_int(record.get("spoke_count")),
+    }
+    for name in HUB_FLOAT_FIELDS:
+        row[name] = parse_number(record.get(name))
+    for name in HUB_TEXT_FIELDS:
+        row[name] = clean_text(record.get(name))
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+def normalize_header(header: Any) -> str:
+    """Map a column header like 'Flange Offset Left' to 'flange_offset_left'."""
+    text = str(header or "").strip().lower()
+    return re.sub(r"[^a-z0-9]+", "_", text).strip("_")
+
+
+class CSVSource:
+    """
+    Yield records from a CSV file or text stream.
+
+    Headers are normalized to snake_case; `column_map` renames normalized
+    headers to model fields (e.g. {"bsd": "iso_size"}).
+    """
+
+    def __init__(
+        self,
+        path_or_file: Any,
+        column_map: Optional[Dict[str, str]] = None,
+        delimiter: str = ",",
+        encoding: str = "utf-8-sig",
+    ):
+        self.path_or_file = path_or_file
+        self.column_map = column_map or {}
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def _rows(self, handle) -> Iterator[Dict[str, Any]]:
+        reader = csv.reader(handle, delimiter=self.delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        names = []
+        for column in header:
+            name = normalize_header(column)
+            names.append(self.column_map.get(name, name))
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            yield dict(zip(names, values))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if isinstance(self.path_or_file, str):
+            with open(self.path_or_file, newline="", encoding=self.encoding) as handle:
+                yield from self._rows(handle)
+        else:
+            yield from self._rows(self.path_or_file)
+
+
+class JSONSource:
+    """
+    Yield records from a JSON array or newline-delimited JSON (NDJSON).
+
+    NDJSON is read line by line, so large files are never fully loaded.
+    """
+
+    def __init__(
+        self,
+        path_or_file: Any,
+        column_map: Optional[Dict[str, str]] = None,
+        encoding: str = "utf-8",
+    ):
+        self.path_or_file = path_or_file
+        self.column_map = column_map or {}
+        self.encoding = encoding
+
+    def _map(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        mapped = {}
+        for key, value in record.items():
+            name = normalize_header(key)
+            mapped[self.column_map.get(name, name)] = value
+        return mapped
+
+    def _records(self, handle) -> Iterator[Dict[str, Any]]:
+        first = handle.readline()
+        while first and not first.strip():
+            first = handle.readline()
+        if not first:
+            return
+
+        if first.lstrip().startswith("["):
+            # Whole-document JSON array
+            data = json.loads(first + handle.read())
+            for record in data:
+                yield self._map(record)
+            return
+
+        yield self._map(json.loads(first))
+        for line in handle:
+            if line.strip():
+                yield self._map(json.loads(line))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if isinstance(self.path_or_file, str):
+            with open(self.path_or_file, encoding=self.encoding) as handle:
+                yield from self._records(handle)
+        elif isinstance(self.path_or_file, (bytes, bytearray)):
+            yield from self._records(io.StringIO(self.path_or_file.decode(self.encoding)))
+        else:
+            yield from self._records(self.path_or_file)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+@dataclass
+class StageStats:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    skipped: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    error_samples: List[str] = field(default_factory=list)
+
+    def record_error(self, message: str, max_samples: int = 20) -> None:
+        self.errors += 1
+        if len(self.error_samples) < max_samples:
+            self.error_samples.append(message)
+
+
+@dataclass
+class PipelineStats:
+    stages: Dict[str, StageStats]
+    inserted: int = 0
+    updated: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "seconds": round(self.seconds, 3),
+            "stages": {
+                name: {
+                    "in": s.items_in,
+                    "out": s.items_out,
+                    "skipped": s.skipped,
+                    "errors": s.errors,
+                    "seconds": round(s.seconds, 3),
+                    "error_samples": s.error_samples,
+                }
+                for name, s in self.stages.items()
+            },
+        }
+
+    def summary(self) -> str:
+        lines = [f"Inserted {self.inserted}, updated {self.updated} in {self.seconds:.2f}s"]
+        for s in self.stages.values():
+            lines.append(
+                f"  {s.name:<9} in={s.items_in:<6} out={s.items_out:<6} "
+                f"skipped={s.skipped:<5} errors={s.errors:<5} {s.seconds:.3f}s"
+            )
+        return "\n".join(lines)
+
+
+_DONE = object()
+
+STAGE_NAMES = ["source", "parse", "validate", "dedupe", "write"]
+
+
+class ImportPipeline:
+    """
+    Bounded-queue import pipeline for one catalog model.
+
+    Args:
+        model: SQLAlchemy model to write (Rim or Hub)
+        parse: Record -> field dict, or None to skip the record
+        schema: Pydantic schema rows are validated against (RimCreate/HubCreate)
+        key_fields: Columns identifying a duplicate (e.g. manufacturer, model)
+        existing_filter: Extra criteria limiting which existing rows count as
+            duplicates (e.g. Rim.is_reference == True)
+        defaults: Values filled into empty columns of inserted rows
+        update_existing: Update duplicates of existing rows instead of skipping
+        update_columns: Columns written when updating an existing row
+            (default: every column the source provided)
+        batch_size: Rows per multi-row INSERT/UPDATE
+        queue_size: Capacity of each inter-stage queue
+    """
+
+    def __init__(
+        self,
+        model: Type,
+        parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        schema: Type[BaseModel],
+        key_fields: Iterable[str] = ("manufacturer", "model"),
+        existing_filter: Optional[Iterable[Any]] = None,
+        defaults: Optional[Dict[str, Any]] = None,
+        update_existing: bool = False,
+        update_columns: Optional[Iterable[str]] = None,
+        batch_size: int = 500,
+        queue_size: int = 1000,
+    ):
+        self.model = model
+        self.parse = parse
+        self.schema = schema
+        self.key_fields = tuple(key_fields)
+        self.existing_filter = list(existing_filter or [])
+        self.defaults = defaults or {}
+        self.update_existing = update_existing
+        self.update_columns = set(update_columns) if update_columns is not None else None
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def _key(self, row: Dict[str, Any]) -> Tuple:
+        return tuple(
+            row.get(name).lower() if isinstance(row.get(name), str) else row.get(name)
+            for name in self.key_fields
+        )
+
+    def _load_existing(self, db: Session) -> Dict[Tuple, int]:
+        columns = [getattr(self.model, name) for name in self.key_fields]
+        query = db.query(self.model.id, *columns)
+        for criterion in self.existing_filter:
+            query = query.filter(criterion)
+
+        existing = {}
+        for row in query:
+            values = dict(zip(self.key_fields, row[1:]))
+            existing[self._key(values)] = row[0]
+        return existing
+
+    def _stage(
+        self,
+        stats: StageStats,
+        inbox: "queue.Queue",
+        outbox: Optional["queue.Queue"],
+        handle: Callable[[Any], Any],
+        failed: threading.Event,
+        errors: List[BaseException],
+        finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Run one worker stage until the upstream sentinel arrives."""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if failed.is_set():
+                # Drain so upstream never blocks on a full queue
+                continue
+
+            stats.items_in += 1
+            started = time.perf_counter()
+            try:
+                result = handle(item)
+            except Exception as e:  # stage-fatal (e.g. database error)
+                errors.append(e)
+                stats.record_error(str(e))
+                failed.set()
+                continue
+            finally:
+                stats.seconds += time.perf_counter() - started
+
+            if result is None:
+                stats.skipped += 1
+                continue
+            stats.items_out += 1
+            if outbox is not None:
+                outbox.put(result)
+
+        if finish is not None and not failed.is_set():
+            started = time.perf_counter()
+            try:
+                finish()
+            except Exception as e:
+                errors.append(e)
+                stats.record_error(str(e))
+                failed.set()
+            finally:
+                stats.seconds += time.perf_counter() - started
+
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    def run(self, source: Iterable[Dict[str, Any]], db: Session) -> PipelineStats:
+        """
+        Pull every record from `source` through the pipeline into `db`.
+
+        Commits once per batch. Re-raises the first fatal stage error (after
+        all threads have stopped); per-row parse and validation errors are
+        counted instead of raised.
+        """
+        stats = PipelineStats(stages={name: StageStats(name) for name in STAGE_NAMES})
+        started_at = time.perf_counter()
+
+        existing = self._load_existing(db)
+        seen = set()
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+
+        def parse(record):
+            try:
+                return self.parse(record)
+            except Exception as e:
+                stats.stages["parse"].record_error(f"{type(e).__name__}: {e}")
+                return None
+
+        def validate(row):
+            try:
+                self.schema.model_validate(row)
+            except ValidationError as e:
+                label = " ".join(str(row.get(name)) for name in self.key_fields)
+                stats.stages["validate"].record_error(f"{label}: {e.errors()[0]['msg']}")
+                return None
+            return row
+
+        def dedupe(row):
+            key = self._key(row)
+            if key in seen:
+                return None
+            seen.add(key)
+            if key in existing:
+                if not self.update_existing:
+                    return None
+                # Only overwrite columns the source actually provided; defaults
+                # are for new rows and must not clobber what is already stored
+                row = {
+                    k: v for k, v in row.items()
+                    if v is not None and (self.update_columns is None or k in self.update_columns)
+                }
+                row["id"] = existing[key]
+                return row
+            return {**row, **{k: v for k, v in self.defaults.items() if row.get(k) is None}}
+
+        def flush():
+            if inserts:
+                ids = db.execute(insert(self.model).returning(self.model.id), inserts).scalars().all()
+                record_changes(db, self.model, ids, new=True)
+                stats.inserted += len(inserts)
+                inserts.clear()
+            if updates:
+                db.execute(update(self.model), updates)
+                record_changes(db, self.model, [row["id"] for row in updates])
+                stats.updated += len(updates)
+                updates.clear()
+            db.commit()
+
+        def write(row):
+            (updates if "id" in row else inserts).append(row)
+            if len(inserts) + len(updates) >= self.batch_size:
+                flush()
+            return row
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(4)]
+        failed = threading.Event()
+        errors: List[BaseException] = []
+        handlers = [parse, validate, dedupe, write]
+        threads = []
+        for i, name in enumerate(STAGE_NAMES[1:]):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            thread = threading.Thread(
+                target=self._stage,
+                args=(stats.stages[name], queues[i], outbox, handlers[i], failed, errors),
+                kwargs={"finish": flush if name == "write" else None},
+                name=f"import-{name}",
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        source_stats = stats.stages["source"]
+        iterator = iter(source)
+        try:
+            while not failed.is_set():
+                fetch_started = time.perf_counter()
+                try:
+                    record = next(iterator)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    errors.append(e)
+                    source_stats.record_error(f"{type(e).__name__}: {e}")
+                    failed.set()
+                    break
+                finally:
+                    source_stats.seconds += time.perf_counter() - fetch_started
+                source_stats.items_in += 1
+                source_stats.items_out += 1
+                queues[0].put(record)
+        finally:
+            queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+            stats.seconds = time.perf_counter() - started_at
+
+        if errors:
+            db.rollback()
+            raise errors[0]
+        return stats
+
+
+def rim_pipeline(**kwargs) -> ImportPipeline:
+    """Pipeline preset for rims, validated against RimCreate."""
+    kwargs.setdefault("parse", parse_rim_record)
+    kwargs.setdefault("defaults", {"is_reference": True})
+    return ImportPipeline(model=Rim, schema=RimCreate, **kwargs)
+
+
+def hub_pipeline(**kwargs) -> ImportPipeline:
+    """Pipeline preset for hubs, validated against HubCreate."""
+    kwargs.setdefault("key_fields", ("manufacturer", "model", "position"))
+    kwargs.setdefault("parse", parse_hub_record)
+    kwargs["defaults"] = {"is_reference": True, "spoke_hole_diameter": 2.6, **kwargs.get("defaults", {})}
+    return ImportPipeline(model=Hub, schema=HubCreate, **kwargs)
@@ -0,0 +1,103 @@
+"""
+Built-in background job kinds (see jobs.py).
+
+Each task runs in a worker process with its own database sessions and
+reports through the JobContext it is given.
+"""
+
+import subprocess
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+
+from ..database import SessionLocal
+from .build_stats import rebuild_build_stats
+from .catalog_dedupe import find_hub_duplicates, find_rim_duplicates
+from .jobs import JobCancelled, JobContext, job_kind
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Output lines of import_freespoke.py that mark how far along it is
+REFRESH_MILESTONES = (
+    ("Adding sample reference data", 0.05),
+    ("Scraping rims from Freespoke", 0.15),
+    ("Scraping hubs from Freespoke", 0.55),
+    ("Import complete", 0.95),
+)
+
+MAX_PROPOSALS = 500
+
+
+@job_kind("catalog_refresh", "Re-scrape Freespoke and refresh the reference rim/hub catalog")
+def catalog_refresh(ctx: JobContext, force_scrape: bool = True):
+    command = [sys.executable, "-u", str(BACKEND_DIR / "scripts" / "import_freespoke.py")]
+    if force_scrape:
+        command.append("--force-scrape")
+
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, text=True,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    output = deque(maxlen=50)
+    done = threading.Event()
+
+    def watch_for_cancel():
+        # The scraper can sit on one page for a while without printing
+        while not done.wait(2):
+            if ctx.cancel_requested():
+                process.terminate()
+                return
+
+    threading.Thread(target=watch_for_cancel, daemon=True).start()
+    try:
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            output.append(line)
+            fraction = next((f for marker, f in REFRESH_MILESTONES if marker in line), None)
+            ctx.progress(fraction, line.strip())
+        returncode = process.wait()
+    finally:
+        done.set()
+        if process.poll() is None:
+            process.kill()
+
+    if ctx.cancel_requested():
+        raise JobCancelled()
+    if returncode != 0:
+        raise RuntimeError(f"import_freespoke.py exited with {returncode}: {output[-1] if output else ''}")
+    return {"output": list(output)}
+
+
+@job_kind("find_duplicates", "List likely duplicate rims and hubs as merge proposals")
+def find_duplicates(ctx: JobContext, threshold: float = 0.88):
+    db = SessionLocal()
+    try:
+        ctx.progress(0.05, "Scanning rims")
+        rims = find_rim_duplicates(db, threshold=threshold)
+        ctx.progress(0.5, f"{len(rims)} rim groups; scanning hubs")
+        hubs = find_hub_duplicates(db, threshold=threshold)
+    finally:
+        db.close()
+
+    proposals = rims + hubs
+    return {
+        "rim_groups": len(rims),
+        "hub_groups": len(hubs),
+        "proposals": [p.as_dict() for p in proposals[:MAX_PROPOSALS]],
+        "truncated": len(proposals) > MAX_PROPOSALS,
+    }
+
+
+@job_kind("rebuild_build_stats", "Recompute the analytics aggregates from all builds")
+def rebuild_stats(ctx: JobContext):
+    db = SessionLocal()
+    try:
+        ctx.progress(0.1, "Counting builds")
+        builds = rebuild_build_stats(db)
+        db.commit()
+    finally:
+        db.close()
+    return {"builds": builds}
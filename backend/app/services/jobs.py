@@ -0,0 +1,359 @@
+"""
+Background jobs: scrapes, imports and large computations outside the
+request cycle.
+
+Jobs are rows in the `jobs` table. A JobRunner (started with the API, or
+standalone via scripts/run_jobs.py) claims queued jobs and runs them in a
+local process pool, so long work never occupies API workers or the
+event loop. Tasks report progress through a JobContext, which doubles as
+a heartbeat and is where cooperative cancellation takes effect. Results
+are stored on the row and kept for JOB_RETENTION.
+
+Tasks are plain functions registered with @job_kind in job_tasks.py.
+"""
+
+import inspect
+import logging
+import multiprocessing
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.job import Job
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+JOB_RETENTION = timedelta(days=30)
+
+# A running job that has not reported for this long lost its worker
+STALE_AFTER = timedelta(minutes=15)
+
+# Progress notes are written at most this often (fraction changes always are)
+PROGRESS_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 30.0
+
+MAINTENANCE_INTERVAL = 60.0
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobKind:
+    name: str
+    description: str
+    func: Callable[..., Any]
+
+
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_kind(name: str, description: str):
+    """Register a task function as a job kind. It is called as func(ctx, **params)."""
+    def register(func):
+        JOB_KINDS[name] = JobKind(name, description, func)
+        return func
+    return register
+
+
+def load_job_kinds() -> Dict[str, JobKind]:
+    from . import job_tasks  # noqa: F401  (registers the built-in kinds)
+    return JOB_KINDS
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobContext:
+    """Handed to a running task for progress reporting and cancellation checks."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._last_write = 0.0
+        self._last_fraction: Optional[float] = None
+
+    def _write(self, values: Dict[str, Any]) -> bool:
+        db = SessionLocal()
+        try:
+            db.execute(update(Job).where(Job.id == self.job_id).values(updated_at=_now(), **values))
+            cancel = db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar()
+            db.commit()
+        finally:
+            db.close()
+        self._last_write = time.monotonic()
+        return bool(cancel)
+
+    def progress(self, fraction: Optional[float] = None, message: Optional[str] = None) -> None:
+        """
+        Record progress (0..1) and/or a status note.
+
+        Raises JobCancelled if cancellation was requested, so long loops
+        should call this regularly.
+        """
+        values: Dict[str, Any] = {}
+        if fraction is not None and fraction != self._last_fraction:
+            values["progress"] = max(0.0, min(1.0, fraction))
+            self._last_fraction = fraction
+        elif time.monotonic() - self._last_write < PROGRESS_INTERVAL:
+            return
+        if message is not None:
+            values["message"] = message[:500]
+
+        if self._write(values):
+            raise JobCancelled()
+
+    def cancel_requested(self) -> bool:
+        """Check for cancellation without raising (also serves as a heartbeat)."""
+        if time.monotonic() - self._last_write >= HEARTBEAT_INTERVAL:
+            return self._write({})
+
+        db = SessionLocal()
+        try:
+            return bool(db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar())
+        finally:
+            db.close()
+
+
+def enqueue(db: Session, kind: str, params: Dict[str, Any], user: Optional[User]) -> Job:
+    """Queue a job; raises ValueError for an unknown kind or bad parameters."""
+    kinds = load_job_kinds()
+    if kind not in kinds:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    try:
+        inspect.signature(kinds[kind].func).bind(None, **params)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {kind}: {e}")
+
+    job = Job(kind=kind, params=params, status=QUEUED, progress=0, created_by_id=user.id if user else None)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def cancel(db: Session, job: Job) -> Job:
+    """Cancel a queued job now; ask a running one to stop at its next progress report."""
+    if job.status == QUEUED:
+        db.execute(
+            update(Job).where(Job.id == job.id, Job.status == QUEUED)
+            .values(status=CANCELLED, cancel_requested=True, finished_at=_now())
+        )
+    elif job.status == RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _finish(job_id: int, status: str, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Job).where(Job.id == job_id, Job.status == RUNNING)
+            .values(status=status, finished_at=_now(), updated_at=_now(), **values)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def execute_job(job_id: int) -> None:
+    """Run one claimed job to completion. Called in a worker process."""
+    kinds = load_job_kinds()
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        kind, params = kinds.get(job.kind), dict(job.params or {})
+    finally:
+        db.close()
+
+    if kind is None:
+        _finish(job_id, FAILED, error=f"Unknown job kind '{job.kind}'")
+        return
+
+    try:
+        result = kind.func(JobContext(job_id), **params)
+    except JobCancelled:
+        _finish(job_id, CANCELLED, message="Cancelled")
+    except Exception:
+        logger.exception("Job %s (%s) failed", job_id, kind.name)
+        _finish(job_id, FAILED, error=traceback.format_exc(limit=8))
+    else:
+        _finish(job_id, SUCCEEDED, progress=1.0, result=jsonable_encoder(result))
+
+
+def claim_next(db: Session) -> Optional[int]:
+    """Atomically move the oldest queued job to running; returns its id."""
+    job_id = (
+        db.query(Job.id)
+        .filter(Job.status == QUEUED)
+        .order_by(Job.created_at, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar()
+    )
+    if job_id is None:
+        db.rollback()
+        return None
+
+    claimed = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == QUEUED)
+        .values(status=RUNNING, started_at=_now(), updated_at=_now())
+    ).rowcount
+    db.commit()
+    return job_id if claimed else None
+
+
+def requeue(job_id: int) -> None:
+    """Put a claimed job that never reached a worker back in the queue."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Job).where(Job.id == job_id, Job.status == RUNNING)
+            .values(status=QUEUED, started_at=None, updated_at=_now())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def maintain(db: Session) -> None:
+    """Fail jobs whose worker vanished and drop finished jobs past retention."""
+    db.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.updated_at < _now() - STALE_AFTER)
+        .values(status=FAILED, error="Worker stopped responding", finished_at=_now())
+    )
+    db.execute(delete(Job).where(Job.status.in_(FINISHED), Job.finished_at < _now() - JOB_RETENTION))
+    db.commit()
+
+
+class JobRunner:
+    """
+    Polls for queued jobs and runs them in a local process pool.
+
+    If a worker process dies the pool is broken for good (every later
+    submit raises BrokenProcessPool), so the runner replaces it; until a
+    replacement is up, is_alive() reports False.
+    """
+
+    def __init__(self, workers: int = 2, poll_interval: float = 1.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pool_broken = False
+        self._thread: Optional[threading.Thread] = None
+        self._last_maintenance = 0.0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: children must not inherit the parent's DB connections
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a fresh pool for `broken`, unless another thread already has."""
+        with self._lock:
+            if self._executor is not broken or self._stop.is_set():
+                return
+            self._pool_broken = True
+            logger.error("Job worker pool broken; starting a new one")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self._pool_broken = False
+
+    def start(self) -> "JobRunner":
+        self._executor = self._new_executor()
+        self._thread = threading.Thread(target=self._loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._pool_broken
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._dispatch()
+            except Exception:
+                logger.exception("Job dispatch failed")
+            self._stop.wait(self.poll_interval)
+
+    def _dispatch(self) -> None:
+        db = SessionLocal()
+        try:
+            if time.monotonic() - self._last_maintenance >= MAINTENANCE_INTERVAL:
+                maintain(db)
+                self._last_maintenance = time.monotonic()
+
+            while True:
+                with self._lock:
+                    if self._running >= self.workers:
+                        return
+                job_id = claim_next(db)
+                if job_id is None:
+                    return
+                with self._lock:
+                    self._running += 1
+                    executor = self._executor
+                try:
+                    future = executor.submit(execute_job, job_id)
+                except BrokenProcessPool:
+                    # Never reached a worker: give the job and its slot back
+                    requeue(job_id)
+                    with self._lock:
+                        self._running -= 1
+                    self._replace_executor(executor)
+                    return
+                future.add_done_callback(lambda f, job_id=job_id, executor=executor: self._done(job_id, executor, f))
+        finally:
+            db.close()
+
+    def _done(self, job_id: int, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._running -= 1
+        error = future.exception() if not future.cancelled() else None
+        if error is not None:
+            # The worker process itself died (e.g. out of memory)
+            _finish(job_id, FAILED, error=f"Worker process failed: {error!r}")
+            if isinstance(error, BrokenProcessPool):
+                self._replace_executor(executor)
+        elif future.cancelled():
+            _finish(job_id, CANCELLED, message="Runner shut down")
+
+
+def start_job_runner(workers: int) -> Optional[JobRunner]:
+    if workers <= 0:
+        return None
+    return JobRunner(workers).start()
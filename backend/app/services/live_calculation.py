@@ -0,0 +1,199 @@
+"""
+Live spoke calculation over a WebSocket (/calculate/live).
+
+The client selects a rim and hub once; their specs are loaded and kept on
+the connection. After that it only sends parameter deltas (spoke count,
+crosses, rim offset, ERD...), and the server pushes a fresh SpokeResult.
+
+Messages are read by one task and merged into the connection state while
+a second task calculates. The calculator always works from the latest
+state, so deltas that arrive while a result is being computed or sent are
+coalesced into the next calculation and stale values are never computed.
+
+Client -> server (JSON):
+    {"type": "select", "rim_id": 1, "hub_id": 2}
+    {"type": "params", "seq": 7, "cross_pattern_left": 2, "rim_offset": 1.5}
+
+Server -> client:
+    {"type": "selected", "rim": {...}, "hub": {...}}
+    {"type": "result", "seq": 7, "result": {...SpokeResult}}
+    {"type": "error", "seq": 7, "detail": "..."}
+
+A message that is not valid JSON gets an error reply and the connection
+stays open. If either task fails unexpectedly, the socket is closed with
+code 1011 and a reason, rather than left open with nothing computing.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.websockets import WebSocketState
+
+from ..database import SessionLocal
+from ..models.hub import Hub
+from ..models.rim import Rim
+from ..schemas.calculator import SpokeCalculation, SpokeResult
+from .spoke_calculator import calculate_full_analysis
+
+logger = logging.getLogger(__name__)
+
+# Calculation inputs a client may send as deltas
+PARAMS = set(SpokeCalculation.model_fields)
+
+
+def component_inputs(rim: Rim, hub: Hub) -> Dict[str, Any]:
+    """Calculation inputs taken from the selected rim and hub."""
+    return {
+        "erd": rim.erd,
+        "rim_offset": rim.drilling_offset or 0,
+        "flange_diameter_left": hub.flange_diameter_left,
+        "flange_diameter_right": hub.flange_diameter_right,
+        "flange_offset_left": hub.flange_offset_left,
+        "flange_offset_right": hub.flange_offset_right,
+        "spoke_hole_diameter": hub.spoke_hole_diameter or 2.6,
+    }
+
+
+def calculate(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    calc = SpokeCalculation(**inputs)
+    result = calculate_full_analysis(
+        erd=calc.erd,
+        flange_diameter_left=calc.flange_diameter_left,
+        flange_diameter_right=calc.flange_diameter_right,
+        flange_offset_left=calc.flange_offset_left,
+        flange_offset_right=calc.flange_offset_right,
+        spoke_count=calc.spoke_count,
+        cross_pattern_left=calc.cross_pattern_left,
+        cross_pattern_right=calc.cross_pattern_right,
+        spoke_hole_diameter=calc.spoke_hole_diameter or 2.6,
+        rim_offset=calc.rim_offset or 0,
+    )
+    return SpokeResult(**result).model_dump()
+
+
+class LiveCalculation:
+    """State and tasks for one live-calculation connection."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.inputs: Dict[str, Any] = {"spoke_count": 32, "cross_pattern_left": 3, "cross_pattern_right": 3}
+        self.selected = False
+        self.seq: Optional[int] = None
+        self.dirty = asyncio.Event()
+
+    async def run(self) -> None:
+        await self.websocket.accept()
+        reader = asyncio.create_task(self._read_loop())
+        calculator = asyncio.create_task(self._calculate_loop())
+        tasks = {reader, calculator}
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # The reader ends when the client disconnects; anything else is a failure
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                name = "calculator" if task is calculator else "reader"
+                logger.error("Live calculation %s failed", name, exc_info=error)
+                await self._close(1011, f"Live calculation {name} failed: {type(error).__name__}")
+                return
+
+    async def _close(self, code: int, reason: str) -> None:
+        if self.websocket.client_state != WebSocketState.CONNECTED:
+            return
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except RuntimeError:
+            pass  # the client went away meanwhile
+
+    async def _send_error(self, detail: str, seq: Optional[int] = None) -> None:
+        await self.websocket.send_json({"type": "error", "seq": seq, "detail": detail})
+
+    async def _receive(self) -> Optional[Any]:
+        """The next message decoded, or None after replying with an error."""
+        frame = await self.websocket.receive()
+        if frame["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(frame.get("code", 1000), frame.get("reason"))
+        text = frame.get("text")
+        if text is None:
+            await self._send_error("Expected a text frame")
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            await self._send_error(f"Invalid JSON: {e}")
+            return None
+
+    async def _read_loop(self) -> None:
+        while True:
+            message = await self._receive()
+            if message is None:
+                continue
+            if not isinstance(message, dict):
+                await self._send_error("Expected a JSON object")
+                continue
+
+            kind = message.get("type")
+            if kind == "select":
+                await self._select(message)
+            elif kind == "params":
+                unknown = set(message) - PARAMS - {"type", "seq"}
+                if unknown:
+                    await self._send_error(f"Unknown parameters: {', '.join(sorted(unknown))}", message.get("seq"))
+                    continue
+                self.inputs.update({k: v for k, v in message.items() if k in PARAMS})
+                self.seq = message.get("seq", self.seq)
+            else:
+                await self._send_error("type must be 'select' or 'params'", message.get("seq"))
+                continue
+
+            if self.selected:
+                self.dirty.set()
+
+    async def _select(self, message: Dict[str, Any]) -> None:
+        def load():
+            db = SessionLocal()
+            try:
+                rim = db.query(Rim).filter(Rim.id == message.get("rim_id")).first()
+                hub = db.query(Hub).filter(Hub.id == message.get("hub_id")).first()
+                if not rim or not hub:
+                    return None
+                return (
+                    component_inputs(rim, hub),
+                    {"id": rim.id, "manufacturer": rim.manufacturer, "model": rim.model},
+                    {"id": hub.id, "manufacturer": hub.manufacturer, "model": hub.model},
+                )
+            finally:
+                db.close()
+
+        loaded = await asyncio.to_thread(load)
+        if loaded is None:
+            await self._send_error("Rim or hub not found", message.get("seq"))
+            return
+
+        inputs, rim, hub = loaded
+        self.inputs.update(inputs)
+        self.selected = True
+        await self.websocket.send_json({"type": "selected", "rim": rim, "hub": hub})
+
+    async def _calculate_loop(self) -> None:
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            # Whatever arrived up to now is folded into this one calculation
+            inputs, seq = dict(self.inputs), self.seq
+            try:
+                # Off the event loop, so the reader keeps draining deltas meanwhile
+                result = await asyncio.to_thread(calculate, inputs)
+            except (ValidationError, ValueError, ZeroDivisionError) as e:
+                await self._send_error(str(e), seq)
+                continue
+            await self.websocket.send_json({"type": "result", "seq": seq, "result": result})
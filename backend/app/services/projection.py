@@ -0,0 +1,80 @@
+"""
+Sparse fieldsets (`?fields=`) for the list endpoints.
+
+Requested scalar fields map to `load_only`, so unrequested columns are
+neither selected nor hydrated; requested relationships are joined-loaded
+and serialized with the same nested schema as the full response.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Query, joinedload, load_only
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """
+    Split a comma-separated `fields` parameter and check it against `schema`.
+
+    Returns None when no projection was requested. `id` is always included.
+    """
+    if not fields:
+        return None
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def apply_projection(query: Query, model: Type, fields: List[str]) -> Query:
+    """Restrict the query to the requested columns and relationships."""
+    mapper = sa_inspect(model)
+    columns = [getattr(model, f) for f in fields if f in mapper.column_attrs]
+    options = [load_only(*columns, raiseload=False)]
+
+    for name in fields:
+        if name in mapper.relationships:
+            options.append(joinedload(getattr(model, name)))
+
+    return query.options(*options)
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Type[BaseModel], field: str) -> TypeAdapter:
+    return TypeAdapter(schema.model_fields[field].annotation)
+
+
+def project_rows(rows: List[Any], schema: Type[BaseModel], fields: List[str]) -> List[Dict[str, Any]]:
+    """Serialize ORM rows to dicts holding only the requested fields."""
+    if not rows:
+        return []
+    nested = _relationship_fields(type(rows[0])) & set(fields)
+
+    result = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = getattr(row, name)
+            if name in nested:
+                adapter = _adapter(schema, name)
+                value = adapter.dump_python(
+                    adapter.validate_python(value, from_attributes=True), mode="json"
+                )
+            item[name] = value
+        result.append(item)
+    return jsonable_encoder(result)
+
+
+@lru_cache(maxsize=None)
+def _relationship_fields(model: Type) -> frozenset:
+    return frozenset(sa_inspect(model).relationships.keys())
@@ -0,0 +1,79 @@
+"""
+Spoke order totals across many builds.
+
+Each build needs spoke_count / 2 spokes per side. Both sides are stacked
+with UNION ALL and grouped by (rounded length, side) in the database, so
+one query covers any number of builds.
+"""
+
+import csv
+import io
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..models.build import Build
+
+
+def spoke_order_lines(
+    db: Session,
+    build_ids: Optional[Sequence[int]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    step: float = 1.0,
+) -> Dict[str, Any]:
+    """Quantities per (length rounded to `step` mm, side) for the selected builds."""
+    filters = []
+    if build_ids:
+        filters.append(Build.id.in_(build_ids))
+    if since:
+        filters.append(Build.created_at >= since)
+    if until:
+        filters.append(Build.created_at < until)
+
+    def side(name: str, length_column):
+        return select(
+            Build.id.label("build_id"),
+            literal(name).label("side"),
+            (func.round(length_column / step) * step).label("length"),
+            (Build.spoke_count / 2).label("quantity"),
+        ).where(*filters)
+
+    spokes = union_all(
+        side("left", Build.spoke_length_left),
+        side("right", Build.spoke_length_right),
+    ).subquery()
+
+    rows = db.execute(
+        select(
+            spokes.c.length,
+            spokes.c.side,
+            func.sum(spokes.c.quantity),
+            func.count(spokes.c.build_id.distinct()),
+        )
+        .group_by(spokes.c.length, spokes.c.side)
+        .order_by(spokes.c.length, spokes.c.side)
+    ).all()
+
+    build_count = db.execute(select(func.count(Build.id)).where(*filters)).scalar()
+
+    lines = [
+        {"length": round(float(length), 3), "side": side_name, "quantity": int(quantity), "builds": builds}
+        for length, side_name, quantity, builds in rows
+    ]
+    return {
+        "build_count": build_count,
+        "total_spokes": sum(line["quantity"] for line in lines),
+        "lines": lines,
+    }
+
+
+def spoke_order_csv(lines: List[Dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["length_mm", "side", "quantity", "builds"])
+    for line in lines:
+        writer.writerow([f"{line['length']:g}", line["side"], line["quantity"], line["builds"]])
+    return buffer.getvalue()
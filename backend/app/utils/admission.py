@@ -0,0 +1,194 @@
+"""
+Admission control for the API workers.
+
+Every request takes a slot from one shared limiter sized below the
+threadpool, so sync handlers can never occupy every thread. When it is
+full, waiting requests are admitted by priority: interactive calculator
+and build-sheet requests first, ordinary API calls next, heavy operations
+last. Heavy operations (imports, exports, bulk builds, batches) also have
+small per-class limits, so one user's import cannot crowd out mechanics.
+Each sub-request of a POST /batch takes a shared slot of its own as well,
+since it runs its sync code on the same threadpool.
+
+Queues are bounded and waits are short: a request that cannot get a slot
+in time gets an immediate 429 with Retry-After rather than piling up.
+GET /health/admission reports active and queued requests per limiter.
+"""
+
+import asyncio
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+
+from .auth import batch_user
+from .tracing import span
+
+INTERACTIVE, STANDARD, HEAVY = 0, 1, 2
+
+
+class Limiter:
+    """Concurrency limit with a bounded, priority-ordered wait queue."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    async def acquire(self, priority: int = STANDARD) -> bool:
+        """Take a slot, waiting up to `max_wait`; False if the request should be rejected."""
+        if self.active < self.concurrency and not self.waiting:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        slot = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._order), slot))
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slot, self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            if slot.done() and not slot.cancelled():
+                return True  # handed a slot just as the wait expired
+            self.waiting -= 1
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                self.release()
+            else:
+                self.waiting -= 1
+            raise
+
+    def release(self) -> None:
+        """Give the slot to the highest-priority waiter, or free it."""
+        while self._queue:
+            _, _, slot = heapq.heappop(self._queue)
+            if not slot.done():
+                self.waiting -= 1
+                self.admitted += 1
+                slot.set_result(True)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+@dataclass
+class RouteClass:
+    name: str
+    priority: int
+    routes: List[Tuple[str, Pattern]]
+    limiter: Optional[Limiter] = None
+    retry_after: int = 1
+
+
+def _routes(*specs: str) -> List[Tuple[str, Pattern]]:
+    return [
+        (method, re.compile(f"^{path}/?$"))
+        for method, path in (spec.split(" ", 1) for spec in specs)
+    ]
+
+
+# Shared by all requests; below anyio's default 40 worker threads
+SHARED = Limiter("shared", concurrency=32, queue_size=128, max_wait=10.0)
+
+ROUTE_CLASSES = [
+    RouteClass("interactive", INTERACTIVE, _routes("POST /calculate", r"GET /builds/\d+")),
+    RouteClass(
+        "import", HEAVY, _routes(r"POST /(rims|hubs)/import"),
+        Limiter("import", concurrency=1, queue_size=2, max_wait=2.0), retry_after=30,
+    ),
+    RouteClass(
+        "export", HEAVY, _routes(r"GET /(rims|hubs)/export"),
+        Limiter("export", concurrency=2, queue_size=4, max_wait=2.0), retry_after=10,
+    ),
+    RouteClass(
+        "bulk", HEAVY, _routes("POST /builds/bulk", "POST /builds/spoke-order"),
+        Limiter("bulk", concurrency=2, queue_size=8, max_wait=5.0), retry_after=5,
+    ),
+    RouteClass(
+        "batch", STANDARD, _routes("POST /batch"),
+        Limiter("batch", concurrency=8, queue_size=16, max_wait=5.0), retry_after=2,
+    ),
+]
+
+DEFAULT_CLASS = RouteClass("standard", STANDARD, [])
+
+# Never limited, so monitoring keeps working while the API is saturated
+EXEMPT_PREFIXES = ("/health", "/metrics")
+
+
+def classify(method: str, path: str) -> RouteClass:
+    for route_class in ROUTE_CLASSES:
+        for route_method, pattern in route_class.routes:
+            if method == route_method and pattern.match(path):
+                return route_class
+    return DEFAULT_CLASS
+
+
+def snapshot() -> Dict[str, Dict[str, int]]:
+    limiters = [SHARED] + [c.limiter for c in ROUTE_CLASSES if c.limiter]
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        route_class = classify(scope["method"], scope["path"])
+        if batch_user.get() is not None:
+            # Sub-request of an admitted POST /batch: the batch limiter already
+            # counted the batch, but its sub-requests still use worker threads
+            limiters = [SHARED]
+        else:
+            limiters = [l for l in (route_class.limiter, SHARED) if l]
+
+        acquired = []
+        with span("admission", route_class=route_class.name):
+            for limiter in limiters:
+                if not await limiter.acquire(route_class.priority):
+                    break
+                acquired.append(limiter)
+
+        if len(acquired) < len(limiters):
+            for held in acquired:
+                held.release()
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=429,
+                headers={"Retry-After": str(route_class.retry_after)},
+            )
+            return await response(scope, receive, send)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for held in reversed(acquired):
+                held.release()
@@ -1,4 +1,6 @@
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
 import httpx
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -7,13 +9,58 @@ from sqlalchemy.orm import Session
 from ..config import get_settings
 from ..database import get_db
 from ..models.user import User
+from .tracing import span
 
 settings = get_settings()
 security = HTTPBearer()
 
+# Set by POST /batch while its sub-requests run, so they reuse the user the
+# batch request already verified instead of each re-checking the token
+batch_user: ContextVar[Optional[User]] = ContextVar("batch_user", default=None)
+
+# Who the request authenticated as, for middleware that acts on it afterwards
+# (admin-only X-Trace and X-Profile). A mutable dict, so what get_current_user
+# records is visible to the middleware whichever context copy it ran in.
+_request_user: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_user", default=None)
+
+
+@contextmanager
+def request_user_slot() -> Iterator[Dict[str, Any]]:
+    """
+    Collect the user this request resolves while the block runs.
+
+    The dict gets `id`, `name` and `is_admin` once get_current_user has
+    run, and stays empty for anonymous requests. Nested calls share the
+    outermost slot.
+    """
+    slot = _request_user.get()
+    if slot is not None:
+        yield slot
+        return
+
+    slot = {}
+    token = _request_user.set(slot)
+    try:
+        yield slot
+    finally:
+        _request_user.reset(token)
+
+
+def _record_user(user: User) -> User:
+    slot = _request_user.get()
+    if slot is not None:
+        # Plain values: the instance may be expired or detached by the time they are read
+        slot.update(id=user.id, name=user.name, is_admin=bool(user.is_admin and user.is_active))
+    return user
+
 
 async def verify_clerk_token(token: str) -> Optional[dict]:
     """Verify a Clerk JWT token and return the payload."""
+    with span("auth.verify_token"):
+        return await _verify_clerk_token(token)
+
+
+async def _verify_clerk_token(token: str) -> Optional[dict]:
     try:
         # Clerk tokens can be verified using their JWKS
         # First, get the JWKS from Clerk
@@ -26,7 +73,8 @@ async def verify_clerk_token(token: str) -> Optional[dict]:
                 return None
 
             jwks_url = f"{issuer}/.well-known/jwks.json"
-            response = await client.get(jwks_url)
+            with span("auth.jwks_fetch"):
+                response = await client.get(jwks_url)
 
             if response.status_code != 200:
                 return None
@@ -73,6 +121,10 @@ async def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     """Get the current user from a Clerk JWT token."""
+    user = batch_user.get()
+    if user is not None:
+        return _record_user(user)
+
     token = credentials.credentials
     payload = await verify_clerk_token(token)
 
@@ -92,7 +144,8 @@ async def get_current_user(
         )
 
     # Find or create user in our database
-    user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
+    with span("auth.user_lookup"):
+        user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
 
     if not user:
         # Create user from Clerk data
@@ -117,7 +170,7 @@ async def get_current_user(
             detail="User account is disabled",
         )
 
-    return user
+    return _record_user(user)
 
 
 async def get_current_user_optional(
@@ -128,6 +181,10 @@ async def get_current_user_optional(
     if credentials is None:
         return None
 
+    user = batch_user.get()
+    if user is not None:
+        return _record_user(user)
+
     token = credentials.credentials
     payload = await verify_clerk_token(token)
 
@@ -139,7 +196,7 @@ async def get_current_user_optional(
         return None
 
     user = db.query(User).filter(User.clerk_id == clerk_user_id).first()
-    return user if user and user.is_active else None
+    return _record_user(user) if user and user.is_active else None
 
 
 def require_admin(user: User = Depends(get_current_user)) -> User:
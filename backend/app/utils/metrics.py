@@ -0,0 +1,218 @@
+"""
+Per-route request and database metrics, exposed in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template (`/builds/{build_id}`, not `/builds/123`), so label cardinality
+stays bounded. SQL statements are counted and timed with SQLAlchemy
+cursor events and attributed to the request that issued them through a
+context variable, which also follows sync endpoints into the threadpool.
+
+Everything lives in process memory; with several uvicorn workers each
+worker reports its own numbers.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+# Request latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# SQL statements issued by one request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestQueries:
+    """SQL statements issued while handling one request."""
+    count: int = 0
+    seconds: float = 0.0
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queries: Dict[Tuple[str, str], Histogram] = {}
+        self.query_seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, queries: RequestQueries) -> None:
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, str(status))] += 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(queries.count)
+            self.query_seconds[key] += queries.seconds
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            _header(lines, "http_requests_in_flight", "gauge", "Requests currently being handled.")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            _header(lines, "http_requests_total", "counter", "Requests handled, by route and status.")
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+            _header(lines, "http_request_duration_seconds", "histogram", "Request latency, by route.")
+            for (method, route), hist in sorted(self.latency.items()):
+                _histogram(lines, "http_request_duration_seconds", hist, method=method, route=route)
+
+            _header(lines, "db_queries_per_request", "histogram", "SQL statements issued per request, by route.")
+            for (method, route), hist in sorted(self.queries.items()):
+                _histogram(lines, "db_queries_per_request", hist, method=method, route=route)
+
+            _header(lines, "db_query_duration_seconds_total", "counter", "Time spent executing SQL, by route.")
+            for (method, route), seconds in sorted(self.query_seconds.items()):
+                lines.append(
+                    f"db_query_duration_seconds_total{_labels(method=method, route=route)} {_number(seconds)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: List[str], name: str, hist: Histogram, **labels: str) -> None:
+    cumulative = 0
+    for bound, n in zip(hist.buckets, hist.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=_number(float(bound)))} {cumulative}")
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {hist.count}')
+    lines.append(f"{name}_sum{_labels(**labels)} {_number(hist.sum)}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+
+def render_metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> str:
+    """Metrics kept elsewhere (admission, coalescing) in the same text format."""
+    lines: List[str] = []
+    _header(lines, name, kind, help_text)
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(**labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append((statement, time.perf_counter()))
+
+
+def _count_query(started: float) -> None:
+    queries = current_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += time.perf_counter() - started
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_started"].pop()
+    _count_query(started)
+
+
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute: pop it here, or the
+    # pooled connection's stack would pair later statements with stale starts
+    conn = exception_context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    if started and started[-1][0] == exception_context.statement:
+        _count_query(started.pop()[1])
+
+
+def install_query_metrics(engine) -> None:
+    """Attribute the engine's SQL statements to the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def route_template(scope) -> str:
+    """The matched route's path template, for use as a metric label."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    # Answered before routing (429s, coalesced responses): match it ourselves
+    app = scope.get("app")
+    for candidate in getattr(app, "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return candidate.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+
+        async def record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight -= 1
+            current_queries.reset(token)
+            metrics.observe(scope["method"], route_template(scope), status, elapsed, queries)
@@ -0,0 +1,284 @@
+"""
+On-demand cProfile of single requests, for admins.
+
+An admin sends `X-Profile: 1` with any request; the response carries
+`X-Profile-Id`, and GET /profiles/{id} returns the profile (pstats for
+snakeviz / `python -m pstats`, or a text summary). If the request is not
+profiled the response says why in `X-Profile-Skipped`.
+
+cProfile only sees the thread it runs in, while a request normally
+spreads over the event loop (auth, async code) and threadpool workers
+(sync endpoints, `get_db`, serialization). A profiled request therefore
+runs on a private event loop in one thread, with threadpool hand-offs
+made inline for that request only (anyio's run_sync is swapped just
+while a profile runs). Nothing else shares that loop, so the profile
+contains just this request.
+
+The request's own authentication decides whether the profile is kept:
+`X-Profile-Id` is added, and the profile saved, only if the user that
+get_current_user resolved is an admin. Routes without authentication
+verify the token once, when the response starts. Before any of that,
+requests without a bearer token are not profiled at all.
+
+Safe to leave enabled: one profile runs at a time per process, at most
+one every MIN_INTERVAL seconds, profiles over MAX_PROFILE_BYTES are
+discarded, and only the newest MAX_STORED_PROFILES are kept on disk.
+"""
+
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import anyio.to_thread
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.user import User
+from .auth import batch_user, request_user_slot, verify_clerk_token
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+PROFILE_HEADER = b"x-profile"
+MIN_INTERVAL = 5.0
+MAX_PROFILE_BYTES = 5 * 1024 * 1024
+MAX_STORED_PROFILES = 50
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+# Set while a profiled request runs; threadpool calls then run inline
+_inline: ContextVar[bool] = ContextVar("profile_inline", default=False)
+
+_original_run_sync = anyio.to_thread.run_sync
+
+
+async def _run_sync(func, *args, **kwargs):
+    if _inline.get():
+        return func(*args)
+    return await _original_run_sync(func, *args, **kwargs)
+
+
+class _InlineThreadpool:
+    """
+    Route anyio's run_sync through _run_sync while a profile runs.
+
+    Requests running alongside still get the real threadpool (`_inline`
+    is unset in their context); the swap is undone once the profile ends.
+    Profiles never overlap (see `gate`), so no reference count is needed.
+    """
+
+    def __enter__(self) -> None:
+        anyio.to_thread.run_sync = _run_sync
+
+    def __exit__(self, *exc) -> None:
+        anyio.to_thread.run_sync = _original_run_sync
+
+
+class _Gate:
+    """One profile at a time, and not more often than MIN_INTERVAL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._busy = False
+        self._last = 0.0
+
+    def acquire(self) -> Optional[str]:
+        with self._lock:
+            if self._busy:
+                return "busy"
+            if time.monotonic() - self._last < MIN_INTERVAL:
+                return "rate-limited"
+            self._busy = True
+            self._last = time.monotonic()
+            return None
+
+    def release(self) -> None:
+        with self._lock:
+            self._busy = False
+
+
+gate = _Gate()
+
+
+def _profile_dir() -> str:
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    return settings.profile_dir
+
+
+def _path(profile_id: str, ext: str) -> str:
+    return os.path.join(_profile_dir(), f"{profile_id}.{ext}")
+
+
+def save_profile(profile_id: str, profiler: cProfile.Profile, meta: Dict[str, Any]) -> bool:
+    stats = pstats.Stats(profiler)
+    data = marshal.dumps(stats.stats)
+    if len(data) > MAX_PROFILE_BYTES:
+        logger.warning("Profile of %s %s discarded: %d bytes", meta["method"], meta["path"], len(data))
+        return False
+
+    with open(_path(profile_id, "prof"), "wb") as f:
+        f.write(data)
+    meta.update(id=profile_id, size=len(data), total_calls=stats.total_calls)
+    with open(_path(profile_id, "json"), "w") as f:
+        json.dump(meta, f)
+
+    for old in list_profiles()[MAX_STORED_PROFILES:]:
+        delete_profile(old["id"])
+    return True
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Stored profile metadata, newest first."""
+    profiles = []
+    for name in os.listdir(_profile_dir()):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(_profile_dir(), name)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = _path(profile_id, "prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_text(profile_id: str, sort: str = "cumulative", limit: int = 60) -> Optional[str]:
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def delete_profile(profile_id: str) -> bool:
+    if not PROFILE_ID.match(profile_id):
+        return False
+    found = False
+    for ext in ("prof", "json"):
+        try:
+            os.remove(_path(profile_id, ext))
+            found = True
+        except FileNotFoundError:
+            pass
+    return found
+
+
+def _bearer_token(scope) -> Optional[str]:
+    headers = dict(scope.get("headers") or [])
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+async def _admin_from_token(token: str) -> Optional[User]:
+    """Admin check for routes that do not authenticate (runs on the profile's own loop)."""
+    payload = await verify_clerk_token(token)
+    if not payload or not payload.get("sub"):
+        return None
+
+    # Already on the profile's own thread: no threadpool hand-off
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.clerk_id == payload["sub"]).first()
+        if user:
+            db.expunge(user)
+    finally:
+        db.close()
+    return user if user and user.is_active and user.is_admin else None
+
+
+def _with_header(message, name: bytes, value: str):
+    if message["type"] == "http.response.start":
+        message = {**message, "headers": [*message.get("headers", []), (name, value.encode())]}
+    return message
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or batch_user.get() is not None:
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER, b"").lower() not in (b"1", b"true"):
+            return await self.app(scope, receive, send)
+
+        # Cheap checks only: the request authenticates itself while profiled
+        token = _bearer_token(scope)
+        skipped = "not-admin" if token is None else gate.acquire()
+        if skipped:
+            return await self.app(scope, receive, lambda m: send(_with_header(m, b"x-profile-skipped", skipped)))
+
+        try:
+            with request_user_slot() as user, _InlineThreadpool():
+                await self._profile(scope, receive, send, token, user)
+        finally:
+            gate.release()
+
+    async def _profile(self, scope, receive, send, token: str, user: Dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        profile_id = secrets.token_hex(8)
+        status = 500
+
+        # The private loop reaches the real connection through the server's loop
+        async def bridged_receive():
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(receive(), loop))
+
+        async def bridged_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if "is_admin" not in user and status not in (401, 403):
+                    # The route did not authenticate; check the token ourselves
+                    admin = await _admin_from_token(token)
+                    user.update(is_admin=admin is not None, name=admin.name if admin else None)
+                if user.get("is_admin"):
+                    message = _with_header(message, b"x-profile-id", profile_id)
+                else:
+                    message = _with_header(message, b"x-profile-skipped", "not-admin")
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(send(message), loop))
+
+        def run():
+            profiler = cProfile.Profile()
+            _inline.set(True)
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                asyncio.run(self.app(scope, bridged_receive, bridged_send))
+            finally:
+                profiler.disable()
+            return profiler, time.perf_counter() - started
+
+        profiler, elapsed = await _original_run_sync(run)
+        if not user.get("is_admin"):
+            return
+        meta = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 1),
+            "user": user["name"],
+        }
+        await _original_run_sync(save_profile, profile_id, profiler, meta)
@@ -0,0 +1,209 @@
+"""
+Opt-in SQL inspection for development and CI (QUERY_INSPECTOR=true).
+
+- Statements slower than SLOW_QUERY_MS are logged with the line of app
+  code that issued them.
+- Within one request, the same statement shape repeated
+  REPEATED_QUERY_THRESHOLD or more times is logged as a likely N+1
+  (typically a lazy-loaded relationship such as `measured_by` being
+  touched once per row while a response is serialized).
+- Requests that issue more statements than their route's entry in
+  QUERY_BUDGETS are logged. scripts/check_query_budgets.py enforces the
+  same budgets and exits non-zero, so a regression fails CI.
+
+Tests can also wrap any code in `query_budget(n)`, which raises
+QueryBudgetExceeded (an AssertionError) listing the statements issued.
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Most statements each route may issue per request, keyed by (method, route template)
+# (authenticated routes include the one lookup of the current user)
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("GET", "/rims"): 1,
+    ("GET", "/hubs"): 1,
+    ("GET", "/rims/{rim_id}"): 1,
+    ("GET", "/hubs/{hub_id}"): 1,
+    ("GET", "/builds"): 2,
+    ("GET", "/builds/{build_id}"): 1,
+    ("GET", "/analytics"): 10,
+    ("GET", "/catalog/changes"): 4,
+}
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+_LIBRARY_MARKERS = (os.sep + "sqlalchemy" + os.sep, os.sep + "pydantic" + os.sep)
+
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)"
+# Expanded IN lists differ only in length; count them as one shape
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryLog:
+    """Statements issued within one request or query_budget() block."""
+    shapes: Counter = field(default_factory=Counter)
+    call_sites: Dict[str, str] = field(default_factory=dict)
+    statements: List[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, str]]:
+        return [
+            (shape, n, self.call_sites.get(shape, "?"))
+            for shape, n in self.shapes.most_common()
+            if n >= threshold
+        ]
+
+
+current_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+# Open query_budget() blocks; they see statements from every thread, since a
+# test client may run the app on a different thread than the test
+_budget_logs: List[QueryLog] = []
+
+
+def statement_shape(statement: str) -> str:
+    """A statement with whitespace and IN-list lengths normalized."""
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def call_site() -> str:
+    """The innermost app frame on the stack, else the innermost non-ORM frame."""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        # "<string>" frames are SQLAlchemy's generated code
+        if filename != _THIS_FILE and not frame.f_code.co_filename.startswith("<"):
+            location = f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+            if filename.startswith(APP_DIR):
+                return os.path.relpath(filename, os.path.dirname(APP_DIR)) + location[len(filename):]
+            if fallback is None and not any(marker in filename for marker in _LIBRARY_MARKERS):
+                fallback = location
+        frame = frame.f_back
+    return fallback or "?"
+
+
+class QueryInspector:
+    def __init__(self, slow_query_ms: float, repeated_threshold: int):
+        self.slow_seconds = slow_query_ms / 1000
+        self.repeated_threshold = repeated_threshold
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inspector_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["inspector_started"].pop()
+
+        shape = statement_shape(statement)
+        site = None
+        request_log = current_log.get()
+        for log in ([request_log] if request_log else []) + _budget_logs:
+            log.statements.append(statement)
+            log.shapes[shape] += 1
+            if shape not in log.call_sites:
+                site = log.call_sites[shape] = site or call_site()
+
+        if elapsed >= self.slow_seconds:
+            logger.warning(
+                "Slow query (%.0f ms) at %s: %s",
+                elapsed * 1000, site or call_site(), shape[:1000],
+            )
+
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def report(self, method: str, route: str, log: QueryLog) -> None:
+        for shape, n, site in log.repeated(self.repeated_threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: %d identical queries from %s: %s",
+                method, route, n, site, shape[:500],
+            )
+
+        budget = QUERY_BUDGETS.get((method, route))
+        if budget is not None and log.count > budget:
+            logger.warning(
+                "%s %s issued %d queries (budget %d)",
+                method, route, log.count, budget,
+            )
+
+
+_inspector: Optional[QueryInspector] = None
+
+
+def install_query_inspector(engine, slow_query_ms: float = 200, repeated_threshold: int = 5) -> QueryInspector:
+    """Start inspecting the engine's statements (once per process)."""
+    global _inspector
+    if _inspector is None:
+        _inspector = QueryInspector(slow_query_ms, repeated_threshold)
+        _inspector.install(engine)
+    return _inspector
+
+
+@contextmanager
+def query_budget(limit: int) -> Iterator[QueryLog]:
+    """
+    Fail if the block issues more than `limit` statements.
+
+        with query_budget(2):
+            client.get("/rims")
+
+    Requires install_query_inspector() on the engine the code uses.
+    """
+    if _inspector is None:
+        raise RuntimeError("install_query_inspector() has not been called")
+
+    log = QueryLog()
+    _budget_logs.append(log)
+    try:
+        yield log
+    finally:
+        _budget_logs.remove(log)
+
+    if log.count > limit:
+        listing = "\n".join(f"  {n}x {shape[:300]}" for shape, n in log.shapes.most_common())
+        raise QueryBudgetExceeded(f"{log.count} queries issued, budget is {limit}:\n{listing}")
+
+
+class QueryInspectorMiddleware:
+    """Collects each request's statements and reports N+1s and budget overruns."""
+
+    def __init__(self, app, inspector: QueryInspector):
+        self.app = app
+        self.inspector = inspector
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        log = QueryLog()
+        token = current_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_log.reset(token)
+            self.inspector.report(scope["method"], route_template(scope), log)
@@ -0,0 +1,162 @@
+"""
+Singleflight coalescing for identical concurrent reads.
+
+When several clients make the same request at the same moment (every
+tablet loading the catalog when the shop opens), only the first one runs;
+the others wait for it and receive a copy of the same serialized response.
+Nothing is cached: once the leading request finishes, the next identical
+request runs normally.
+
+Only endpoints whose response does not depend on the caller are
+coalesced (COALESCED_ROUTES). Requests are identical when method, path,
+query string, Accept header and body all match. Only 2xx responses are
+shared, without headers that belong to the leading request alone
+(PER_REQUEST_HEADERS); after an error or a 429 each waiting request runs
+itself.
+"""
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+COALESCED_ROUTES: Set[Tuple[str, str]] = {
+    ("GET", "/rims"),
+    ("GET", "/hubs"),
+    ("GET", "/rims/manufacturers"),
+    ("GET", "/hubs/manufacturers"),
+    ("POST", "/calculate"),
+}
+
+# Larger request/response bodies are not shared
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# Response headers describing the leading request, not the response
+PER_REQUEST_HEADERS = {
+    b"x-profile-id", b"x-profile-skipped",
+    b"x-request-id", b"traceparent", b"tracestate",
+    b"retry-after", b"set-cookie",
+}
+
+
+class SingleflightStats:
+    """Per-route counts of executed and coalesced requests."""
+
+    def __init__(self):
+        self.executed: Dict[str, int] = defaultdict(int)
+        self.coalesced: Dict[str, int] = defaultdict(int)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        routes = sorted(set(self.executed) | set(self.coalesced))
+        return {
+            route: {"executed": self.executed[route], "coalesced": self.coalesced[route]}
+            for route in routes
+        }
+
+
+stats = SingleflightStats()
+
+
+class _NotShareable(Exception):
+    pass
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    more = True
+    while more:
+        message = await receive()
+        body += message.get("body", b"")
+        more = message.get("more_body", False)
+    return body
+
+
+def _replay_receive(body: bytes):
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+class SingleflightMiddleware:
+    """ASGI middleware; add it before CORSMiddleware so CORS headers stay per-request."""
+
+    def __init__(self, app, routes: Set[Tuple[str, str]] = COALESCED_ROUTES):
+        self.app = app
+        self.routes = routes
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        if (method, path) not in self.routes:
+            return await self.app(scope, receive, send)
+
+        route = f"{method} {path}"
+        body = await _read_body(receive) if method != "GET" else b""
+        receive = _replay_receive(body)
+        if len(body) > MAX_BODY_BYTES:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        key = (
+            method, path, scope.get("query_string", b""),
+            headers.get(b"accept", b""), hashlib.sha256(body).digest(),
+        )
+
+        flight = self.inflight.get(key)
+        if flight is not None:
+            try:
+                status, response_headers, chunks = await asyncio.shield(flight)
+            except Exception:
+                # Leader failed or its response was too large; run ourselves
+                stats.executed[route] += 1
+                return await self.app(scope, receive, send)
+            stats.coalesced[route] += 1
+            await send({"type": "http.response.start", "status": status, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+            return
+
+        flight = asyncio.get_running_loop().create_future()
+        self.inflight[key] = flight
+        stats.executed[route] += 1
+
+        start: Dict = {}
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capture(message):
+            nonlocal size
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= MAX_BODY_BYTES:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+            if size > MAX_BODY_BYTES or not 200 <= start.get("status", 500) < 300:
+                raise _NotShareable()
+            shared_headers = [
+                (name, value) for name, value in start.get("headers", [])
+                if name.lower() not in PER_REQUEST_HEADERS
+            ]
+            flight.set_result((start["status"], shared_headers, chunks))
+        except BaseException as e:
+            flight.set_exception(e if isinstance(e, Exception) else _NotShareable())
+            # Nobody may be waiting; don't log "exception never retrieved"
+            flight.exception()
+            if not isinstance(e, _NotShareable):
+                raise
+        finally:
+            del self.inflight[key]
@@ -0,0 +1,341 @@
+"""
+Lightweight span tracing with a local file exporter.
+
+Every HTTP request gets a trace ID, taken from nginx's `X-Request-ID`
+(or a W3C `traceparent`) when present so access logs and traces join
+up, and echoed back in the `X-Request-ID` response header. Spans record
+where the time went: the route handler (dependencies, endpoint and
+response serialization, via TracedRoute), Clerk token verification and
+its JWKS fetch, user lookup, each SQL statement, the endpoint itself and
+calculations.
+
+Spans are always collected (a few microseconds each). A finished trace
+is written, one JSON object per line, to TRACE_DIR/traces-<date>.jsonl
+when it was sampled (TRACE_SAMPLE_RATE), slower than TRACE_SLOW_MS,
+failed with a 5xx, or was requested with `X-Trace: 1` by an admin.
+Writing happens on a background thread, at most TRACE_MAX_PER_MINUTE
+traces and TRACE_MAX_MB_PER_DAY per day; the rest are dropped.
+scripts/show_traces.py reads the files.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from ..config import get_settings
+from .metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+MAX_SPANS = 1000
+RETENTION_DAYS = 7
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    id: int
+    parent_id: Optional[int]
+    name: str
+    start: float
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+class Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent_id: Optional[int], attrs: Dict[str, Any]) -> Optional[Span]:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS:
+                self.dropped += 1
+                return None
+            span = Span(len(self.spans) + 1, parent_id, name, time.perf_counter(), attrs=attrs)
+            self.spans.append(span)
+            return span
+
+    def as_dict(self, **fields) -> Dict[str, Any]:
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 3)
+
+        root = self.spans[0] if self.spans else None
+        return {
+            "trace_id": self.trace_id,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": ms((root.end or time.perf_counter()) - root.start) if root else 0,
+            **fields,
+            "spans": [
+                {
+                    "id": s.id,
+                    "parent_id": s.parent_id,
+                    "name": s.name,
+                    "start_ms": ms(s.start - self.start),
+                    "duration_ms": ms((s.end or s.start) - s.start),
+                    **({"attrs": s.attrs} if s.attrs else {}),
+                }
+                for s in self.spans
+            ],
+            "dropped_spans": self.dropped,
+        }
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span_id: ContextVar[Optional[int]] = ContextVar("current_span_id", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span. A no-op outside a traced request."""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = trace.start_span(name, current_span_id.get(), attrs)
+    if current is None:
+        yield None
+        return
+
+    token = current_span_id.set(current.id)
+    try:
+        yield current
+    finally:
+        current_span_id.reset(token)
+        current.end = time.perf_counter()
+
+
+class TraceExporter:
+    """
+    Appends finished traces to a daily JSON Lines file from a background thread.
+
+    At most `max_per_minute` traces are accepted per minute and at most
+    `max_bytes_per_day` written to each day's file; the rest are dropped.
+    """
+
+    def __init__(self, directory: str, max_per_minute: int, max_bytes_per_day: int):
+        self.directory = directory
+        self.max_per_minute = max_per_minute
+        self.max_bytes_per_day = max_bytes_per_day
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=1000)
+        self._thread: Optional[threading.Thread] = None
+        self._last_cleanup: Optional[str] = None
+        self._lock = threading.Lock()
+        self._minute = 0
+        self._minute_count = 0
+        self._day: Optional[str] = None
+        self._day_bytes = 0
+
+    def export(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            minute = int(time.monotonic() // 60)
+            if minute != self._minute:
+                self._minute, self._minute_count = minute, 0
+            if self._minute_count >= self.max_per_minute:
+                return
+            self._minute_count += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            pass  # never slow requests down for tracing
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                self._write(record)
+            except OSError:
+                logger.exception("Could not write trace")
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        today = record["started_at"][:10]
+        path = os.path.join(self.directory, f"traces-{today}.jsonl")
+        if self._day != today:
+            self._day = today
+            self._day_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+
+        line = (json.dumps(record, default=str) + "\n").encode()
+        if self._day_bytes + len(line) > self.max_bytes_per_day:
+            if self._day_bytes <= self.max_bytes_per_day:
+                logger.warning("Trace file for %s reached its size cap; dropping traces until tomorrow", today)
+                self._day_bytes = self.max_bytes_per_day + 1  # warn once
+            return
+        with open(path, "ab") as f:
+            f.write(line)
+        self._day_bytes += len(line)
+
+        if self._last_cleanup != today:
+            self._last_cleanup = today
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).date().isoformat()
+            for name in os.listdir(self.directory):
+                if name.startswith("traces-") and name[7:17] < cutoff:
+                    os.remove(os.path.join(self.directory, name))
+
+
+exporter = TraceExporter(
+    settings.trace_dir,
+    settings.trace_max_per_minute,
+    int(settings.trace_max_mb_per_day * 1024 * 1024),
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = current_trace.get()
+    if trace is not None:
+        conn.info.setdefault("trace_spans", []).append(
+            (statement, trace.start_span("db", current_span_id.get(), {"statement": statement[:200]}))
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans and current_trace.get() is not None:
+        _, db_span = spans.pop()
+        if db_span is not None:
+            db_span.end = time.perf_counter()
+
+
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute: pop its span here, or
+    # it would stay on the pooled connection and parent every later one
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans and spans[-1][0] == exception_context.statement:
+        _, db_span = spans.pop()
+        if db_span is not None:
+            db_span.end = time.perf_counter()
+            db_span.attrs["error"] = type(exception_context.original_exception).__name__
+
+
+def install_tracing(engine) -> None:
+    """Add SQL spans for the engine (routes get theirs from TracedRoute)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def _traced_endpoint(endpoint: Callable) -> Callable:
+    # Same kind of callable as the endpoint, so FastAPI still runs sync
+    # endpoints in the threadpool; functools.wraps keeps its signature
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def traced(*args, **kwargs):
+            with span("endpoint"):
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def traced(*args, **kwargs):
+            with span("endpoint"):
+                return endpoint(*args, **kwargs)
+    return traced
+
+
+class TracedRoute(APIRoute):
+    """
+    Route class adding a `handler` span (dependencies, endpoint and response
+    serialization) and an `endpoint` span around the endpoint function.
+
+    Pass it as `route_class` to every APIRouter.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _traced_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            with span("handler"):
+                return await handler(request)
+
+        return traced_handler
+
+
+def _trace_id(headers: Dict[bytes, bytes]) -> str:
+    match = _TRACEPARENT.match(headers.get(b"traceparent", b"").decode("latin-1"))
+    if match:
+        return match.group(1)
+    request_id = headers.get(b"x-request-id", b"").decode("latin-1")
+    if _REQUEST_ID.match(request_id):
+        return request_id
+    return uuid.uuid4().hex
+
+
+class TracingMiddleware:
+    def __init__(self, app):
+        # auth imports this module for span()
+        from .auth import request_user_slot
+
+        self.app = app
+        self.request_user_slot = request_user_slot
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        trace = Trace(_trace_id(headers))
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"x-request-id", trace.trace_id.encode())],
+                }
+            await send(message)
+
+        trace_token = current_trace.set(trace)
+        try:
+            with self.request_user_slot() as user, span("request", method=scope["method"], path=scope["path"]):
+                await self.app(scope, receive, send_with_id)
+        finally:
+            current_trace.reset(trace_token)
+
+            duration_ms = (trace.spans[0].end - trace.spans[0].start) * 1000
+            if (
+                status >= 500
+                or duration_ms >= settings.trace_slow_ms
+                # Forcing a trace writes to disk: admins only
+                or (headers.get(b"x-trace", b"").lower() in (b"1", b"true") and user.get("is_admin"))
+                or random.random() < settings.trace_sample_rate
+            ):
+                exporter.export(trace.as_dict(
+                    method=scope["method"],
+                    route=route_template(scope),
+                    path=scope["path"],
+                    status=status,
+                ))
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Benchmark the calculator, catalog parsers and API, and compare with a baseline.
+
+Four groups:
+
+- calculator: every function in app/services/spoke_calculator.py, plus a
+  sweep of calculate_full_analysis over many rim/hub pairs (the loop bulk
+  builds and /batch run).
+- parsers: the shared value and row parsers, the Freespoke and Spocalc
+  row mappers and the CSV/NDJSON sources, against the recorded rows in
+  scripts/benchmark_fixtures/, plus a full import pipeline run.
+- api: routes called through the whole app (middleware, auth override,
+  serialization) against a seeded scratch database.
+- serialization: rendering each hot route's response, the response_model
+  way and the route's own fast path, to set against the api timings.
+
+    python scripts/benchmark.py                     # run all, compare with the baseline
+    python scripts/benchmark.py --group calculator  # one group (repeatable)
+    python scripts/benchmark.py --output results.json
+    python scripts/benchmark.py --save-baseline     # accept these timings as the new baseline
+
+Each result is the best per-call time over several timed runs. The run
+fails (exit 1) if any benchmark is more than --tolerance slower than the
+baseline. Benchmarks whose baseline is under --min-us are reported but not
+gated: at a few microseconds, scheduler and cache noise alone moves them
+well past the tolerance.
+
+The baseline must be recorded on the machine that runs the comparison -
+timings from another machine (or a laptop vs CI) say nothing about a
+regression. The comparison warns when the baseline's platform differs.
+"""
+
+import sys
+import os
+import json
+import platform
+import tempfile
+import timeit
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(SCRIPT_DIR, "benchmark_fixtures")
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, "benchmark_baseline.json")
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+GROUPS = ("calculator", "parsers", "api", "serialization")
+ROWS = 100
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
+
+
+def measure(func, repeat=5):
+    """Best seconds per call, and the loop count each timed run used."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: each yields (name, zero-argument callable)
+# ---------------------------------------------------------------------------
+
+def calculator_benchmarks():
+    from app.services import spoke_calculator as calc
+
+    wheel = dict(
+        erd=601, flange_diameter_left=45, flange_diameter_right=45,
+        flange_offset_left=35.2, flange_offset_right=19.6, spoke_count=28,
+        cross_pattern_left=2, cross_pattern_right=3, spoke_hole_diameter=2.6, rim_offset=2.5,
+    )
+    wheels = [
+        {**wheel, "erd": 540 + i % 70, "flange_offset_right": 16 + i % 7,
+         "spoke_count": (24, 28, 32, 36)[i % 4], "cross_pattern_left": i % 4, "cross_pattern_right": 1 + i % 3}
+        for i in range(100)
+    ]
+
+    yield "calculate_spoke_length", lambda: calc.calculate_spoke_length(601, 45, 35.2, 28, 3, 2.6, 2.5)
+    yield "calculate_spoke_length_radial", lambda: calc.calculate_spoke_length(601, 45, 35.2, 28, 0)
+    yield "calculate_both_sides", lambda: calc.calculate_both_sides(601, 45, 45, 35.2, 19.6, 28, 2, 3, 2.6, 2.5)
+    yield "round_to_available_length", lambda: calc.round_to_available_length(287.4)
+    yield "calculate_bracing_angle", lambda: calc.calculate_bracing_angle(601, 35.2)
+    yield "calculate_tension_distribution", lambda: calc.calculate_tension_distribution(35.2, 19.6)
+    yield "calculate_wrap_angle", lambda: calc.calculate_wrap_angle(45, 2.6, 28, 3)
+    yield "calculate_theta_angle", lambda: calc.calculate_theta_angle(601, 45, 28, 3)
+    yield "calculate_full_analysis", lambda: calc.calculate_full_analysis(**wheel)
+    yield "calculate_full_analysis_x100", lambda: [calc.calculate_full_analysis(**w) for w in wheels]
+
+
+def parser_benchmarks():
+    import importlib.util
+    from app.database import SessionLocal
+    from app.services import import_pipeline as pipeline
+    import import_freespoke
+
+    rim_cells = load_fixture("freespoke_rims.json")
+    hub_cells = load_fixture("freespoke_hubs.json")
+    spocalc_records = load_fixture("spocalc_rims.json")
+    rims_csv = os.path.join(FIXTURES, "catalog_rims.csv")
+    hubs_ndjson = os.path.join(FIXTURES, "catalog_hubs.ndjson")
+
+    yield "parse_number", lambda: pipeline.parse_number("22,5 mm")
+    yield "parse_int", lambda: pipeline.parse_int("622 (700c)")
+    yield "parse_lr_value", lambda: pipeline.parse_lr_value("18 R, 31 L")
+    yield "parse_position", lambda: pipeline.parse_position("rear (boost)")
+    yield "clean_text", lambda: pipeline.clean_text("  n/a ")
+    yield "normalize_header", lambda: pipeline.normalize_header("Flange Offset Left")
+    yield "freespoke_rims", lambda: [
+        pipeline.parse_rim_record(import_freespoke.freespoke_rim_record(cells)) for cells in rim_cells
+    ]
+    yield "freespoke_hubs", lambda: [
+        pipeline.parse_hub_record(import_freespoke.freespoke_hub_record(cells)) for cells in hub_cells
+    ]
+    if importlib.util.find_spec("openpyxl") is not None:
+        # import_spocalc tries to pip install openpyxl when it is missing
+        import import_spocalc
+        yield "spocalc_rims", lambda: [import_spocalc.parse_spocalc_rim(r) for r in spocalc_records]
+    yield "csv_source_rims", lambda: [pipeline.parse_rim_record(r) for r in pipeline.CSVSource(rims_csv)]
+    yield "ndjson_source_hubs", lambda: [pipeline.parse_hub_record(r) for r in pipeline.JSONSource(hubs_ndjson)]
+
+    def import_rims():
+        db = SessionLocal()
+        try:
+            pipeline.rim_pipeline(update_existing=True).run(pipeline.CSVSource(rims_csv), db)
+        finally:
+            db.close()
+
+    yield "rim_pipeline_csv", import_rims
+
+
+def seeded_client():
+    """TestClient signed in as an admin, with ROWS rims, hubs and builds."""
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models import User
+    from app.utils.auth import get_current_user
+
+    db = SessionLocal()
+    user = User(clerk_id="benchmark", email="benchmark@example.com", name="Benchmark", is_admin=True)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+
+    rim_ids, hub_ids, build_ids = [], [], []
+    for i in range(ROWS):
+        rim = client.post("/rims", json={
+            "manufacturer": f"Maker {i % 7}", "model": f"Bench Rim {i}", "iso_size": 622, "erd": 600 - i * 0.5,
+        })
+        hub = client.post("/hubs", json={
+            "manufacturer": f"Maker {i % 7}", "model": f"Bench Hub {i}", "position": "rear", "spoke_count": 32,
+            "flange_diameter_left": 58, "flange_diameter_right": 46,
+            "flange_offset_left": 34, "flange_offset_right": 19,
+        })
+        rim.raise_for_status()
+        hub.raise_for_status()
+        rim_ids.append(rim.json()["id"])
+        hub_ids.append(hub.json()["id"])
+
+        build = client.post("/builds", json={
+            "rim_id": rim_ids[-1], "hub_id": hub_ids[-1], "spoke_count": 32,
+            "cross_pattern_left": 3, "cross_pattern_right": 3,
+            "spoke_length_left": 290, "spoke_length_right": 288, "customer_name": f"Customer {i}",
+        })
+        build.raise_for_status()
+        build_ids.append(build.json()["id"])
+
+    return client, rim_ids, hub_ids, build_ids
+
+
+def api_benchmarks():
+    client, rim_ids, hub_ids, build_ids = seeded_client()
+
+    def call(method, url, **kwargs):
+        def request():
+            response = client.request(method, url, **kwargs)
+            response.raise_for_status()
+        return request
+
+    calculation = {
+        "erd": 601, "flange_diameter_left": 45, "flange_diameter_right": 45,
+        "flange_offset_left": 35.2, "flange_offset_right": 19.6,
+        "spoke_count": 28, "cross_pattern_left": 2, "cross_pattern_right": 3,
+    }
+
+    yield "GET /health", call("GET", "/health")
+    yield "POST /calculate", call("POST", "/calculate", json=calculation)
+    yield "GET /rims", call("GET", "/rims")
+    yield "GET /rims?search", call("GET", "/rims?search=Rim%201")
+    yield "GET /rims/{rim_id}", call("GET", f"/rims/{rim_ids[0]}")
+    yield "GET /hubs", call("GET", "/hubs")
+    yield "GET /hubs/{hub_id}", call("GET", f"/hubs/{hub_ids[0]}")
+    yield "GET /builds", call("GET", "/builds")
+    yield "GET /builds?view=summary", call("GET", "/builds?view=summary")
+    yield "GET /builds/{build_id}", call("GET", f"/builds/{build_ids[0]}")
+    yield "GET /analytics", call("GET", "/analytics")
+    yield "GET /catalog/changes", call("GET", "/catalog/changes?since=0")
+    yield "POST /batch", call("POST", "/batch", json={"requests": [
+        {"path": "/rims", "params": {"limit": 20}},
+        {"path": f"/hubs/{hub_ids[1]}"},
+        {"method": "POST", "path": "/calculate", "body": calculation},
+        {"path": "/builds", "params": {"view": "summary", "limit": 20}},
+    ]})
+    # Writes builds, so it runs last and does not grow the lists timed above
+    yield "POST /builds/bulk", call("POST", "/builds/bulk", json={"items": [
+        {"rim_id": rim_ids[i], "hub_id": hub_ids[i], "spoke_count": 32, "cross_pattern_left": 3, "cross_pattern_right": 2}
+        for i in range(10)
+    ]})
+
+    client.close()
+
+
+def serialization_benchmarks():
+    """
+    Response serialization alone, per route, the response_model way next to
+    the fast path the route now takes (services/serialization.py). Set
+    against the api group's request times, this is serialization's share of
+    each request.
+    """
+    import json
+    from typing import List
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy.orm import joinedload
+    from app.database import SessionLocal
+    from app.models import Hub, Rim
+    from app.routers import hubs, rims
+    from app.routers.builds import list_build_summaries
+    from app.schemas.calculator import SpokeResult
+    from app.schemas.hub import HubResponse
+    from app.schemas.rim import RimResponse
+    from app.services.serialization import FastJSONResponse
+    from app.services.spoke_calculator import calculate_full_analysis
+
+    seeded_client()[0].close()
+    db = SessionLocal()
+    render = FastJSONResponse(None).render
+
+    def validated(adapter, objects, **kwargs):
+        # What FastAPI does with a returned object: validate, then dump
+        return lambda: adapter.dump_json(adapter.validate_python(objects, **kwargs))
+
+    for name, model, schema, list_rows in (
+        ("rims", Rim, RimResponse, rims.LIST_ROWS),
+        ("hubs", Hub, HubResponse, hubs.LIST_ROWS),
+    ):
+        objects = db.query(model).options(joinedload(model.measured_by)).all()
+        rows = list_rows.query(db).all()
+        yield f"GET /{name} response_model", validated(TypeAdapter(List[schema]), objects, from_attributes=True)
+        yield f"GET /{name} columns", lambda list_rows=list_rows, rows=rows: render(list_rows.render(rows))
+
+    summaries = list_build_summaries(db, None, 0, ROWS)
+    yield "GET /builds?view=summary jsonable_encoder", lambda: json.dumps(
+        jsonable_encoder(summaries), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+    yield "GET /builds?view=summary orjson", lambda: render(summaries)
+
+    result = calculate_full_analysis(601, 45, 45, 35.2, 19.6, 28, 2, 3)
+    adapter = TypeAdapter(SpokeResult)
+    yield "POST /calculate SpokeResult", lambda: adapter.dump_json(adapter.validate_python(SpokeResult(**result)))
+    yield "POST /calculate dict", lambda: adapter.dump_json(adapter.validate_python(result))
+
+    db.close()
+
+
+BENCHMARKS = {
+    "calculator": calculator_benchmarks,
+    "parsers": parser_benchmarks,
+    "api": api_benchmarks,
+    "serialization": serialization_benchmarks,
+}
+
+
+# ---------------------------------------------------------------------------
+# Running and comparing
+# ---------------------------------------------------------------------------
+
+def run(groups, repeat, limits, retries):
+    """
+    Time every benchmark in `groups`. One slower than its entry in `limits`
+    (microseconds) is measured again, up to `retries` times, keeping the
+    best time, so a single noisy measurement does not fail the run.
+    """
+    from app.database import Base, engine
+
+    results = {}
+    for group in groups:
+        # Each group starts from empty tables, so results do not depend on which groups ran before
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        print(f"{group}:")
+        for name, func in BENCHMARKS[group]():
+            key = f"{group}.{name}"
+            func()  # warm up caches, lazy imports and connections
+            seconds, loops = measure(func, repeat)
+            for _ in range(retries):
+                if key not in limits or seconds * 1e6 <= limits[key]:
+                    break
+                seconds = min(seconds, measure(func, repeat)[0])
+            results[key] = {"us": round(seconds * 1e6, 3), "loops": loops}
+            print(f"  {name:<40} {seconds * 1e6:>12.2f} us")
+    return results
+
+
+def compare(results, baseline, tolerance, min_us):
+    """
+    Print current vs baseline timings; return the names of regressions.
+    Benchmarks whose baseline is under `min_us` microseconds are too short
+    to time reliably and never count as regressions.
+    """
+    old = baseline["results"]
+    regressions = []
+    if baseline.get("machine") != platform.platform():
+        print(f"\nWarning: baseline recorded on {baseline.get('machine', '?')}, "
+              f"this is {platform.platform()}; save a baseline on this machine")
+    print(f"\nCompared with baseline from {baseline.get('created_at', '?')} "
+          f"(tolerance {tolerance:.0%}, gating benchmarks from {min_us:g} us):")
+    print(f"  {'benchmark':<52} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in old:
+            print(f"  {name:<52} {'-':>12} {result['us']:>10.2f}us {'new':>8}")
+            continue
+        change = result["us"] / old[name]["us"] - 1
+        gated = old[name]["us"] >= min_us
+        slower = gated and change > tolerance
+        if slower:
+            regressions.append(name)
+        note = "  SLOWER" if slower else "" if gated else "  (not gated)"
+        print(f"  {name:<52} {old[name]['us']:>10.2f}us {result['us']:>10.2f}us {change:>+7.0%}{note}")
+    return regressions
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Run benchmarks and compare with a stored baseline")
+    parser.add_argument("--group", action="append", choices=GROUPS, help="Only run this group (repeatable)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before a benchmark fails (0.25 = 25%%)")
+    parser.add_argument("--min-us", type=float, default=1000,
+                        help="Only fail on benchmarks whose baseline is at least this many microseconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (best one counts)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Times a benchmark slower than the baseline is measured again")
+    args = parser.parse_args()
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    limits = {
+        name: result["us"] * (1 + args.tolerance)
+        for name, result in (baseline["results"] if baseline else {}).items()
+        if result["us"] >= args.min_us
+    }
+
+    # Importers and the app write to the database: always use a scratch one
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}"
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ["TRACE_SAMPLE_RATE"] = "0"
+
+    from app.database import engine
+
+    try:
+        results = run(args.group or GROUPS, args.repeat, limits, args.retries)
+    finally:
+        engine.dispose()
+        os.unlink(scratch.name)
+
+    document = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                # Keep entries for groups that were not run this time
+                document["results"] = {**json.load(f)["results"], **results}
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.tolerance, args.min_us)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline")
+        sys.exit(1)
+    print("\nNo benchmark slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
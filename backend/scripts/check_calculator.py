@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Check every spoke calculator implementation against a golden corpus, and time it.
+
+The corpus holds about 100,000 wheel geometries (realistic builds plus
+edge cases: radial, zero offsets, large rim offsets, crossings past half
+the flange) with unrounded results from the high-precision reference in
+spoke_reference.py. It is generated from a fixed seed into
+scripts/calculator_corpus.csv.gz on first use (about 30 s; not committed,
+it is several MB) and must hash to CORPUS_SHA256, so the reference
+results cannot drift unnoticed. Each implementation in IMPLEMENTATIONS is
+run over the whole corpus and must match it:
+
+- unrounded spoke lengths within LENGTH_TOLERANCE (mm)
+- displayed values (lengths and angles to 0.1, stocked lengths to 2 mm)
+  exactly as the reference rounds, except that a value within
+  BOUNDARY_TOLERANCE of a rounding boundary may round either way
+
+    python scripts/check_calculator.py                 # check and time every implementation
+    python scripts/check_calculator.py --impl scalar   # just one
+    python scripts/check_calculator.py --generate      # rebuild the corpus and print its hash
+
+To adopt a faster kernel (vectorized, cached, ...), add it to
+IMPLEMENTATIONS; it gets the whole corpus as one list, so batch kernels
+can be timed as they will run. Exits 1 on any mismatch.
+"""
+
+import sys
+import os
+import csv
+import gzip
+import hashlib
+import io
+import math
+import random
+import time
+from decimal import Decimal
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(SCRIPT_DIR, "calculator_corpus.csv.gz")
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+import spoke_reference  # noqa: E402  (lives next to this script)
+
+CORPUS_ROWS = 100_000
+SEED = 48
+# SHA-256 of the uncompressed corpus. Change only together with a deliberate formula change.
+CORPUS_SHA256 = "34361f4c46fcce4efa92a8df5f50e1e92a816acf04ca0e5367f5b1b6fb50d41e"
+
+LENGTH_TOLERANCE = 1e-9
+BOUNDARY_TOLERANCE = 1e-9
+
+INPUTS = [
+    "erd", "flange_diameter_left", "flange_diameter_right", "flange_offset_left", "flange_offset_right",
+    "spoke_count", "cross_pattern_left", "cross_pattern_right", "spoke_hole_diameter", "rim_offset",
+]
+INT_INPUTS = {"spoke_count", "cross_pattern_left", "cross_pattern_right"}
+REFERENCE = [
+    "spoke_length_left", "spoke_length_right", "bracing_angle_left", "bracing_angle_right",
+    "tension_percent_left", "tension_percent_right", "wrap_angle_left", "wrap_angle_right",
+    "theta_angle_left", "theta_angle_right",
+]
+
+# Displayed fields: (reference field, rounding step)
+DISPLAY = {
+    "spoke_length_left": ("spoke_length_left", 0.1),
+    "spoke_length_right": ("spoke_length_right", 0.1),
+    "spoke_length_left_rounded": ("spoke_length_left", 2),
+    "spoke_length_right_rounded": ("spoke_length_right", 2),
+    "bracing_angle_left": ("bracing_angle_left", 0.1),
+    "bracing_angle_right": ("bracing_angle_right", 0.1),
+    "tension_percent_left": ("tension_percent_left", 0.1),
+    "tension_percent_right": ("tension_percent_right", 0.1),
+    "wrap_angle_left": ("wrap_angle_left", 0.1),
+    "wrap_angle_right": ("wrap_angle_right", 0.1),
+    "theta_angle_left": ("theta_angle_left", 0.1),
+    "theta_angle_right": ("theta_angle_right", 0.1),
+}
+
+
+# ---------------------------------------------------------------------------
+# Implementations under test: list of input dicts -> list of result dicts
+# ---------------------------------------------------------------------------
+
+def scalar(rows):
+    from app.services.spoke_calculator import calculate_full_analysis
+    return [calculate_full_analysis(**row) for row in rows]
+
+
+def lengths(rows):
+    """Unrounded lengths, where float error would show before display rounding hides it."""
+    from app.services.spoke_calculator import calculate_both_sides
+    results = []
+    for row in rows:
+        left, right = calculate_both_sides(**row)
+        results.append({"spoke_length_left": left, "spoke_length_right": right})
+    return results
+
+
+def live(rows):
+    """The /calculate/live path: validated through SpokeCalculation and SpokeResult."""
+    from app.services.live_calculation import calculate
+    return [calculate(row) for row in rows]
+
+
+# name -> (function, whether results are unrounded)
+IMPLEMENTATIONS = {
+    "scalar": (scalar, False),
+    "lengths": (lengths, True),
+    "live": (live, False),
+}
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+EDGE_CASES = [
+    # Radial front wheel, identical flanges
+    dict(erd=601, flange_diameter_left=38, flange_diameter_right=38, flange_offset_left=35, flange_offset_right=35,
+         spoke_count=20, cross_pattern_left=0, cross_pattern_right=0, spoke_hole_diameter=2.6, rim_offset=0),
+    # No flange offset on either side (tension split undefined, both 100%)
+    dict(erd=540, flange_diameter_left=50, flange_diameter_right=50, flange_offset_left=0, flange_offset_right=0,
+         spoke_count=32, cross_pattern_left=3, cross_pattern_right=3, spoke_hole_diameter=2.6, rim_offset=0),
+    # One side on the centerline
+    dict(erd=600, flange_diameter_left=58, flange_diameter_right=46, flange_offset_left=0, flange_offset_right=20,
+         spoke_count=28, cross_pattern_left=2, cross_pattern_right=3, spoke_hole_diameter=2.6, rim_offset=0),
+    # Crossing past half the flange (angle > pi)
+    dict(erd=400, flange_diameter_left=60, flange_diameter_right=60, flange_offset_left=30, flange_offset_right=30,
+         spoke_count=16, cross_pattern_left=4, cross_pattern_right=3, spoke_hole_diameter=2.6, rim_offset=0),
+    # Large asymmetric rim offset
+    dict(erd=584, flange_diameter_left=56, flange_diameter_right=56, flange_offset_left=34, flange_offset_right=18,
+         spoke_count=28, cross_pattern_left=3, cross_pattern_right=2, spoke_hole_diameter=2.6, rim_offset=6),
+    # Rounding ties: wrap angle 360/32 = 11.25
+    dict(erd=622, flange_diameter_left=45, flange_diameter_right=45, flange_offset_left=35, flange_offset_right=19,
+         spoke_count=32, cross_pattern_left=1, cross_pattern_right=1, spoke_hole_diameter=2.6, rim_offset=0),
+]
+
+
+def random_wheel(rng):
+    diameter = round(rng.uniform(30, 110), 1)
+    offset = round(rng.uniform(0, 45), 1)
+    return {
+        "erd": round(rng.uniform(200, 700), 1),
+        "flange_diameter_left": diameter,
+        "flange_diameter_right": diameter if rng.random() < 0.5 else round(rng.uniform(30, 110), 1),
+        "flange_offset_left": offset,
+        "flange_offset_right": offset if rng.random() < 0.3 else round(rng.uniform(0, 45), 1),
+        "spoke_count": rng.choice((16, 18, 20, 24, 28, 32, 36, 40, 48)),
+        "cross_pattern_left": rng.randint(0, 4),
+        "cross_pattern_right": rng.randint(0, 4),
+        "spoke_hole_diameter": rng.choice((2.4, 2.5, 2.6, 2.7, 3.0)),
+        "rim_offset": 0 if rng.random() < 0.6 else round(rng.uniform(-6, 6), 1),
+    }
+
+
+def generate(path, rows, seed):
+    rng = random.Random(seed)
+    wheels = EDGE_CASES + [random_wheel(rng) for _ in range(rows - len(EDGE_CASES))]
+
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(INPUTS + REFERENCE)
+    for i, wheel in enumerate(wheels):
+        reference = spoke_reference.analysis(**wheel)
+        writer.writerow(
+            [wheel[name] for name in INPUTS] +
+            [format(reference[name].quantize(Decimal("1e-12")).normalize(), "f") for name in REFERENCE]
+        )
+        if i % 10000 == 0:
+            print(f"  {i}/{len(wheels)}", end="\r", flush=True)
+
+    data = text.getvalue().encode()
+    with gzip.open(path, "wb") as f:
+        f.write(data)
+    print(f"\rWrote {len(wheels)} geometries to {path} (sha256 {hashlib.sha256(data).hexdigest()})")
+
+
+def load(path):
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != CORPUS_SHA256:
+        print(f"{path} has sha256 {digest}, expected {CORPUS_SHA256}.\n"
+              "The corpus or the reference changed; regenerate it with --generate, and update "
+              "CORPUS_SHA256 only if the formula changed on purpose.")
+        sys.exit(1)
+
+    inputs, references = [], []
+    for record in csv.DictReader(io.StringIO(data.decode())):
+        inputs.append({
+            name: int(record[name]) if name in INT_INPUTS else float(record[name]) for name in INPUTS
+        })
+        references.append({name: float(record[name]) for name in REFERENCE})
+    return inputs, references
+
+
+# ---------------------------------------------------------------------------
+# Checking
+# ---------------------------------------------------------------------------
+
+def acceptable(exact, step):
+    """Values `exact` may be displayed as when rounded to `step`."""
+    q = exact / step
+    lower = math.floor(q)
+    if abs(q - lower - 0.5) * step <= BOUNDARY_TOLERANCE:
+        return (lower * step, (lower + 1) * step)
+    return (math.floor(q + 0.5) * step,)
+
+
+def check(results, references, exact):
+    """Mismatches as (row index, field, got, expected), plus max abs error per field."""
+    mismatches = []
+    max_error = {}
+
+    def compare(i, field, got, reference, step=None):
+        if step is None:
+            max_error[field] = max(max_error.get(field, 0.0), abs(got - reference))
+            if abs(got - reference) > LENGTH_TOLERANCE:
+                mismatches.append((i, field, got, reference))
+        elif not any(abs(got - value) <= 1e-9 for value in acceptable(reference, step)):
+            mismatches.append((i, field, got, acceptable(reference, step)))
+
+    for i, (result, reference) in enumerate(zip(results, references)):
+        for field, got in result.items():
+            if exact:
+                compare(i, field, got, reference[field])
+            elif field in DISPLAY:
+                source, step = DISPLAY[field]
+                compare(i, field, got, reference[source], step)
+            elif field.startswith("total_angle_"):
+                # Displayed as bracing angle + the displayed wrap angle
+                side = field.rsplit("_", 1)[1]
+                compare(i, field, got, reference[f"bracing_angle_{side}"] + result[f"wrap_angle_{side}"], 0.1)
+    return mismatches, max_error
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check calculator implementations against the golden corpus")
+    parser.add_argument("--impl", action="append", choices=sorted(IMPLEMENTATIONS), help="Only this implementation")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--generate", action="store_true", help="Regenerate the corpus from the reference")
+    parser.add_argument("--rows", type=int, default=CORPUS_ROWS, help="Corpus size when generating")
+    parser.add_argument("--seed", type=int, default=SEED, help="Corpus seed when generating")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per implementation (best one counts)")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.corpus, args.rows, args.seed)
+        return
+
+    if not os.path.exists(args.corpus):
+        print("Generating the corpus...")
+        generate(args.corpus, CORPUS_ROWS, SEED)
+    inputs, references = load(args.corpus)
+    print(f"{len(inputs)} geometries from {args.corpus}\n")
+
+    failed = False
+    for name in args.impl or IMPLEMENTATIONS:
+        func, exact = IMPLEMENTATIONS[name]
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = func(inputs)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        mismatches, max_error = check(results, references, exact)
+        status = "FAIL" if mismatches else "ok"
+        line = (f"  [{status:>4}] {name:<10} {best / len(inputs) * 1e6:>8.2f} us/wheel "
+                f"{len(inputs) / best:>12,.0f} wheels/s   mismatches: {len(mismatches)}")
+        if exact:
+            worst = max(max_error.items(), key=lambda item: item[1])
+            line += f"   max |error| {worst[1]:.1e} mm ({worst[0]})"
+        print(line)
+        for i, field, got, expected in mismatches[:5]:
+            print(f"         row {i} {field}: got {got!r}, expected {expected!r}\n         {inputs[i]}")
+        failed = failed or bool(mismatches)
+
+    if failed:
+        print("\nSome implementations disagree with the reference")
+        sys.exit(1)
+    print("\nAll implementations match the reference")
+
+
+if __name__ == "__main__":
+    main()
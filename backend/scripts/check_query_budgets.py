@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Fail if a read endpoint issues more SQL statements than its budget.
+
+Seeds a small catalog and build history (several mechanics, so lazy
+loads of `measured_by`/`created_by` cannot hide behind the identity map)
+into a scratch database, calls each endpoint through the full app, and
+compares the statements issued with QUERY_BUDGETS. Any statement shape
+repeated per row (N+1) fails as well.
+
+    python scripts/check_query_budgets.py
+    python scripts/check_query_budgets.py --database-url postgresql://.../scratch
+
+The database is created from the models and must be a scratch one: it is
+written to. Defaults to a temporary SQLite file.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROWS = 25
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check per-endpoint SQL statement budgets")
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement shape")
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        os.environ["DATABASE_URL"] = f"sqlite:///{scratch.name}"
+    os.environ["QUERY_INSPECTOR"] = "true"
+    os.environ["JOB_WORKERS"] = "0"
+
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.models import User
+    from app.utils.auth import get_current_user
+    from app.utils.query_inspector import (
+        QUERY_BUDGETS, QueryBudgetExceeded, install_query_inspector, query_budget,
+    )
+
+    inspector = install_query_inspector(engine)
+
+    db = SessionLocal()
+    users = [User(clerk_id=f"budget_{i}", email=f"budget{i}@example.com", name=f"Mechanic {i}", is_admin=True)
+             for i in range(5)]
+    db.add_all(users)
+    db.commit()
+    user_ids = [u.id for u in users]
+    db.close()
+
+    acting = {"id": user_ids[0]}
+
+    def as_user():
+        session = SessionLocal()
+        try:
+            user = session.get(User, acting["id"])
+            session.expunge(user)
+            return user
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_current_user] = as_user
+    client = TestClient(app)
+
+    print(f"Seeding {ROWS} rims, hubs and builds...")
+    rim_ids, hub_ids, build_ids = [], [], []
+    for i in range(ROWS):
+        acting["id"] = user_ids[i % len(user_ids)]
+        rim = client.post("/rims", json={
+            "manufacturer": f"Maker {i % 7}", "model": f"Rim {i}", "iso_size": 622, "erd": 600 - i * 0.5,
+        })
+        hub = client.post("/hubs", json={
+            "manufacturer": f"Maker {i % 7}", "model": f"Hub {i}", "position": "rear", "spoke_count": 32,
+            "flange_diameter_left": 58, "flange_diameter_right": 46,
+            "flange_offset_left": 34, "flange_offset_right": 19,
+        })
+        rim.raise_for_status()
+        hub.raise_for_status()
+        rim_ids.append(rim.json()["id"])
+        hub_ids.append(hub.json()["id"])
+
+        build = client.post("/builds", json={
+            "rim_id": rim_ids[-1], "hub_id": hub_ids[-1], "spoke_count": 32,
+            "cross_pattern_left": 3, "cross_pattern_right": 3,
+            "spoke_length_left": 290, "spoke_length_right": 288, "customer_name": f"Customer {i}",
+        })
+        build.raise_for_status()
+        build_ids.append(build.json()["id"])
+
+    cases = [
+        ("GET", "/rims", "/rims"),
+        ("GET", "/rims", "/rims?fields=model,measured_by"),
+        ("GET", "/rims/{rim_id}", f"/rims/{rim_ids[0]}"),
+        ("GET", "/hubs", "/hubs"),
+        ("GET", "/hubs/{hub_id}", f"/hubs/{hub_ids[0]}"),
+        ("GET", "/builds", "/builds"),
+        ("GET", "/builds", "/builds?view=summary"),
+        ("GET", "/builds", "/builds?fields=customer_name,rim,created_by"),
+        ("GET", "/builds/{build_id}", f"/builds/{build_ids[0]}"),
+        ("GET", "/analytics", "/analytics"),
+        ("GET", "/catalog/changes", "/catalog/changes?since=0"),
+        ("GET", "/catalog/changes", "/catalog/changes?since=1"),
+    ]
+
+    failures = []
+    try:
+        for method, route, url in cases:
+            budget = QUERY_BUDGETS[(method, route)]
+            problem = None
+            try:
+                with query_budget(budget) as log:
+                    response = client.request(method, url)
+                response.raise_for_status()
+                repeated = log.repeated(inspector.repeated_threshold)
+                if repeated:
+                    shape, n, site = repeated[0]
+                    problem = f"N+1: {n}x from {site}: {shape[:200]}"
+            except QueryBudgetExceeded as e:
+                log_count = str(e).split(" ", 1)[0]
+                problem = f"{log_count} queries, budget {budget}"
+
+            if args.verbose:
+                for shape, n in log.shapes.most_common():
+                    print(f"         {n}x {shape[:160]}")
+            status = "FAIL" if problem else "ok"
+            print(f"  [{status:>4}] {method} {url}: {log.count}/{budget} queries" + (f" ({problem})" if problem else ""))
+            if problem:
+                failures.append(url)
+    finally:
+        client.close()
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+
+    if failures:
+        print(f"\n{len(failures)} endpoint(s) over their query budget")
+        sys.exit(1)
+    print("\nAll endpoints within their query budgets")
+
+
+if __name__ == "__main__":
+    main()
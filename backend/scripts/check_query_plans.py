@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Fail if any list endpoint's query plan regresses to a sequential scan.
+
+Seeds a large synthetic catalog into a scratch schema (never the real
+tables), calls the actual router functions, captures every SQL statement
+they emit, and runs EXPLAIN on each one. Exits non-zero if a checked table
+is read with a Seq Scan.
+
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --rims 100000 --keep   # reuse seed data next run
+
+Search cases (ilike '%term%') are only checked when the pg_trgm indexes
+could be created.
+"""
+
+import sys
+import os
+import inspect
+import random
+import string
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import Base, create_search_indexes
+from app.models import User, Rim, Hub, Build
+from app.routers.builds import list_builds
+from app.routers.hubs import list_hubs
+from app.routers.rims import list_rims
+
+SCHEMA = "query_plan_check"
+
+MANUFACTURERS = [
+    "".join(random.Random(i).choices(string.ascii_uppercase, k=1))
+    + "".join(random.Random(i).choices(string.ascii_lowercase, k=7))
+    for i in range(200)
+]
+
+
+def make_engine(url):
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+    admin.dispose()
+    return create_engine(url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+
+
+def seed(engine, n_rims, n_hubs, n_builds):
+    """Insert synthetic rows with realistic value distributions."""
+    rng = random.Random(42)
+    with Session(engine) as db:
+        if db.query(Rim).count() >= n_rims:
+            print("Seed data already present, skipping")
+            return
+
+        print(f"Seeding {n_rims} rims, {n_hubs} hubs, {n_builds} builds...")
+        db.execute(insert(User), [
+            {"clerk_id": f"user_{i}", "email": f"user{i}@example.com", "name": f"Mechanic {i}"}
+            for i in range(20)
+        ])
+
+        def model_name():
+            return f"{rng.choice(string.ascii_uppercase)}{rng.randint(10, 999)} {rng.choice(['', 'Pro', 'Disc', 'OC'])}".strip()
+
+        db.execute(insert(Rim), [
+            {
+                "manufacturer": rng.choice(MANUFACTURERS),
+                "model": model_name(),
+                "iso_size": rng.choices([622, 584, 559, 406, 590, 630], [50, 20, 20, 4, 3, 3])[0],
+                "erd": round(rng.uniform(380, 610), 1),
+                "tire_type": rng.choices(["clincher", "tubeless", "tubular"], [60, 37, 3])[0],
+                "is_reference": rng.random() > 0.03,
+            }
+            for _ in range(n_rims)
+        ])
+        db.execute(insert(Hub), [
+            {
+                "manufacturer": rng.choice(MANUFACTURERS),
+                "model": model_name(),
+                "position": rng.choice(["front", "rear"]),
+                "brake_type": rng.choices(["rim", "disc-6bolt", "centerlock", "coaster", "drum"], [40, 25, 25, 5, 5])[0],
+                "spoke_count": rng.choices([20, 24, 28, 32, 36, 40, 48], [5, 10, 20, 40, 15, 5, 5])[0],
+                "flange_diameter_left": rng.uniform(38, 70),
+                "flange_diameter_right": rng.uniform(38, 70),
+                "flange_offset_left": rng.uniform(15, 38),
+                "flange_offset_right": rng.uniform(15, 38),
+                "is_reference": rng.random() > 0.03,
+            }
+            for _ in range(n_hubs)
+        ])
+        customers = [f"{rng.choice(MANUFACTURERS)} {rng.choice(MANUFACTURERS)}" for _ in range(5000)]
+        for start in range(0, n_builds, 10000):
+            db.execute(insert(Build), [
+                {
+                    "rim_id": rng.randint(1, n_rims),
+                    "hub_id": rng.randint(1, n_hubs),
+                    "spoke_count": 32,
+                    "cross_pattern_left": 3,
+                    "cross_pattern_right": 3,
+                    "spoke_length_left": 290.0,
+                    "spoke_length_right": 288.0,
+                    "customer_name": rng.choice(customers),
+                    "created_by_id": rng.randint(1, 20),
+                }
+                for _ in range(min(10000, n_builds - start))
+            ])
+        db.commit()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+
+def call_route(fn, **kwargs):
+    """Call a router function, filling unspecified Query() params with their defaults."""
+    for name, param in inspect.signature(fn).parameters.items():
+        if name in kwargs:
+            continue
+        default = param.default
+        kwargs[name] = getattr(default, "default", default)
+    return fn(**kwargs)
+
+
+def seq_scans(plan, tables):
+    """Return the checked tables a plan (EXPLAIN FORMAT JSON node) seq-scans."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in tables:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, tables))
+    return found
+
+
+def build_cases(sample_manufacturer, trigram):
+    """(name, route function, kwargs, tables that must not be seq-scanned)."""
+    cases = [
+        ("rims: default list", list_rims, {}, {"rims"}),
+        ("rims: measured only", list_rims, {"measured_only": True}, {"rims"}),
+        ("rims: iso size", list_rims, {"iso_size": 622}, {"rims"}),
+        ("rims: iso size + erd range", list_rims, {"iso_size": 622, "min_erd": 598, "max_erd": 602}, {"rims"}),
+        ("rims: erd range", list_rims, {"min_erd": 500, "max_erd": 501}, {"rims"}),
+        ("rims: tire type", list_rims, {"tire_type": "tubular"}, {"rims"}),
+        ("hubs: default list", list_hubs, {}, {"hubs"}),
+        ("hubs: measured only", list_hubs, {"measured_only": True}, {"hubs"}),
+        ("hubs: position", list_hubs, {"position": "rear"}, {"hubs"}),
+        ("hubs: brake type + spoke count", list_hubs, {"brake_type": "drum", "spoke_count": 36}, {"hubs"}),
+        ("hubs: spoke count", list_hubs, {"spoke_count": 48}, {"hubs"}),
+        ("builds: history", list_builds, {"current_user": None}, {"builds", "rims", "hubs"}),
+    ]
+    if trigram:
+        cases += [
+            ("rims: search", list_rims, {"search": sample_manufacturer[:5]}, {"rims"}),
+            ("hubs: search", list_hubs, {"search": sample_manufacturer[:5]}, {"hubs"}),
+            ("builds: customer name", list_builds,
+             {"current_user": None, "customer_name": sample_manufacturer[:5]}, {"builds", "rims", "hubs"}),
+        ]
+    return cases
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Check list endpoint query plans for sequential scans")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", get_settings().database_url))
+    parser.add_argument("--rims", type=int, default=50000)
+    parser.add_argument("--hubs", type=int, default=20000)
+    parser.add_argument("--builds", type=int, default=100000)
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema for the next run")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    engine = make_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        print("Query plan checks require PostgreSQL")
+        sys.exit(2)
+
+    failures = []
+    try:
+        Base.metadata.create_all(bind=engine)
+        trigram = create_search_indexes(engine)
+        if not trigram:
+            print("pg_trgm unavailable - skipping search cases")
+
+        started = time.perf_counter()
+        seed(engine, args.rims, args.hubs, args.builds)
+        print(f"Ready in {time.perf_counter() - started:.1f}s\n")
+
+        statements = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if not statement.lstrip().upper().startswith("EXPLAIN"):
+                statements.append((statement, parameters))
+
+        with Session(engine) as db:
+            sample = MANUFACTURERS[0]
+            for name, fn, kwargs, tables in build_cases(sample, trigram):
+                statements.clear()
+                call_route(fn, db=db, **kwargs)
+
+                bad = []
+                for statement, parameters in list(statements):
+                    plan = db.connection().exec_driver_sql(
+                        "EXPLAIN (FORMAT JSON) " + statement, parameters
+                    ).scalar()[0]["Plan"]
+                    if args.verbose:
+                        print(f"--- {name}\n{statement}\n{plan}\n")
+                    bad.extend(seq_scans(plan, tables))
+
+                status = "FAIL" if bad else "ok"
+                detail = f" (seq scan on {', '.join(sorted(set(bad)))})" if bad else ""
+                print(f"  [{status:>4}] {name}{detail}")
+                if bad:
+                    failures.append(name)
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+    if failures:
+        print(f"\n{len(failures)} query shape(s) regressed to sequential scans")
+        sys.exit(1)
+    print("\nAll list queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate rims and hubs across Freespoke, Spocalc and shop data.
+
+Prints merge proposals (or writes them as JSON); nothing is modified.
+
+    python scripts/dedupe_catalog.py
+    python scripts/dedupe_catalog.py --kind rims --json proposals.json
+"""
+
+import sys
+import os
+import json
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services.catalog_dedupe import find_hub_duplicates, find_rim_duplicates
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Propose merges for duplicate catalog entries")
+    parser.add_argument("--kind", choices=["rims", "hubs", "all"], default="all")
+    parser.add_argument("--threshold", type=float, default=0.88, help="Minimum model name similarity (0-1)")
+    parser.add_argument("--json", metavar="PATH", help="Write proposals to a JSON file")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    proposals = []
+
+    try:
+        if args.kind in ("rims", "all"):
+            started = time.perf_counter()
+            found = find_rim_duplicates(db, threshold=args.threshold)
+            print(f"Rims: {len(found)} duplicate groups ({time.perf_counter() - started:.2f}s)")
+            proposals.extend(found)
+
+        if args.kind in ("hubs", "all"):
+            started = time.perf_counter()
+            found = find_hub_duplicates(db, threshold=args.threshold)
+            print(f"Hubs: {len(found)} duplicate groups ({time.perf_counter() - started:.2f}s)")
+            proposals.extend(found)
+    finally:
+        db.close()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([p.as_dict() for p in proposals], f, indent=2)
+        print(f"Wrote {len(proposals)} proposals to {args.json}")
+        return
+
+    for p in proposals:
+        print(f"\n[{p.kind}] keep #{p.keep.id} {p.keep.label} (score {p.score:.2f})")
+        for d in p.duplicates:
+            source = "reference" if d.is_reference else "measured"
+            print(f"    merge #{d.id} {d.label} [{source}, {d.build_count} builds]")
+
+
+if __name__ == "__main__":
+    main()
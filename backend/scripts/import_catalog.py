@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Import rims or hubs from a CSV, JSON or NDJSON catalog file.
+
+Column headers are matched to Rim/Hub field names (case and spacing are
+ignored), so a new catalog only needs a header row, not a new script:
+
+    python scripts/import_catalog.py rims catalog.csv
+    python scripts/import_catalog.py hubs hubs.ndjson --map "pcd=flange_diameter"
+"""
+
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine, Base
+from app.services.import_pipeline import CSVSource, JSONSource, hub_pipeline, rim_pipeline
+
+# Create tables if they don't exist
+Base.metadata.create_all(bind=engine)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Import a rim or hub catalog file")
+    parser.add_argument("kind", choices=["rims", "hubs"])
+    parser.add_argument("path", help="CSV, JSON array or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "json"], help="Defaults to the file extension")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUMN=FIELD",
+                        help="Rename a source column to a model field (repeatable)")
+    parser.add_argument("--measured", action="store_true",
+                        help="Import as shop-measured data instead of reference data")
+    parser.add_argument("--update", action="store_true", help="Update rows that already exist")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    column_map = {}
+    for mapping in args.map:
+        column, _, field = mapping.partition("=")
+        column_map[column.strip().lower()] = field.strip()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "json")
+    source_cls = CSVSource if fmt == "csv" else JSONSource
+    source = source_cls(args.path, column_map=column_map)
+
+    make_pipeline = rim_pipeline if args.kind == "rims" else hub_pipeline
+    pipeline = make_pipeline(
+        defaults={"is_reference": not args.measured},
+        update_existing=args.update,
+        batch_size=args.batch_size,
+    )
+
+    db = SessionLocal()
+    try:
+        print(f"Importing {args.kind} from {args.path}...")
+        stats = pipeline.run(source, db)
+        print(stats.summary())
+        for stage in stats.stages.values():
+            for message in stage.error_samples:
+                print(f"  [{stage.name}] {message}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import SessionLocal, engine, Base
 from app.models.rim import Rim
 from app.models.hub import Hub
+from app.services.import_pipeline import rim_pipeline, hub_pipeline
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
@@ -32,276 +33,123 @@ except ImportError:
     print("To enable web scraping: pip install playwright && playwright install chromium")
 
 
-def scrape_rims_with_playwright(db, browser, max_pages=50):
-    """Scrape rim data from Freespoke using Playwright."""
-    print("Scraping rims from Freespoke...")
+def iter_freespoke_rows(browser, kind, max_pages=50):
+    """
+    Yield the data rows of each Freespoke list page as lists of cell text.
 
-    page_num = 1
-    total_imported = 0
+    Runs in the calling thread (Playwright objects are thread-bound); the
+    import pipeline parses and writes the previous page while the next one
+    is loading.
+    """
     context = browser.new_context()
     page = context.new_page()
+    page_num = 1
 
-    while page_num <= max_pages:
-        url = f"{BASE_URL}/rims?Page={page_num}"
-        print(f"  Fetching page {page_num}...")
-
-        try:
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            # Give Blazor a moment to render after network idle
-            page.wait_for_timeout(1000)
-        except Exception as e:
-            print(f"  Error loading page {page_num}: {e}")
-            break
-
-        # Get all data rows - filter to rows with enough cells
-        all_rows = page.query_selector_all("table tbody tr")
-        rows = [r for r in all_rows if len(r.query_selector_all("td")) >= 10]
-        if not rows:
-            print(f"  No valid data rows found (had {len(all_rows)} total tr elements), stopping")
-            break
-
-        print(f"  Found {len(rows)} data rows on page {page_num}")
-
-        rows_processed = 0
-        skipped_empty = 0
-        for idx, row in enumerate(rows):
-            cells = row.query_selector_all("td")
+    try:
+        while page_num <= max_pages:
+            url = f"{BASE_URL}/{kind}?Page={page_num}"
+            print(f"  Fetching page {page_num}...")
 
             try:
-                # Freespoke columns: [0]Image, [1]Manufacturer, [2]Model, [3]ISO, [4]ERD, [5]Offset drilling, [6]Offset (avg), [7]Outer width, [8]Inner width, [9]Height, [10]Weight, [11]Action
-                # Use text_content() instead of inner_text() for better compatibility
-                manufacturer = (cells[1].text_content() or "").strip()
-                model = (cells[2].text_content() or "").strip()
-                iso_size_text = (cells[3].text_content() or "").strip()
-                erd_text = (cells[4].text_content() or "").strip()
-                offset_text = (cells[6].text_content() or "").strip() if len(cells) > 6 else "0"
-                outer_width_text = (cells[7].text_content() or "").strip() if len(cells) > 7 else ""
-                inner_width_text = (cells[8].text_content() or "").strip() if len(cells) > 8 else ""
-                weight_text = (cells[10].text_content() or "").strip() if len(cells) > 10 else ""
-
-
-                if not manufacturer or not model or not erd_text:
-                    skipped_empty += 1
-                    continue
-
-                # Check if already exists
-                existing = db.query(Rim).filter(
-                    Rim.manufacturer == manufacturer,
-                    Rim.model == model,
-                    Rim.is_reference == True
-                ).first()
-
-                if existing:
-                    rows_processed += 1
-                    continue
-
-                # Parse numeric values
-                iso_size = int(iso_size_text) if iso_size_text.isdigit() else None
-
-                try:
-                    erd = float(erd_text.replace(",", "."))
-                except (ValueError, AttributeError):
-                    erd = None
-
-                try:
-                    offset = float(offset_text.replace(",", ".")) if offset_text and offset_text != "-" else 0
-                except ValueError:
-                    offset = 0
-
-                try:
-                    outer_width = float(outer_width_text.replace(",", ".")) if outer_width_text and outer_width_text != "-" else None
-                except ValueError:
-                    outer_width = None
-
-                try:
-                    inner_width = float(inner_width_text.replace(",", ".")) if inner_width_text and inner_width_text != "-" else None
-                except ValueError:
-                    inner_width = None
-
-                try:
-                    weight_clean = weight_text.replace("g", "").replace(",", ".").strip()
-                    weight = float(weight_clean) if weight_clean and weight_clean != "-" else None
-                except ValueError:
-                    weight = None
-
-                if erd is None:
-                    continue
-
-                rim = Rim(
-                    manufacturer=manufacturer,
-                    model=model,
-                    iso_size=iso_size,
-                    erd=erd,
-                    drilling_offset=offset,
-                    outer_width=outer_width,
-                    inner_width=inner_width,
-                    weight=weight,
-                    is_reference=True
-                )
-                db.add(rim)
-                total_imported += 1
-                rows_processed += 1
-
+                page.goto(url, wait_until="networkidle", timeout=30000)
+                # Give Blazor a moment to render after network idle
+                page.wait_for_timeout(1000)
             except Exception as e:
-                print(f"  Error parsing row: {e}")
-                continue
+                print(f"  Error loading page {page_num}: {e}")
+                break
 
-        db.commit()
-        print(f"  Page {page_num}: {total_imported} new rims so far")
+            # Get all data rows - filter to rows with enough cells
+            all_rows = page.query_selector_all("table tbody tr")
+            rows = [r for r in all_rows if len(r.query_selector_all("td")) >= 10]
+            if not rows:
+                print(f"  No valid data rows found (had {len(all_rows)} total tr elements), stopping")
+                break
 
-        # Stop if this page had fewer rows than usual (last page)
-        if len(rows) < 40:
-            break
+            print(f"  Found {len(rows)} data rows on page {page_num}")
 
-        page_num += 1
-        time.sleep(0.3)
+            for row in rows:
+                # Use text_content() instead of inner_text() for better compatibility
+                yield [(cell.text_content() or "").strip() for cell in row.query_selector_all("td")]
 
-    context.close()
-    print(f"Imported {total_imported} new rims")
-    return total_imported
+            # Stop if this page had fewer rows than usual (last page)
+            if len(rows) < 40:
+                break
 
+            page_num += 1
+            time.sleep(0.3)
+    finally:
+        context.close()
 
-def parse_lr_value(text):
-    """Parse values like '56 L, 47 R' or just '45' into (left, right) tuple."""
-    if not text or text == "-":
-        return None, None
 
-    text = text.replace(",", ".").strip()
+def cell(cells, idx):
+    return cells[idx] if len(cells) > idx else ""
 
-    # Check for "L" and "R" pattern (e.g., "56 L, 47 R" or "56L, 47R")
-    import re
-    lr_match = re.search(r'([\d.]+)\s*L.*?([\d.]+)\s*R', text, re.IGNORECASE)
-    if lr_match:
-        try:
-            return float(lr_match.group(1)), float(lr_match.group(2))
-        except ValueError:
-            pass
 
-    # Also try R...L pattern
-    rl_match = re.search(r'([\d.]+)\s*R.*?([\d.]+)\s*L', text, re.IGNORECASE)
-    if rl_match:
-        try:
-            return float(rl_match.group(2)), float(rl_match.group(1))
-        except ValueError:
-            pass
+def freespoke_rim_record(cells):
+    """Map a Freespoke rim row to pipeline record fields."""
+    # Freespoke columns: [0]Image, [1]Manufacturer, [2]Model, [3]ISO, [4]ERD, [5]Offset drilling, [6]Offset (avg), [7]Outer width, [8]Inner width, [9]Height, [10]Weight, [11]Action
+    return {
+        "manufacturer": cell(cells, 1),
+        "model": cell(cells, 2),
+        "iso_size": cell(cells, 3),
+        "erd": cell(cells, 4),
+        "drilling_offset": cell(cells, 6),
+        "outer_width": cell(cells, 7),
+        "inner_width": cell(cells, 8),
+        "weight": cell(cells, 10),
+    }
 
-    # Single value - return same for both
-    try:
-        val = float(re.sub(r'[^\d.]', '', text))
-        return val, val
-    except ValueError:
-        return None, None
 
+# The hub columns Freespoke actually lists; a refresh leaves the rest alone
+FREESPOKE_HUB_UPDATE_COLUMNS = [
+    "flange_diameter_left", "flange_diameter_right",
+    "flange_offset_left", "flange_offset_right",
+]
 
-def scrape_hubs_with_playwright(db, browser, max_pages=50):
-    """Scrape hub data from Freespoke using Playwright."""
-    print("Scraping hubs from Freespoke...")
-
-    page_num = 1
-    total_imported = 0
-    context = browser.new_context()
-    page = context.new_page()
-
-    while page_num <= max_pages:
-        url = f"{BASE_URL}/hubs?Page={page_num}"
-        print(f"  Fetching page {page_num}...")
 
-        try:
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            # Give Blazor a moment to render after network idle
-            page.wait_for_timeout(1000)
-        except Exception as e:
-            print(f"  Error loading page {page_num}: {e}")
-            break
+def freespoke_hub_record(cells):
+    """Map a Freespoke hub row to pipeline record fields."""
+    # Freespoke hub columns: [0]Image, [1]Manufacturer, [2]Model, [3]Position, [4]OLN, [5]Axle Type, [6]Brake Type,
+    #                        [7]Drive Type, [8]Flange Diameter, [9]Flange Offsets (center-to-flange), [10]Mid-flange Offset, [11]Weight, [12]Action
+    return {
+        "manufacturer": cell(cells, 1),
+        "model": cell(cells, 2),
+        "position": cell(cells, 3),
+        "flange_diameter": cell(cells, 8),
+        # Column 9 has the center-to-flange distances (e.g. "36 L, 22 R")
+        "flange_offset": cell(cells, 9),
+    }
 
-        # Get all data rows - filter to rows with enough cells
-        all_rows = page.query_selector_all("table tbody tr")
-        rows = [r for r in all_rows if len(r.query_selector_all("td")) >= 10]
-        if not rows:
-            print(f"  No valid data rows found (had {len(all_rows)} total tr elements), stopping")
-            break
 
-        print(f"  Found {len(rows)} data rows on page {page_num}")
-
-        rows_processed = 0
-        skipped_empty = 0
-        for idx, row in enumerate(rows):
-            cells = row.query_selector_all("td")
+def scrape_rims_with_playwright(db, browser, max_pages=50):
+    """Scrape rim data from Freespoke using Playwright."""
+    print("Scraping rims from Freespoke...")
 
-            try:
-                # Freespoke hub columns: [0]Image, [1]Manufacturer, [2]Model, [3]Position, [4]OLN, [5]Axle Type, [6]Brake Type,
-                #                        [7]Drive Type, [8]Flange Diameter, [9]Flange Offsets (center-to-flange), [10]Mid-flange Offset, [11]Weight, [12]Action
-                # Use text_content() instead of inner_text() for better compatibility
-                manufacturer = (cells[1].text_content() or "").strip()
-                model = (cells[2].text_content() or "").strip()
-                position_text = (cells[3].text_content() or "").strip().lower()
-                flange_dia_text = (cells[8].text_content() or "").strip() if len(cells) > 8 else ""
-                # Column 9 has the center-to-flange distances (e.g. "36 L, 22 R")
-                offset_text = (cells[9].text_content() or "").strip() if len(cells) > 9 else ""
-
-
-                if not manufacturer or not model:
-                    skipped_empty += 1
-                    continue
-
-                position = None
-                if "front" in position_text:
-                    position = "front"
-                elif "rear" in position_text:
-                    position = "rear"
-
-                flange_left, flange_right = parse_lr_value(flange_dia_text)
-                offset_left, offset_right = parse_lr_value(offset_text)
-
-                if flange_left is None and offset_left is None:
-                    continue
-
-                existing = db.query(Hub).filter(
-                    Hub.manufacturer == manufacturer,
-                    Hub.model == model,
-                    Hub.position == position,
-                    Hub.is_reference == True
-                ).first()
-
-                if existing:
-                    # Update existing hub with correct values
-                    existing.flange_diameter_left = flange_left or 0
-                    existing.flange_diameter_right = flange_right or flange_left or 0
-                    existing.flange_offset_left = abs(offset_left) if offset_left else 0
-                    existing.flange_offset_right = abs(offset_right) if offset_right else (abs(offset_left) if offset_left else 0)
-                    rows_processed += 1
-                else:
-                    hub = Hub(
-                        manufacturer=manufacturer,
-                        model=model,
-                        position=position,
-                        flange_diameter_left=flange_left or 0,
-                        flange_diameter_right=flange_right or flange_left or 0,
-                        flange_offset_left=abs(offset_left) if offset_left else 0,
-                        flange_offset_right=abs(offset_right) if offset_right else (abs(offset_left) if offset_left else 0),
-                        is_reference=True
-                    )
-                    db.add(hub)
-                    total_imported += 1
-                rows_processed += 1
+    pipeline = rim_pipeline(existing_filter=[Rim.is_reference == True])
+    rows = iter_freespoke_rows(browser, "rims", max_pages)
+    stats = pipeline.run((freespoke_rim_record(cells) for cells in rows), db)
 
-            except Exception as e:
-                print(f"  Error parsing row: {e}")
-                continue
+    print(stats.summary())
+    print(f"Imported {stats.inserted} new rims")
+    return stats.inserted
 
-        db.commit()
-        print(f"  Page {page_num}: {total_imported} new hubs so far")
 
-        # Stop if this page had fewer rows than usual (last page)
-        if len(rows) < 40:
-            break
+def scrape_hubs_with_playwright(db, browser, max_pages=50):
+    """Scrape hub data from Freespoke using Playwright."""
+    print("Scraping hubs from Freespoke...")
 
-        page_num += 1
-        time.sleep(0.3)
+    # Existing reference hubs get their flange measurements refreshed, nothing else
+    pipeline = hub_pipeline(
+        existing_filter=[Hub.is_reference == True],
+        update_existing=True,
+        update_columns=FREESPOKE_HUB_UPDATE_COLUMNS,
+    )
+    rows = iter_freespoke_rows(browser, "hubs", max_pages)
+    stats = pipeline.run((freespoke_hub_record(cells) for cells in rows), db)
 
-    context.close()
-    print(f"Imported {total_imported} new hubs")
-    return total_imported
+    print(stats.summary())
+    print(f"Imported {stats.inserted} new hubs, updated {stats.updated}")
+    return stats.inserted
 
 
 def add_sample_data(db):
@@ -385,14 +233,7 @@ def add_sample_data(db):
         {"manufacturer": "Enve", "model": "G23", "iso_size": 622, "erd": 598, "inner_width": 23},
     ]
 
-    for rim_data in sample_rims:
-        existing = db.query(Rim).filter(
-            Rim.manufacturer == rim_data["manufacturer"],
-            Rim.model == rim_data["model"]
-        ).first()
-        if not existing:
-            rim = Rim(**rim_data, is_reference=True)
-            db.add(rim)
+    rim_pipeline().run(sample_rims, db)
 
     # Comprehensive sample hubs
     sample_hubs = [
@@ -553,16 +394,8 @@ def add_sample_data(db):
          "flange_offset_left": 24, "flange_offset_right": 36, "spoke_count": 32},
     ]
 
-    for hub_data in sample_hubs:
-        existing = db.query(Hub).filter(
-            Hub.manufacturer == hub_data["manufacturer"],
-            Hub.model == hub_data["model"]
-        ).first()
-        if not existing:
-            hub = Hub(**hub_data, is_reference=True)
-            db.add(hub)
+    hub_pipeline(key_fields=("manufacturer", "model")).run(sample_hubs, db)
 
-    db.commit()
     print("Sample data added successfully")
 
 
@@ -21,6 +21,7 @@ except ImportError:
 from app.database import SessionLocal, engine, Base
 from app.models.rim import Rim
 from app.models.hub import Hub
+from app.services.import_pipeline import hub_pipeline, parse_rim_record, rim_pipeline
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
@@ -28,6 +29,24 @@ Base.metadata.create_all(bind=engine)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def sheet_records(sheet, header_row, col_map, fields):
+    """Yield one record per data row, keyed by pipeline field names."""
+    for row in sheet.iter_rows(min_row=header_row + 1, values_only=True):
+        yield {
+            fields[name]: row[idx] if idx < len(row) else None
+            for name, idx in col_map.items()
+            if name in fields
+        }
+
+
+def parse_spocalc_rim(record):
+    """Parse a rim record, dropping rows with implausible ERDs."""
+    row = parse_rim_record(record)
+    if row is None or row["erd"] < 200 or row["erd"] > 700:  # Sanity check
+        return None
+    return row
+
+
 def import_rims_from_excel(db, workbook):
     """Import rims from the Spocalc Excel file."""
     print("Importing rims...")
@@ -47,8 +66,6 @@ def import_rims_from_excel(db, workbook):
 
     print(f"  Found rim sheet: {rim_sheet.title}")
 
-    total_imported = 0
-
     # Find header row and column indices
     header_row = None
     for row_idx, row in enumerate(rim_sheet.iter_rows(min_row=1, max_row=10, values_only=True), 1):
@@ -84,94 +101,20 @@ def import_rims_from_excel(db, workbook):
 
     print(f"  Column mapping: {col_map}")
 
-    # Import data rows
-    for row in rim_sheet.iter_rows(min_row=header_row + 1, values_only=True):
-        try:
-            manufacturer = row[col_map.get("manufacturer", 0)] if col_map.get("manufacturer") is not None else None
-            model = row[col_map.get("model", 1)] if col_map.get("model") is not None else None
-            erd = row[col_map.get("erd", 2)] if col_map.get("erd") is not None else None
-
-            if not manufacturer or not model or not erd:
-                continue
-
-            # Clean up values
-            manufacturer = str(manufacturer).strip()
-            model = str(model).strip()
-
-            try:
-                erd = float(erd)
-            except (ValueError, TypeError):
-                continue
-
-            if erd < 200 or erd > 700:  # Sanity check
-                continue
-
-            # Check if already exists
-            existing = db.query(Rim).filter(
-                Rim.manufacturer == manufacturer,
-                Rim.model == model,
-                Rim.erd == erd
-            ).first()
-
-            if existing:
-                continue
-
-            # Parse optional fields
-            iso_size = None
-            if col_map.get("iso_size") is not None:
-                try:
-                    iso_size = int(float(row[col_map["iso_size"]]))
-                except (ValueError, TypeError):
-                    pass
-
-            inner_width = None
-            if col_map.get("inner_width") is not None:
-                try:
-                    inner_width = float(row[col_map["inner_width"]])
-                except (ValueError, TypeError):
-                    pass
-
-            outer_width = None
-            if col_map.get("outer_width") is not None:
-                try:
-                    outer_width = float(row[col_map["outer_width"]])
-                except (ValueError, TypeError):
-                    pass
-
-            weight = None
-            if col_map.get("weight") is not None:
-                try:
-                    weight = float(row[col_map["weight"]])
-                except (ValueError, TypeError):
-                    pass
-
-            offset = 0
-            if col_map.get("offset") is not None:
-                try:
-                    offset = float(row[col_map["offset"]])
-                except (ValueError, TypeError):
-                    pass
-
-            rim = Rim(
-                manufacturer=manufacturer,
-                model=model,
-                erd=erd,
-                iso_size=iso_size,
-                inner_width=inner_width,
-                outer_width=outer_width,
-                weight=weight,
-                drilling_offset=offset,
-                is_reference=True
-            )
-            db.add(rim)
-            total_imported += 1
-
-        except Exception as e:
-            continue
-
-    db.commit()
-    print(f"  Imported {total_imported} rims")
-    return total_imported
+    # Rename spreadsheet columns to pipeline record fields
+    fields = {
+        "manufacturer": "manufacturer", "model": "model", "erd": "erd",
+        "iso_size": "iso_size", "inner_width": "inner_width",
+        "outer_width": "outer_width", "weight": "weight", "offset": "drilling_offset",
+    }
+    records = sheet_records(rim_sheet, header_row, col_map, fields)
+
+    pipeline = rim_pipeline(key_fields=("manufacturer", "model", "erd"), parse=parse_spocalc_rim)
+    stats = pipeline.run(records, db)
+
+    print(stats.summary())
+    print(f"  Imported {stats.inserted} rims")
+    return stats.inserted
 
 
 def import_hubs_from_excel(db, workbook):
@@ -193,8 +136,6 @@ def import_hubs_from_excel(db, workbook):
 
     print(f"  Found hub sheet: {hub_sheet.title}")
 
-    total_imported = 0
-
     # Find header row
     header_row = None
     for row_idx, row in enumerate(hub_sheet.iter_rows(min_row=1, max_row=10, values_only=True), 1):
@@ -234,108 +175,21 @@ def import_hubs_from_excel(db, workbook):
 
     print(f"  Column mapping: {col_map}")
 
-    # Import data rows
-    for row in hub_sheet.iter_rows(min_row=header_row + 1, values_only=True):
-        try:
-            manufacturer = row[col_map.get("manufacturer", 0)] if col_map.get("manufacturer") is not None else None
-            model = row[col_map.get("model", 1)] if col_map.get("model") is not None else None
-
-            if not manufacturer or not model:
-                continue
-
-            manufacturer = str(manufacturer).strip()
-            model = str(model).strip()
-
-            # Check if already exists
-            existing = db.query(Hub).filter(
-                Hub.manufacturer == manufacturer,
-                Hub.model == model
-            ).first()
-
-            if existing:
-                continue
-
-            # Parse flange diameter
-            flange_dia_left = None
-            flange_dia_right = None
-
-            if col_map.get("flange_dia") is not None:
-                try:
-                    flange_dia = float(row[col_map["flange_dia"]])
-                    flange_dia_left = flange_dia
-                    flange_dia_right = flange_dia
-                except (ValueError, TypeError):
-                    pass
-
-            if col_map.get("flange_dia_left") is not None:
-                try:
-                    flange_dia_left = float(row[col_map["flange_dia_left"]])
-                except (ValueError, TypeError):
-                    pass
-
-            if col_map.get("flange_dia_right") is not None:
-                try:
-                    flange_dia_right = float(row[col_map["flange_dia_right"]])
-                except (ValueError, TypeError):
-                    pass
-
-            # Parse offsets
-            offset_left = None
-            offset_right = None
-
-            if col_map.get("offset_left") is not None:
-                try:
-                    offset_left = float(row[col_map["offset_left"]])
-                except (ValueError, TypeError):
-                    pass
-
-            if col_map.get("offset_right") is not None:
-                try:
-                    offset_right = float(row[col_map["offset_right"]])
-                except (ValueError, TypeError):
-                    pass
-
-            # Skip if we don't have enough data
-            if flange_dia_left is None and offset_left is None:
-                continue
-
-            # Parse spoke holes
-            spoke_count = None
-            if col_map.get("spoke_holes") is not None:
-                try:
-                    spoke_count = int(float(row[col_map["spoke_holes"]]))
-                except (ValueError, TypeError):
-                    pass
-
-            # Parse position
-            position = None
-            if col_map.get("position") is not None:
-                pos_val = str(row[col_map["position"]]).lower()
-                if "front" in pos_val:
-                    position = "front"
-                elif "rear" in pos_val:
-                    position = "rear"
-
-            hub = Hub(
-                manufacturer=manufacturer,
-                model=model,
-                position=position,
-                flange_diameter_left=flange_dia_left or 0,
-                flange_diameter_right=flange_dia_right or flange_dia_left or 0,
-                flange_offset_left=offset_left or 0,
-                flange_offset_right=offset_right or offset_left or 0,
-                spoke_count=spoke_count,
-                is_reference=True
-            )
-            db.add(hub)
-            total_imported += 1
-
-        except Exception as e:
-            continue
-
-    db.commit()
-    print(f"  Imported {total_imported} hubs")
-    return total_imported
+    fields = {
+        "manufacturer": "manufacturer", "model": "model",
+        "flange_dia": "flange_diameter", "flange_dia_left": "flange_diameter_left",
+        "flange_dia_right": "flange_diameter_right", "offset_left": "flange_offset_left",
+        "offset_right": "flange_offset_right", "spoke_holes": "spoke_count",
+        "position": "position",
+    }
+    records = sheet_records(hub_sheet, header_row, col_map, fields)
+
+    pipeline = hub_pipeline(key_fields=("manufacturer", "model"))
+    stats = pipeline.run(records, db)
+
+    print(stats.summary())
+    print(f"  Imported {stats.inserted} hubs")
+    return stats.inserted
 
 
 def main():
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Replay a realistic shop workload against a running stack and report capacity.
+
+Virtual mechanics search rims and hubs, run calculations, save builds and
+open build sheets, each pausing between actions. The script reports
+throughput, latency percentiles and error rates per scenario.
+
+Authentication is real: the script starts a local stand-in for Clerk's
+JWKS endpoint and signs RS256 tokens with its own key, so the API's
+verify_clerk_token fetches and checks keys exactly as in production. The
+API must be able to reach that endpoint, so run the script inside the
+backend container (the issuer listens on 127.0.0.1 there):
+
+    docker compose exec backend python scripts/load_test.py
+    docker compose exec backend python scripts/load_test.py --users 50 --duration 120
+    docker compose exec backend python scripts/load_test.py --url http://localhost:8000 --output run.json
+
+The default URL goes through nginx, like browser traffic. The catalog must
+already be imported. Builds created during the run are deleted at the end
+(unless --keep-builds). The `loadtest_<n>` users it signs in as are left
+in place and reused by the next run.
+
+Runs are reproducible: with the same --seed, every user makes the same
+sequence of choices.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.spoke_calculator import calculate_full_analysis
+
+# Relative weight of each scenario in the mix
+MIX = {
+    "search_rims": 25,
+    "search_hubs": 20,
+    "calculate": 25,
+    "create_build": 10,
+    "build_sheet": 15,
+    "build_history": 5,
+}
+
+KEY_ID = "spokecalc-loadtest"
+
+
+# ---------------------------------------------------------------------------
+# Local JWKS issuer
+# ---------------------------------------------------------------------------
+
+class FakeIssuer:
+    """Serves a JWKS for a freshly generated key and signs tokens with it."""
+
+    def __init__(self, bind: str, port: int, url: str = None):
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.key.public_key()))
+        jwks = json.dumps({"keys": [{**jwk, "kid": KEY_ID, "alg": "RS256", "use": "sig"}]}).encode()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/.well-known/jwks.json":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(jwks)))
+                self.end_headers()
+                self.wfile.write(jwks)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((bind, port), Handler)
+        self.server.daemon_threads = True
+        self.url = url or f"http://{bind}:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="jwks", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    def token(self, subject: str, name: str, lifetime: int) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": self.url,
+            "sub": subject,
+            "name": name,
+            "email": f"{subject}@loadtest.invalid",
+            "iat": now,
+            "nbf": now - 5,
+            "exp": now + lifetime,
+        }
+        return jwt.encode(claims, self.key, algorithm="RS256", headers={"kid": KEY_ID})
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, scenario: str, seconds: float, error: str = None):
+        self.latencies[scenario].append(seconds)
+        if error:
+            self.errors[scenario][error] += 1
+
+    def summary(self, elapsed: float):
+        rows = {}
+        for scenario in sorted(self.latencies, key=lambda s: -len(self.latencies[s])):
+            rows[scenario] = self._row(self.latencies[scenario], self.errors[scenario], elapsed)
+        everything = [s for samples in self.latencies.values() for s in samples]
+        all_errors = sum(self.errors.values(), Counter())
+        rows["total"] = self._row(everything, all_errors, elapsed)
+        return rows
+
+    @staticmethod
+    def _row(samples, errors, elapsed):
+        ordered = sorted(samples)
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+        failed = sum(errors.values())
+        return {
+            "requests": len(ordered),
+            "errors": failed,
+            "error_rate": failed / len(ordered) if ordered else 0.0,
+            "throughput": len(ordered) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(50),
+            "p90_ms": percentile(90),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+            "error_kinds": dict(errors),
+        }
+
+
+def print_report(summary, elapsed, users):
+    print(f"\n{users} users, {elapsed:.0f} s\n")
+    print(f"{'scenario':<16} {'requests':>9} {'req/s':>8} {'errors':>7} {'err %':>6} "
+          f"{'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for scenario, row in summary.items():
+        if scenario == "total":
+            print("-" * 96)
+        print(f"{scenario:<16} {row['requests']:>9} {row['throughput']:>8.1f} {row['errors']:>7} "
+              f"{row['error_rate'] * 100:>5.1f}% " +
+              " ".join(f"{row[k]:>6.0f}ms" for k in ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")))
+    errors = summary["total"]["error_kinds"]
+    if errors:
+        print("\nErrors: " + ", ".join(f"{kind} x{n}" for kind, n in Counter(errors).most_common()))
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+class Catalog:
+    """Rims, hubs and builds the virtual users pick from."""
+
+    def __init__(self, rims, hubs, build_ids):
+        self.rims = [r for r in rims if r.get("erd")]
+        self.hubs = [h for h in hubs if h.get("flange_diameter_left")]
+        self.build_ids = build_ids
+        terms = set()
+        for item in self.rims + self.hubs:
+            terms.add(item["manufacturer"])
+            terms.add(item["model"].split()[0])
+        self.search_terms = sorted(terms) + ["no such part"]
+
+
+def wheel(rng, catalog):
+    rim = rng.choice(catalog.rims)
+    hub = rng.choice(catalog.hubs)
+    spoke_count = hub.get("spoke_count") or rng.choice((28, 32))
+    cross = 2 if spoke_count <= 24 else 3
+    return rim, hub, {
+        "erd": rim["erd"],
+        "rim_offset": rim.get("drilling_offset") or 0,
+        "flange_diameter_left": hub["flange_diameter_left"],
+        "flange_diameter_right": hub["flange_diameter_right"],
+        "flange_offset_left": hub["flange_offset_left"],
+        "flange_offset_right": hub["flange_offset_right"],
+        "spoke_hole_diameter": hub.get("spoke_hole_diameter") or 2.6,
+        "spoke_count": spoke_count,
+        "cross_pattern_left": cross,
+        "cross_pattern_right": cross,
+    }
+
+
+class VirtualUser:
+    def __init__(self, number, client, token, catalog, results, seed, think):
+        self.client = client
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.catalog = catalog
+        self.results = results
+        self.rng = random.Random(seed * 100003 + number)
+        self.think = think
+        self.created = []
+
+    async def request(self, scenario, method, path, **kwargs):
+        started = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+            if response.status_code >= 400:
+                error = str(response.status_code)
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.results.record(scenario, time.perf_counter() - started, error)
+        return None if error else response
+
+    async def run(self, deadline):
+        names, weights = zip(*MIX.items())
+        while time.monotonic() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            await getattr(self, scenario)()
+            # Exponential pauses, like people reading results between clicks
+            await asyncio.sleep(min(self.rng.expovariate(1 / self.think), self.think * 5) if self.think else 0)
+
+    async def search_rims(self):
+        term = self.rng.choice(self.catalog.search_terms)
+        await self.request("search_rims", "GET", "/rims", params={"search": term, "limit": 50})
+
+    async def search_hubs(self):
+        term = self.rng.choice(self.catalog.search_terms)
+        params = {"search": term, "limit": 50}
+        if self.rng.random() < 0.5:
+            params["position"] = self.rng.choice(("front", "rear"))
+        await self.request("search_hubs", "GET", "/hubs", params=params)
+
+    async def calculate(self):
+        _, _, geometry = wheel(self.rng, self.catalog)
+        await self.request("calculate", "POST", "/calculate", json=geometry)
+
+    async def create_build(self):
+        # Same payload as the calculator page's "Save build", which then opens the build sheet
+        rim, hub, geometry = wheel(self.rng, self.catalog)
+        result = calculate_full_analysis(**geometry)
+        response = await self.request("create_build", "POST", "/builds", json={
+            "rim_id": rim["id"],
+            "hub_id": hub["id"],
+            "spoke_count": geometry["spoke_count"],
+            "cross_pattern_left": geometry["cross_pattern_left"],
+            "cross_pattern_right": geometry["cross_pattern_right"],
+            "spoke_length_left": result["spoke_length_left_rounded"],
+            "spoke_length_right": result["spoke_length_right_rounded"],
+            **{
+                name: result[name] for name in result
+                if name.endswith(("_left", "_right")) and not name.startswith("spoke_length")
+            },
+            "customer_name": f"Load test {self.rng.randrange(1000)}",
+        })
+        if response is not None:
+            build_id = response.json()["id"]
+            self.created.append(build_id)
+            await self.request("build_sheet", "GET", f"/builds/{build_id}")
+
+    async def build_sheet(self):
+        pool = self.created or self.catalog.build_ids
+        if not pool:
+            return await self.create_build()
+        await self.request("build_sheet", "GET", f"/builds/{self.rng.choice(pool)}")
+
+    async def build_history(self):
+        await self.request("build_history", "GET", "/builds", params={"view": "summary", "limit": 50})
+
+
+async def load(args, issuer):
+    lifetime = int(args.duration + args.ramp_up + 600)
+    tokens = [issuer.token(f"loadtest_{i}", f"Load Test {i}", lifetime) for i in range(args.users)]
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        auth = {"Authorization": f"Bearer {tokens[0]}"}
+        me = await client.get("/users/me", headers=auth)
+        if me.status_code != 200:
+            print(f"The API rejected the load-test token ({me.status_code}). It must be able to "
+                  f"reach {issuer.url}/.well-known/jwks.json (see --issuer-url).")
+            sys.exit(1)
+
+        rims = (await client.get("/rims", params={"limit": 500}, headers=auth)).json()
+        hubs = (await client.get("/hubs", params={"limit": 500}, headers=auth)).json()
+        builds = (await client.get("/builds", params={"view": "summary", "limit": 200}, headers=auth)).json()
+        catalog = Catalog(rims, hubs, [b["id"] for b in builds])
+        if not catalog.rims or not catalog.hubs:
+            print("No rims or hubs in the catalog; import reference data first.")
+            sys.exit(1)
+
+        results = Results()
+        users = [
+            VirtualUser(i, client, tokens[i], catalog, results, args.seed, args.think)
+            for i in range(args.users)
+        ]
+
+        print(f"Running {args.users} users against {args.url} for {args.duration:.0f} s "
+              f"({len(catalog.rims)} rims, {len(catalog.hubs)} hubs)...")
+        started = time.monotonic()
+        deadline = started + args.ramp_up + args.duration
+
+        async def start(user, delay):
+            await asyncio.sleep(delay)
+            await user.run(deadline)
+
+        await asyncio.gather(*(
+            start(user, args.ramp_up * i / args.users) for i, user in enumerate(users)
+        ))
+        elapsed = time.monotonic() - started
+
+        if not args.keep_builds:
+            created = [(user, build_id) for user in users for build_id in user.created]
+            print(f"Deleting {len(created)} builds created by the run...")
+            for i in range(0, len(created), args.users):
+                await asyncio.gather(*(
+                    client.delete(f"/builds/{build_id}", headers=user.headers)
+                    for user, build_id in created[i:i + args.users]
+                ))
+
+    return results.summary(elapsed), elapsed
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Load-test the API with a realistic request mix")
+    parser.add_argument("--url", default="http://nginx/api", help="API base URL (default: through nginx)")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of full load")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds over which users start")
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="Mean pause between a user's actions in seconds (0: none)")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--issuer-bind", default="127.0.0.1", help="Address the fake JWKS issuer listens on")
+    parser.add_argument("--issuer-port", type=int, default=0, help="Port for the fake issuer (0: any free port)")
+    parser.add_argument("--issuer-url", help="Issuer URL as the API reaches it (default: the bind address)")
+    parser.add_argument("--keep-builds", action="store_true", help="Do not delete builds created by the run")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    issuer = FakeIssuer(args.issuer_bind, args.issuer_port, args.issuer_url)
+    issuer.start()
+    try:
+        summary, elapsed = asyncio.run(load(args, issuer))
+    finally:
+        issuer.stop()
+
+    print_report(summary, elapsed, args.users)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "url": args.url, "users": args.users, "duration": args.duration, "think": args.think,
+                "seed": args.seed, "mix": MIX, "elapsed": elapsed, "scenarios": summary,
+            }, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
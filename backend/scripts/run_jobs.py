@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Run background jobs outside the API process.
+
+Set JOB_WORKERS=0 for the API and run this instead when jobs should not
+share a machine (or container) with request handling.
+
+    python scripts/run_jobs.py --workers 4
+"""
+
+import sys
+import os
+import signal
+import threading
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.jobs import JobRunner
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    runner = JobRunner(args.workers).start()
+    print(f"Running jobs with {args.workers} workers")
+    stop.wait()
+    runner.stop()
+
+
+if __name__ == "__main__":
+    main()
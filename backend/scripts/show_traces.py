@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Inspect request traces written by the API (see app/utils/tracing.py).
+
+    python scripts/show_traces.py                      # latest traces, slowest phase of each
+    python scripts/show_traces.py --route "/builds"    # only one route
+    python scripts/show_traces.py --summary            # average time per phase, per route
+    python scripts/show_traces.py <trace_id>           # span waterfall for one trace
+
+Admins can send `X-Trace: 1` with a request to always record it; its ID comes back
+in the X-Request-ID response header.
+"""
+
+import sys
+import os
+import glob
+import json
+from collections import defaultdict
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+
+# Top-level phases shown in listings and summaries
+PHASES = ("admission", "handler", "endpoint")
+
+
+def load_traces(directory):
+    for path in sorted(glob.glob(os.path.join(directory, "traces-*.jsonl"))):
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def phase_times(trace):
+    """Total ms per phase name, plus SQL time and statement count."""
+    totals = defaultdict(float)
+    for span in trace["spans"]:
+        if span["name"] in PHASES or span["name"].startswith("auth.") or span["name"] == "calculate":
+            totals[span["name"]] += span["duration_ms"]
+        elif span["name"] == "db":
+            totals["db"] += span["duration_ms"]
+            totals["db_count"] += 1
+    return totals
+
+
+def print_waterfall(trace):
+    print(f"{trace['method']} {trace['path']} -> {trace['status']}  "
+          f"{trace['duration_ms']:.1f} ms  ({trace['started_at']}, trace {trace['trace_id']})\n")
+
+    children = defaultdict(list)
+    for span in trace["spans"]:
+        children[span["parent_id"]].append(span)
+
+    total = max(trace["duration_ms"], 0.001)
+    width = 40
+
+    def show(span, depth):
+        start = int(span["start_ms"] / total * width)
+        length = max(1, int(span["duration_ms"] / total * width))
+        bar = " " * start + "#" * min(length, width - start)
+        label = span["name"]
+        attrs = span.get("attrs") or {}
+        if "statement" in attrs:
+            label += f" {attrs['statement'][:60]}"
+        print(f"  {bar:<{width}} {span['duration_ms']:>8.2f} ms  {'  ' * depth}{label}")
+        for child in children[span["id"]]:
+            show(child, depth + 1)
+
+    for root in children[None]:
+        show(root, 0)
+    if trace.get("dropped_spans"):
+        print(f"\n  ({trace['dropped_spans']} spans dropped)")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Show recorded request traces")
+    parser.add_argument("trace_id", nargs="?", help="Show the span waterfall for this trace")
+    parser.add_argument("--dir", default=get_settings().trace_dir)
+    parser.add_argument("--route", help="Only traces for this route template, e.g. /builds/{build_id}")
+    parser.add_argument("--summary", action="store_true", help="Average phase times per route")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    traces = [
+        t for t in load_traces(args.dir)
+        if not args.route or t.get("route") == args.route
+    ]
+    if not traces:
+        print(f"No traces in {args.dir}")
+        return
+
+    if args.trace_id:
+        matches = [t for t in traces if t["trace_id"] == args.trace_id]
+        if not matches:
+            print(f"Trace {args.trace_id} not found")
+            sys.exit(1)
+        print_waterfall(matches[-1])
+        return
+
+    if args.summary:
+        by_route = defaultdict(list)
+        for trace in traces:
+            by_route[(trace["method"], trace["route"])].append(trace)
+
+        columns = ("admission", "auth.verify_token", "handler", "endpoint", "db")
+        print(f"{'route':<40} {'n':>5} {'total':>9} " + " ".join(f"{c[-12:]:>12}" for c in columns))
+        for (method, route), group in sorted(by_route.items(), key=lambda item: -len(item[1])):
+            n = len(group)
+            totals = defaultdict(float)
+            for trace in group:
+                for name, ms in phase_times(trace).items():
+                    totals[name] += ms
+            mean = sum(t["duration_ms"] for t in group) / n
+            print(f"{method + ' ' + route:<40} {n:>5} {mean:>7.1f}ms " +
+                  " ".join(f"{totals[c] / n:>10.1f}ms" for c in columns))
+        return
+
+    for trace in traces[-args.limit:]:
+        phases = phase_times(trace)
+        slowest = max(
+            ((name, ms) for name, ms in phases.items() if name != "db_count"),
+            key=lambda item: item[1], default=("-", 0),
+        )
+        print(f"{trace['started_at'][:19]}  {trace['trace_id'][:32]:<32}  {trace['method']:<6} "
+              f"{trace['route'][:36]:<36} {trace['status']}  {trace['duration_ms']:>8.1f} ms  "
+              f"{int(phases['db_count'])} sql  slowest: {slowest[0]} {slowest[1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+High-precision reference for the spoke calculator, used by check_calculator.py.
+
+An independent implementation of app/services/spoke_calculator.py in
+40-digit decimal arithmetic: no `math` module, its own pi, cosine and
+arctangent, so an error in a float shortcut cannot hide by being repeated
+here. Results are exact to far more digits than any float implementation
+can produce, and unrounded; the checker applies the API's display rounding.
+
+Geometry (per side):
+
+    L = sqrt(R^2 + F^2 + O^2 - 2 R F cos(A)) - d/2
+    R = ERD / 2, F = PCD / 2, O = center-to-flange + rim offset (minus on the right)
+    A = 2 pi x / (n / 2) for x crosses and n spokes (0 for radial)
+
+    bracing = atan(center-to-flange / R)          (degrees)
+    wrap    = x * 360 / (n / 2) / 2               (degrees)
+    theta   = A                                   (degrees)
+    tension: each side inversely proportional to its offset, the larger side = 100 %
+
+The API's total angle is the bracing angle plus the displayed (rounded)
+wrap angle; check_calculator.py builds it from these values.
+"""
+
+from decimal import Decimal, localcontext
+
+PRECISION = 40
+
+_PI = None
+
+
+def _pi() -> Decimal:
+    """Pi to PRECISION digits (recipe from the decimal module documentation)."""
+    global _PI
+    if _PI is None:
+        with localcontext() as ctx:
+            ctx.prec = PRECISION + 5
+            lasts, t, s, n, na, d, da = 0, Decimal(3), 3, 1, 0, 0, 24
+            while s != lasts:
+                lasts = s
+                n, na = n + na, na + 8
+                d, da = d + da, da + 32
+                t = (t * n) / d
+                s += t
+        _PI = s
+    return _PI
+
+
+def _cos(x: Decimal) -> Decimal:
+    """Cosine by Taylor series, after reducing x to [-pi, pi]."""
+    with localcontext() as ctx:
+        ctx.prec = PRECISION + 5
+        two_pi = 2 * _pi()
+        x = x - two_pi * (x / two_pi).to_integral_value()
+        i, lasts, s, fact, num, sign = 0, 0, Decimal(1), 1, Decimal(1), 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i - 1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+    return s
+
+
+def _atan(x: Decimal) -> Decimal:
+    """Arctangent: halve the argument until small, then Taylor series."""
+    with localcontext() as ctx:
+        ctx.prec = PRECISION + 5
+        halvings = 0
+        while abs(x) > Decimal("0.1"):
+            x = x / (1 + (1 + x * x).sqrt())
+            halvings += 1
+        term, s, lasts, k = x, x, 0, 1
+        while s != lasts:
+            lasts = s
+            term *= -x * x
+            k += 2
+            s += term / k
+        s *= 2 ** halvings
+    return s
+
+
+def _degrees(radians: Decimal) -> Decimal:
+    return radians * 180 / _pi()
+
+
+def _dec(value) -> Decimal:
+    # Inputs as written (e.g. 601.5), not the nearest binary float
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+
+def spoke_length(erd, flange_diameter, offset, spoke_count, cross, spoke_hole_diameter) -> Decimal:
+    """Length for one side; `offset` already includes the rim's drilling offset."""
+    with localcontext() as ctx:
+        ctx.prec = PRECISION
+        r = _dec(erd) / 2
+        f = _dec(flange_diameter) / 2
+        o = _dec(offset)
+        angle = 2 * _pi() * _dec(cross) / (_dec(spoke_count) / 2)
+        return (r * r + f * f + o * o - 2 * r * f * _cos(angle)).sqrt() - _dec(spoke_hole_diameter) / 2
+
+
+def analysis(
+    erd,
+    flange_diameter_left,
+    flange_diameter_right,
+    flange_offset_left,
+    flange_offset_right,
+    spoke_count,
+    cross_pattern_left,
+    cross_pattern_right,
+    spoke_hole_diameter=2.6,
+    rim_offset=0,
+):
+    """Unrounded values of every calculate_full_analysis field (Decimal)."""
+    with localcontext() as ctx:
+        ctx.prec = PRECISION
+        rim_offset = _dec(rim_offset)
+        left_offset = _dec(flange_offset_left)
+        right_offset = _dec(flange_offset_right)
+        half_erd = _dec(erd) / 2
+        per_side = _dec(spoke_count) / 2
+
+        result = {
+            "spoke_length_left": spoke_length(
+                erd, flange_diameter_left, left_offset + rim_offset,
+                spoke_count, cross_pattern_left, spoke_hole_diameter),
+            "spoke_length_right": spoke_length(
+                erd, flange_diameter_right, right_offset - rim_offset,
+                spoke_count, cross_pattern_right, spoke_hole_diameter),
+            "bracing_angle_left": _degrees(_atan(left_offset / half_erd)),
+            "bracing_angle_right": _degrees(_atan(right_offset / half_erd)),
+        }
+
+        if left_offset + right_offset == 0:
+            result["tension_percent_left"] = result["tension_percent_right"] = Decimal(100)
+        else:
+            larger = max(left_offset, right_offset)
+            result["tension_percent_left"] = right_offset / larger * 100
+            result["tension_percent_right"] = left_offset / larger * 100
+
+        for side, cross in (("left", _dec(cross_pattern_left)), ("right", _dec(cross_pattern_right))):
+            result[f"wrap_angle_{side}"] = cross * 360 / per_side / 2
+            result[f"theta_angle_{side}"] = _degrees(2 * _pi() * cross / per_side)
+        return result
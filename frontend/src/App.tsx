@@ -8,6 +8,7 @@ import HubsPage from './pages/HubsPage'
 import BuildsPage from './pages/BuildsPage'
 import BuildSheetPage from './pages/BuildSheetPage'
 import UsersPage from './pages/UsersPage'
+import JobsPage from './pages/JobsPage'
 import HelpPage from './pages/HelpPage'
 
 function ProtectedRoute({ children }: { children: React.ReactNode }) {
@@ -75,6 +76,7 @@ export default function App() {
         <Route path="hubs" element={<HubsPage />} />
         <Route path="builds" element={<BuildsPage />} />
         <Route path="users" element={<UsersPage />} />
+        <Route path="jobs" element={<JobsPage />} />
       </Route>
       {/* Redirect old login/register routes */}
       <Route path="/login" element={<Navigate to="/auth" replace />} />
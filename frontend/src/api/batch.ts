@@ -0,0 +1,22 @@
+import api from './client'
+
+export interface BatchCall {
+  id?: string
+  method?: 'GET' | 'POST'
+  path: string
+  params?: Record<string, unknown>
+  body?: unknown
+}
+
+export interface BatchResult<T = unknown> {
+  id: string | null
+  status: number
+  body: T
+}
+
+// Run several GETs/calculations in one round trip (POST /batch).
+// Results come back in call order, each with its own status.
+export async function batch(calls: BatchCall[]): Promise<BatchResult[]> {
+  const res = await api.post<{ responses: BatchResult[] }>('/batch', { requests: calls })
+  return res.data.responses
+}
@@ -1,7 +1,7 @@
 /// <reference types="vite/client" />
 import axios from 'axios'
 
-const API_URL = import.meta.env.VITE_API_URL || '/api'
+export const API_URL = import.meta.env.VITE_API_URL || '/api'
 
 export const api = axios.create({
   baseURL: API_URL,
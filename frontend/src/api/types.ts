@@ -85,6 +85,34 @@ export interface Build {
   internal_notes: string | null
   created_by: MeasuredBy
   created_at: string
+  calculation_inputs: CalculationInputs | null
+}
+
+export interface CalculationInputs {
+  erd: number
+  rim_offset: number
+  spoke_hole_diameter: number
+}
+
+export interface ComponentSummary {
+  id: number
+  manufacturer: string
+  model: string
+}
+
+// Lightweight row from GET /builds?view=summary
+export interface BuildSummary {
+  id: number
+  rim: ComponentSummary
+  hub: ComponentSummary
+  spoke_count: number
+  cross_pattern_left: number
+  cross_pattern_right: number
+  spoke_length_left: number
+  spoke_length_right: number
+  customer_name: string | null
+  created_by: MeasuredBy
+  created_at: string
 }
 
 export interface SpokeResult {
@@ -104,6 +132,29 @@ export interface SpokeResult {
   theta_angle_right: number
 }
 
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+
+export interface Job {
+  id: number
+  kind: string
+  params: Record<string, unknown> | null
+  status: JobStatus
+  progress: number
+  message: string | null
+  result: unknown
+  error: string | null
+  cancel_requested: boolean
+  created_by_id: number | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
+export interface JobKind {
+  kind: string
+  description: string
+}
+
 export interface LoginResponse {
   access_token: string
   token_type: string
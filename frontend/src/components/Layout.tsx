@@ -87,6 +87,20 @@ export default function Layout() {
                   Users
                 </NavLink>
               )}
+              {user?.is_admin && (
+                <NavLink
+                  to="/jobs"
+                  className={({ isActive }) =>
+                    `px-4 py-2 rounded-lg text-sm font-medium transition-colors ${
+                      isActive
+                        ? 'bg-scenic-900 text-white dark:bg-scenic-100 dark:text-scenic-900'
+                        : 'text-scenic-600 hover:bg-scenic-100 dark:text-scenic-300 dark:hover:bg-scenic-700'
+                    }`
+                  }
+                >
+                  Jobs
+                </NavLink>
+              )}
             </nav>
 
             {/* User Menu */}
@@ -174,6 +188,18 @@ export default function Layout() {
             Users
           </NavLink>
         )}
+        {user?.is_admin && (
+          <NavLink
+            to="/jobs"
+            className={({ isActive }) =>
+              `px-3 py-1.5 rounded-lg text-sm font-medium whitespace-nowrap ${
+                isActive ? 'bg-scenic-900 text-white dark:bg-scenic-100 dark:text-scenic-900' : 'text-scenic-600 dark:text-scenic-300'
+              }`
+            }
+          >
+            Jobs
+          </NavLink>
+        )}
       </nav>
 
       {/* Main Content */}
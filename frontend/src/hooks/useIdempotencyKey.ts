@@ -0,0 +1,15 @@
+import { useCallback, useRef } from 'react'
+
+// One Idempotency-Key per logical submission: every retry of the same save
+// resends it (so the server replays instead of creating a duplicate), and a
+// fresh key is issued once the save has succeeded.
+export function useIdempotencyKey() {
+  const key = useRef(crypto.randomUUID())
+
+  const headers = useCallback(() => ({ 'Idempotency-Key': key.current }), [])
+  const reset = useCallback(() => {
+    key.current = crypto.randomUUID()
+  }, [])
+
+  return { headers, reset }
+}
@@ -0,0 +1,61 @@
+import { useEffect, useRef } from 'react'
+import { API_URL } from '../api/client'
+import type { SpokeResult } from '../api/types'
+
+interface LiveParams {
+  spoke_count: number
+  cross_pattern_left: number
+  cross_pattern_right: number
+}
+
+function liveUrl() {
+  const url = new URL(`${API_URL}/calculate/live`, window.location.href)
+  url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:'
+  return url.toString()
+}
+
+// While enabled, keeps a /calculate/live socket open: the rim and hub are
+// selected once per connection, then only parameter changes are sent and
+// the server pushes the recalculated result.
+export function useLiveCalculation(
+  rimId: number | null,
+  hubId: number | null,
+  params: LiveParams,
+  enabled: boolean,
+  onResult: (result: SpokeResult) => void,
+) {
+  const socket = useRef<WebSocket | null>(null)
+  const seq = useRef(0)
+  const paramsRef = useRef(params)
+  const onResultRef = useRef(onResult)
+  paramsRef.current = params
+  onResultRef.current = onResult
+
+  useEffect(() => {
+    if (!enabled || rimId === null || hubId === null) return
+
+    const ws = new WebSocket(liveUrl())
+    socket.current = ws
+    ws.onopen = () => {
+      ws.send(JSON.stringify({ type: 'params', ...paramsRef.current }))
+      ws.send(JSON.stringify({ type: 'select', rim_id: rimId, hub_id: hubId }))
+    }
+    ws.onmessage = (event) => {
+      const message = JSON.parse(event.data)
+      if (message.type === 'result') onResultRef.current(message.result)
+    }
+
+    return () => {
+      ws.close()
+      socket.current = null
+    }
+  }, [enabled, rimId, hubId])
+
+  useEffect(() => {
+    const ws = socket.current
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      seq.current += 1
+      ws.send(JSON.stringify({ type: 'params', seq: seq.current, ...params }))
+    }
+  }, [params.spoke_count, params.cross_pattern_left, params.cross_pattern_right])
+}
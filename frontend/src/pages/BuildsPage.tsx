@@ -1,7 +1,7 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
 import api from '../api/client'
-import type { Build } from '../api/types'
+import type { BuildSummary } from '../api/types'
 import toast from 'react-hot-toast'
 
 export default function BuildsPage() {
@@ -10,7 +10,7 @@ export default function BuildsPage() {
   const { data: builds = [], isLoading } = useQuery({
     queryKey: ['builds'],
     queryFn: async () => {
-      const res = await api.get<Build[]>('/builds', { params: { limit: 100 } })
+      const res = await api.get<BuildSummary[]>('/builds', { params: { limit: 100, view: 'summary' } })
       return res.data
     },
   })
@@ -28,7 +28,7 @@ export default function BuildsPage() {
     },
   })
 
-  const handleDelete = (build: Build) => {
+  const handleDelete = (build: BuildSummary) => {
     if (confirm(`Delete build for ${build.rim.manufacturer} ${build.rim.model}?`)) {
       deleteMutation.mutate(build.id)
     }
@@ -2,9 +2,12 @@ import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useNavigate, Link } from 'react-router-dom'
 import api from '../api/client'
+import { batch } from '../api/batch'
 import type { Rim, Hub, SpokeResult } from '../api/types'
 import toast from 'react-hot-toast'
 import { useAuth } from '../hooks/useAuth'
+import { useIdempotencyKey } from '../hooks/useIdempotencyKey'
+import { useLiveCalculation } from '../hooks/useLiveCalculation'
 
 export default function CalculatorPage() {
   const navigate = useNavigate()
@@ -23,27 +26,22 @@ export default function CalculatorPage() {
   const [adjustedErd, setAdjustedErd] = useState<string>('')
   const [showErdAdjust, setShowErdAdjust] = useState(false)
 
-  // Fetch rims
-  const { data: rims = [] } = useQuery({
-    queryKey: ['rims', rimSearch],
+  // Fetch rims and hubs in one round trip
+  const { data: options } = useQuery({
+    queryKey: ['calculator-options', rimSearch, hubSearch],
     queryFn: async () => {
-      const res = await api.get<Rim[]>('/rims', {
-        params: { search: rimSearch || undefined, limit: 50 }
-      })
-      return res.data
-    },
-  })
-
-  // Fetch hubs
-  const { data: hubs = [] } = useQuery({
-    queryKey: ['hubs', hubSearch],
-    queryFn: async () => {
-      const res = await api.get<Hub[]>('/hubs', {
-        params: { search: hubSearch || undefined, limit: 50 }
-      })
-      return res.data
+      const [rimRes, hubRes] = await batch([
+        { path: '/rims', params: { search: rimSearch || undefined, limit: 50 } },
+        { path: '/hubs', params: { search: hubSearch || undefined, limit: 50 } },
+      ])
+      if (rimRes.status >= 400 || hubRes.status >= 400) {
+        throw new Error('Failed to load rims and hubs')
+      }
+      return { rims: rimRes.body as Rim[], hubs: hubRes.body as Hub[] }
     },
   })
+  const rims = options?.rims ?? []
+  const hubs = options?.hubs ?? []
 
   // Calculate spoke lengths
   const calculateMutation = useMutation({
@@ -71,7 +69,17 @@ export default function CalculatorPage() {
     },
   })
 
+  // After the first calculation, recalculate live as parameters change
+  useLiveCalculation(
+    selectedRim?.id ?? null,
+    selectedHub?.id ?? null,
+    { spoke_count: spokeCount, cross_pattern_left: crossLeft, cross_pattern_right: crossRight },
+    result !== null,
+    setResult,
+  )
+
   // Save build
+  const buildKey = useIdempotencyKey()
   const saveBuildMutation = useMutation({
     mutationFn: async () => {
       if (!selectedRim || !selectedHub || !result) throw new Error('Missing data')
@@ -95,10 +103,11 @@ export default function CalculatorPage() {
         theta_angle_right: result.theta_angle_right,
         customer_name: customerName || null,
         customer_notes: customerNotes || null,
-      })
+      }, { headers: buildKey.headers() })
       return res.data
     },
     onSuccess: (data) => {
+      buildKey.reset()
       toast.success('Build saved!')
       navigate(`/build/${data.id}/print`)
     },
@@ -108,6 +117,7 @@ export default function CalculatorPage() {
   })
 
   // Create rim variant with adjusted ERD
+  const variantKey = useIdempotencyKey()
   const createRimVariantMutation = useMutation({
     mutationFn: async (newErd: number) => {
       if (!selectedRim) throw new Error('No rim selected')
@@ -124,11 +134,13 @@ export default function CalculatorPage() {
         inner_width: selectedRim.inner_width,
         outer_width: selectedRim.outer_width,
         is_reference: false,
-      })
+      }, { headers: variantKey.headers() })
       return res.data
     },
     onSuccess: (newRim) => {
+      variantKey.reset()
       queryClient.invalidateQueries({ queryKey: ['rims'] })
+      queryClient.invalidateQueries({ queryKey: ['calculator-options'] })
       setSelectedRim(newRim)
       setShowErdAdjust(false)
       setAdjustedErd('')
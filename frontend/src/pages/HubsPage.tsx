@@ -1,8 +1,10 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import api from '../api/client'
+import { getList } from '../api/columnar'
 import type { Hub } from '../api/types'
 import toast from 'react-hot-toast'
+import { useIdempotencyKey } from '../hooks/useIdempotencyKey'
 
 export default function HubsPage() {
   const queryClient = useQueryClient()
@@ -13,10 +15,7 @@ export default function HubsPage() {
   const { data: hubs = [], isLoading } = useQuery({
     queryKey: ['hubs', search],
     queryFn: async () => {
-      const res = await api.get<Hub[]>('/hubs', {
-        params: { search: search || undefined, limit: 200 }
-      })
-      return res.data
+      return getList<Hub>('/hubs', { search: search || undefined, limit: 200 })
     },
   })
 
@@ -136,6 +135,7 @@ function HubForm({ hub, onClose, onSuccess }: { hub: Hub | null, onClose: () =>
     notes: hub?.notes || '',
   })
 
+  const createKey = useIdempotencyKey()
   const mutation = useMutation({
     mutationFn: async () => {
       const data = {
@@ -160,10 +160,11 @@ function HubForm({ hub, onClose, onSuccess }: { hub: Hub | null, onClose: () =>
       if (hub) {
         await api.put(`/hubs/${hub.id}`, data)
       } else {
-        await api.post('/hubs', data)
+        await api.post('/hubs', data, { headers: createKey.headers() })
       }
     },
     onSuccess: () => {
+      createKey.reset()
       toast.success(hub ? 'Hub updated!' : 'Hub added!')
       onSuccess()
     },
@@ -0,0 +1,175 @@
+import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { Navigate } from 'react-router-dom'
+import api from '../api/client'
+import type { Job, JobKind } from '../api/types'
+import { useAuth } from '../hooks/useAuth'
+import toast from 'react-hot-toast'
+
+const STATUS_STYLES: Record<Job['status'], string> = {
+  queued: 'bg-scenic-100 text-scenic-700 dark:bg-scenic-700 dark:text-scenic-200',
+  running: 'bg-blue-100 text-blue-800 dark:bg-blue-900/40 dark:text-blue-300',
+  succeeded: 'bg-green-100 text-green-800 dark:bg-green-900/40 dark:text-green-300',
+  failed: 'bg-red-100 text-red-800 dark:bg-red-900/40 dark:text-red-300',
+  cancelled: 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900/40 dark:text-yellow-300',
+}
+
+const isActive = (job: Job) => job.status === 'queued' || job.status === 'running'
+
+export default function JobsPage() {
+  const { user: currentUser } = useAuth()
+  const queryClient = useQueryClient()
+
+  // Redirect non-admins
+  if (!currentUser?.is_admin) {
+    return <Navigate to="/" replace />
+  }
+
+  const { data: kinds = [] } = useQuery({
+    queryKey: ['job-kinds'],
+    queryFn: async () => {
+      const res = await api.get<JobKind[]>('/jobs/kinds')
+      return res.data
+    },
+  })
+
+  const { data: jobs = [], isLoading } = useQuery({
+    queryKey: ['jobs'],
+    queryFn: async () => {
+      const res = await api.get<Job[]>('/jobs')
+      return res.data
+    },
+    // Poll only while something is queued or running
+    refetchInterval: (query) => (query.state.data?.some(isActive) ? 2000 : false),
+  })
+
+  const startMutation = useMutation({
+    mutationFn: async (kind: string) => {
+      const res = await api.post<Job>('/jobs', { kind })
+      return res.data
+    },
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['jobs'] })
+      toast.success('Job queued')
+    },
+    onError: (err: any) => {
+      toast.error(err.response?.data?.detail || 'Failed to start job')
+    },
+  })
+
+  const cancelMutation = useMutation({
+    mutationFn: async (id: number) => {
+      const res = await api.post<Job>(`/jobs/${id}/cancel`)
+      return res.data
+    },
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['jobs'] })
+    },
+    onError: (err: any) => {
+      toast.error(err.response?.data?.detail || 'Failed to cancel job')
+    },
+  })
+
+  const formatTime = (dateString: string | null) => {
+    if (!dateString) return ''
+    return new Date(dateString).toLocaleString('en-US', {
+      month: 'short',
+      day: 'numeric',
+      hour: 'numeric',
+      minute: '2-digit',
+    })
+  }
+
+  return (
+    <div className="space-y-6">
+      <div>
+        <h2 className="text-2xl font-bold text-scenic-900 dark:text-scenic-100">Background Jobs</h2>
+        <p className="text-scenic-500 dark:text-scenic-400">Catalog refreshes and other long-running work</p>
+      </div>
+
+      <div className="card">
+        <h3 className="font-semibold text-scenic-900 dark:text-scenic-100 mb-4">Start a job</h3>
+        <div className="grid gap-3 sm:grid-cols-2 lg:grid-cols-3">
+          {kinds.map((kind) => (
+            <button
+              key={kind.kind}
+              onClick={() => startMutation.mutate(kind.kind)}
+              disabled={startMutation.isPending}
+              className="text-left border border-scenic-200 dark:border-scenic-600 rounded-lg p-4 hover:border-scenic-400 dark:hover:border-scenic-400 transition-colors disabled:opacity-50"
+            >
+              <div className="font-medium text-scenic-900 dark:text-scenic-100">{kind.kind.replace(/_/g, ' ')}</div>
+              <div className="text-sm text-scenic-500 dark:text-scenic-400">{kind.description}</div>
+            </button>
+          ))}
+        </div>
+      </div>
+
+      <div className="card">
+        {isLoading ? (
+          <div className="text-center py-8 text-scenic-500 dark:text-scenic-400">Loading...</div>
+        ) : jobs.length === 0 ? (
+          <div className="text-center py-8 text-scenic-500 dark:text-scenic-400">No jobs yet</div>
+        ) : (
+          <div className="space-y-4">
+            {jobs.map((job) => (
+              <div
+                key={job.id}
+                className="border border-scenic-200 dark:border-scenic-600 rounded-lg p-4"
+              >
+                <div className="flex flex-col sm:flex-row sm:items-start sm:justify-between gap-4">
+                  <div className="flex-1 min-w-0">
+                    <div className="flex items-center gap-3">
+                      <h3 className="font-semibold text-scenic-900 dark:text-scenic-100">
+                        {job.kind.replace(/_/g, ' ')}
+                      </h3>
+                      <span className={`px-2 py-0.5 text-xs font-medium rounded-full ${STATUS_STYLES[job.status]}`}>
+                        {job.cancel_requested && job.status === 'running' ? 'cancelling' : job.status}
+                      </span>
+                    </div>
+                    <p className="text-sm text-scenic-500 dark:text-scenic-400">
+                      #{job.id} · queued {formatTime(job.created_at)}
+                      {job.finished_at && ` · finished ${formatTime(job.finished_at)}`}
+                    </p>
+
+                    {isActive(job) && (
+                      <div className="mt-3 h-2 bg-scenic-100 dark:bg-scenic-700 rounded-full overflow-hidden">
+                        <div
+                          className="h-full bg-scenic-900 dark:bg-scenic-100 transition-all"
+                          style={{ width: `${Math.round(job.progress * 100)}%` }}
+                        />
+                      </div>
+                    )}
+                    {job.message && (
+                      <p className="mt-2 text-sm text-scenic-600 dark:text-scenic-300 truncate">{job.message}</p>
+                    )}
+                    {job.error && (
+                      <pre className="mt-2 text-xs text-red-600 dark:text-red-400 whitespace-pre-wrap max-h-40 overflow-auto">
+                        {job.error}
+                      </pre>
+                    )}
+                    {job.status === 'succeeded' && job.result != null && (
+                      <details className="mt-2 text-sm">
+                        <summary className="cursor-pointer text-scenic-600 dark:text-scenic-300">Result</summary>
+                        <pre className="mt-2 text-xs whitespace-pre-wrap max-h-80 overflow-auto text-scenic-700 dark:text-scenic-300">
+                          {JSON.stringify(job.result, null, 2)}
+                        </pre>
+                      </details>
+                    )}
+                  </div>
+
+                  {isActive(job) && !job.cancel_requested && (
+                    <button
+                      onClick={() => cancelMutation.mutate(job.id)}
+                      className="btn text-sm text-red-600 hover:text-red-800 hover:bg-red-50 dark:text-red-400 dark:hover:text-red-300 dark:hover:bg-red-900/20"
+                    >
+                      Cancel
+                    </button>
+                  )}
+                </div>
+              </div>
+            ))}
+          </div>
+        )}
+      </div>
+    </div>
+  )
+}
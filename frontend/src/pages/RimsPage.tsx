@@ -1,8 +1,10 @@
 import { useState } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import api from '../api/client'
+import { getList } from '../api/columnar'
 import type { Rim } from '../api/types'
 import toast from 'react-hot-toast'
+import { useIdempotencyKey } from '../hooks/useIdempotencyKey'
 
 export default function RimsPage() {
   const queryClient = useQueryClient()
@@ -13,10 +15,7 @@ export default function RimsPage() {
   const { data: rims = [], isLoading } = useQuery({
     queryKey: ['rims', search],
     queryFn: async () => {
-      const res = await api.get<Rim[]>('/rims', {
-        params: { search: search || undefined, limit: 200 }
-      })
-      return res.data
+      return getList<Rim>('/rims', { search: search || undefined, limit: 200 })
     },
   })
 
@@ -129,6 +128,7 @@ function RimForm({ rim, onClose, onSuccess }: { rim: Rim | null, onClose: () =>
     notes: rim?.notes || '',
   })
 
+  const createKey = useIdempotencyKey()
   const mutation = useMutation({
     mutationFn: async () => {
       const data = {
@@ -150,10 +150,11 @@ function RimForm({ rim, onClose, onSuccess }: { rim: Rim | null, onClose: () =>
       if (rim) {
         await api.put(`/rims/${rim.id}`, data)
       } else {
-        await api.post('/rims', data)
+        await api.post('/rims', data, { headers: createKey.headers() })
       }
     },
     onSuccess: () => {
+      createKey.reset()
       toast.success(rim ? 'Rim updated!' : 'Rim added!')
       onSuccess()
     },